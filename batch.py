@@ -0,0 +1,47 @@
+#! /usr/bin/env python
+
+import argparse
+import sys
+
+from utils.batch import Batch
+
+"""
+Command line interface to the batch mode of the framework: it simulates the alternatives declared in the configuration
+file over all the selected topologies, with a pool of local workers (see utils.batch.Batch).
+"""
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Run the Comparison Framework over a corpus of topologies')
+    arg.add_argument('-c', '--config-file', required=True, help='The framework configuration file.')
+    arg.add_argument('-t', '--topologies', nargs='+', default=['topologies/*.graphml'],
+                     help='GraphML files or globs (default: topologies/*.graphml).')
+    arg.add_argument('--min-nodes', type=int, help='Select only the topologies with at least this number of nodes.')
+    arg.add_argument('--max-nodes', type=int, help='Select only the topologies with at most this number of nodes.')
+    arg.add_argument('--min-links', type=int, help='Select only the topologies with at least this number of links.')
+    arg.add_argument('--max-links', type=int, help='Select only the topologies with at most this number of links.')
+    arg.add_argument('-w', '--workers', type=int, default=1, help='The number of local workers (default: 1).')
+    arg.add_argument('--workspaces', help='The folder of the workspaces of the jobs (default: workspaces).')
+    arg.add_argument('-f', '--force', action='store_true',
+                     help='Execute all simulations, even the ones already completed with the same fingerprint.')
+    arg.add_argument('-n', '--dry-run', action='store_true', help='Print the schedule without executing the jobs.')
+    args = arg.parse_args()
+
+    batch = Batch(args.config_file, args.workers, args.workspaces, ['--force'] if args.force else [])
+    topologies = Batch.select_topologies(args.topologies, args.min_nodes, args.max_nodes, args.min_links,
+                                         args.max_links)
+    jobs = batch.plan(topologies)
+    if args.dry_run:
+        # Print the schedule: the jobs of each worker, with their estimated cost
+        scheduler = batch.schedule(jobs)
+        for worker, worker_jobs in enumerate(batch.get_queues()):
+            for job in worker_jobs:
+                print('%s\t%s\t%.1f' % (worker, job.get_id(), scheduler.estimate(job)))
+        return
+    finished = batch.run(jobs)
+    # Exit with an error if any job failed or has not been executed
+    if len(finished) < len(jobs) or any(code != 0 for job, start, elapsed, code in finished):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#! /usr/bin/env python
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+from utils.benchmark import Benchmark, SCALE_NAMES, STAGE_NAMES, STAGES
+from utils.log import Logger
+
+"""
+Command line interface to the benchmark suite of the framework (see utils.benchmark): it measures the throughput and the
+peak memory of the selected stages at the selected scales, saves the results as JSON and compares them with a baseline,
+exiting with an error if any stage regressed by more than the threshold. Stages are executed into a temporary
+workspace, thus neither Mininet nor root privileges are needed.
+"""
+
+
+'''
+Format a number of bytes.
+'''
+
+
+def format_bytes(value):
+    return '%.1f MB' % (value / 1048576.0)
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Benchmark the hot paths of the Comparison Framework')
+    arg.add_argument('-s', '--stages', default=','.join(STAGE_NAMES),
+                     help='Comma separated stages to benchmark (default: %s).' % ','.join(STAGE_NAMES))
+    arg.add_argument('--scales', default='small,medium',
+                     help='Comma separated scales among %s (default: small,medium).' % ','.join(SCALE_NAMES))
+    arg.add_argument('-r', '--repeat', type=int, default=5,
+                     help='The number of executions of each stage at each scale (default: 5).')
+    arg.add_argument('-o', '--output', default='benchmarks/results.json',
+                     help='The file in which results are saved (default: benchmarks/results.json).')
+    arg.add_argument('-b', '--baseline', default='benchmarks/baseline.json',
+                     help='The results to compare with (default: benchmarks/baseline.json).')
+    arg.add_argument('--threshold', type=float, default=0.1,
+                     help='The relative worsening of throughput or peak memory considered a regression (default: 0.1).')
+    arg.add_argument('--save-baseline', action='store_true', help='Save the results as the new baseline.')
+    args = arg.parse_args()
+
+    stages = [stage for stage in STAGES if stage.get_name() in args.stages.split(',')]
+    scales = [scale for scale in SCALE_NAMES if scale in args.scales.split(',')]
+    if not stages or not scales:
+        arg.error('No stage or scale has been selected.')
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline)
+
+    # The stages write their logs and files into a temporary workspace
+    workspace = tempfile.mkdtemp(prefix='benchmark-')
+    os.mkdir(os.path.join(workspace, 'log'))
+    os.mkdir(os.path.join(workspace, 'tmp'))
+    root = os.getcwd()
+    os.chdir(workspace)
+    try:
+        Logger.get_instance().set_console_level(logging.WARNING)
+        benchmark = Benchmark(os.path.join(workspace, 'inputs'), args.repeat)
+        print('%-20s %-7s %7s %12s %12s %16s %10s' % ('stage', 'scale', 'size', 'best (s)', 'median (s)',
+                                                     'throughput', 'peak'))
+        for stage in stages:
+            for scale in scales:
+                result = benchmark.measure(stage, scale)
+                print('%-20s %-7s %7s %12.4f %12.4f %16s %10s' % (
+                    stage.get_name(), scale, result['size'], result['best'], result['median'],
+                    '%.0f %s/s' % (result['throughput'], result['unit']) if result['throughput'] else '-',
+                    format_bytes(result['peak_memory'])))
+    finally:
+        os.chdir(root)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    benchmark.save(output)
+    print('Results have been saved into %s.' % output)
+    if args.save_baseline:
+        benchmark.save(baseline)
+        print('Baseline has been saved into %s.' % baseline)
+        return
+    if not os.path.exists(baseline):
+        print('No baseline to compare with: save one with --save-baseline.')
+        return
+    regressions = Benchmark.compare(benchmark.get_results(), Benchmark.load(baseline), args.threshold)
+    for key, measure, value, baseline_value, change in regressions:
+        if measure == 'peak_memory':
+            value, baseline_value = format_bytes(value), format_bytes(baseline_value)
+        else:
+            value, baseline_value = '%.0f/s' % value, '%.0f/s' % baseline_value
+        print('REGRESSION %s %s: %s (baseline %s, %+.1f%%)' % (key, measure, value, baseline_value, change * 100))
+    if regressions:
+        sys.exit(1)
+    print('No regression with respect to %s (threshold %.0f%%).' % (baseline, args.threshold * 100))
+
+if __name__ == '__main__':
+    main()
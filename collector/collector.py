@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
-from threading import Thread
+from threading import Thread, Event
+import time
+import traceback
 
 import utils.class_for_name as Class
 from utils.log import Logger
@@ -61,7 +63,12 @@ class FactoryCollector(object):
 
 """
 Abstract class that model a collector. A Collector extends Thread: this implies that each collector will be executed in
-a separated thread with respect to the execution of the environment.
+a separated thread with respect to the execution of the environment. The lifecycle of a collector is the following:
+ 1. it is started;
+ 2. it becomes ready, namely it is actually collecting data (see _set_ready);
+ 3. it is stopped (see stop): collect_data has to return as soon as possible;
+ 4. its data are flushed, namely they have been completely written and can be read by extractors. This happens when
+    collect_data returns, even if it fails.
 """
 
 
@@ -73,6 +80,14 @@ class Collector(Thread):
         Thread.__init__(self)
         # Logger
         self._log = Logger.get_instance()
+        # Parameters of the metric, as declared in the configuration file
+        self._parameters = {}
+        # The overlay on which the simulation is running on
+        self._overlay = None
+        # Events of the lifecycle
+        self._ready_event = Event()
+        self._stop_event = Event()
+        self._flushed_event = Event()
 
     '''
     Return the name of this collector.
@@ -81,8 +96,133 @@ class Collector(Thread):
         return self.__class__.__name__
 
     '''
-    This method implements the strategy for collecting data.
+    Set the parameters of the metric, as declared in the configuration file.
+    '''
+    def set_parameters(self, parameters):
+        self._parameters = dict(parameters)
+
+    '''
+    Return the value of a parameter of the metric converted by cast, or default if it has not been declared.
+    '''
+    def get_parameter(self, name, default=None, cast=str):
+        value = self._parameters.get(name)
+        if value is None:
+            return default
+        return cast(value)
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    def set_overlay(self, overlay):
+        self._overlay = overlay
+
+    '''
+    Signal that this collector is actually collecting data.
+    '''
+    def _set_ready(self):
+        self._ready_event.set()
+        self._log.debug(self.__class__.__name__, 'Collector is ready.')
+
+    '''
+    Wait until this collector is ready, or timeout (seconds) expires. Return True if the collector is ready.
+    '''
+    def wait_ready(self, timeout=None):
+        self._ready_event.wait(timeout)
+        return self._ready_event.is_set()
+
+    '''
+    Ask this collector to stop collecting data.
+    '''
+    def stop(self):
+        self._stop_event.set()
+
+    '''
+    Return True if this collector has been asked to stop.
+    '''
+    def is_stopped(self):
+        return self._stop_event.is_set()
+
+    '''
+    Return True if, according to the collected data, the alternative has converged, False if it has not, or None if
+    this collector is not able to tell it.
+    '''
+    def is_converged(self):
+        return None
+
+    '''
+    Wait until the data of this collector have been flushed, or timeout (seconds) expires. Return True if data have
+    been flushed.
+    '''
+    def wait_flushed(self, timeout=None):
+        self._flushed_event.wait(timeout)
+        return self._flushed_event.is_set()
+
+    '''
+    This method implements the strategy for collecting data. It has to collect data until the collector is stopped,
+    and to write them before returning.
     '''
     @abstractmethod
     def collect_data(self):
         pass
+
+    '''
+    Run the thread containing the collector.
+    '''
+    def run(self):
+        try:
+            self.collect_data()
+        except Exception:
+            self._log.error(self.__class__.__name__, 'Collection failed: %s', traceback.format_exc())
+        finally:
+            # Do not keep waiting who waits for this collector
+            self._ready_event.set()
+            self._flushed_event.set()
+            self._log.info(self.__class__.__name__, 'Data have been flushed.')
+
+"""
+Abstract class that models a collector which periodically samples the environment. A sample is taken every "interval"
+seconds until the collector is stopped, or for at most "duration" seconds if this parameter is declared; then the
+samples are flushed.
+"""
+
+
+class SamplingCollector(Collector):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        Collector.__init__(self)
+
+    '''
+    Take a sample. The timestamp is the same for the whole sample.
+    '''
+    @abstractmethod
+    def sample(self, timestamp):
+        pass
+
+    '''
+    Store all samples taken so far.
+    '''
+    @abstractmethod
+    def flush(self):
+        pass
+
+    '''
+    Collect data for this collector, namely sample until the duration expires or the collector is stopped.
+    '''
+    def collect_data(self):
+        interval = self.get_parameter('interval', 1.0, float)
+        duration = self.get_parameter('duration', None, float)
+        start = time.time()
+        self._log.info(self.__class__.__name__, 'Starting to sample every %s seconds.', interval)
+        try:
+            while not self._stop_event.is_set() and (duration is None or time.time() - start < duration):
+                timestamp = time.time()
+                self.sample(timestamp)
+                self._set_ready()
+                # Wait for the next sample, taking into account the time spent for this one
+                self._stop_event.wait(max(0.0, interval - (time.time() - timestamp)))
+        finally:
+            # Samples taken so far are stored even if sampling failed
+            self.flush()
+        self._log.info(self.__class__.__name__, 'Sampling has been finished.')
@@ -0,0 +1,112 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+import psutil
+
+from collector.collector import SamplingCollector
+from loader.env.controller import ControllerStarter
+from utils.fs import FileSystem
+from utils.process import ProcessTree
+
+"""
+This class models an abstract controller resources collector, namely a collector that periodically samples the
+resources used by the controller.
+"""
+
+
+class ControllerResources(SamplingCollector):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        SamplingCollector.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Take a sample.
+    '''
+    @abstractmethod
+    def sample(self, timestamp):
+        pass
+
+    '''
+    Store all samples taken so far.
+    '''
+    @abstractmethod
+    def flush(self):
+        pass
+
+"""
+This class models a controller resources collector for Mininet environment. The controller process is found through
+the pid file written by loader.env.controller.ControllerStarter, checking its creation time too (a pid file left by an
+interrupted execution may name an unrelated process); then, the resources of its whole process tree are sampled (see
+utils.process.ProcessTree). Samples taken while the controller is not running are skipped. The samples are stored into
+TMP folder (controller-resources.npz, with arrays timestamps, fields and samples, the latter indexed by [sample,
+field]).
+"""
+
+
+class MininetControllerResources(ControllerResources):
+
+    SAMPLES_FILE_NAME = 'controller-resources.npz'
+
+    def __init__(self):
+        ControllerResources.__init__(self)
+        # The (pid, create_time) tuple read from the pid file, and the process tree of the controller it identifies,
+        # created as soon as the controller is running
+        self._recorded = None
+        self._tree = None
+        # Timestamps of the samples and sampled values
+        self._timestamps = []
+        self._samples = []
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Return the process tree of the controller, or None if the controller is not running.
+    '''
+    def _get_tree(self):
+        recorded = ControllerStarter.read_pid_file()
+        if recorded != self._recorded:
+            # The pid file has been written (or replaced, e.g. a stale one) since the last sample
+            self._recorded = recorded
+            self._tree = None
+        if self._tree is None:
+            process = ControllerStarter.find_process(recorded)
+            if process is None:
+                return None
+            try:
+                self._tree = ProcessTree(process.pid)
+            except psutil.NoSuchProcess:
+                return None
+            self._log.debug(self.__class__.__name__, 'Controller has been found: %s.', self._tree)
+        return self._tree
+
+    '''
+    Take a sample.
+    '''
+    def sample(self, timestamp):
+        tree = self._get_tree()
+        if tree is None:
+            return
+        try:
+            sample = tree.sample()
+        except psutil.NoSuchProcess:
+            # The controller has terminated
+            self._tree = None
+            return
+        self._timestamps.append(timestamp)
+        self._samples.append([sample[field] for field in ProcessTree.FIELDS])
+
+    '''
+    Store all samples taken so far into TMP folder.
+    '''
+    def flush(self):
+        self._log.debug(self.__class__.__name__, 'Writing %s samples into temporary folder.', len(self._timestamps))
+        np.savez_compressed(self._fs.get_tmp_folder() + '/' + self.SAMPLES_FILE_NAME,
+                            timestamps=np.array(self._timestamps, dtype=np.float64),
+                            fields=np.array(ProcessTree.FIELDS, dtype=str),
+                            samples=np.array(self._samples, dtype=np.float64).reshape(
+                                len(self._timestamps), len(ProcessTree.FIELDS)))
@@ -1,8 +1,16 @@
 from abc import ABCMeta, abstractmethod
+from threading import Thread
+import json
+import os
+import time
+
+import numpy as np
 
 from collector.collector import Collector
 from utils.fs import FileSystem
 from utils.network import Sniffer
+from utils.openflow import OpenFlowAccumulator
+from utils.prefix import PrefixTrie
 
 """
 This class models an abstract DeviceLoad extractor
@@ -19,6 +27,20 @@ class ControlPlaneMessages(Collector):
         # Logger
         self._fs = FileSystem.get_instance()
 
+    '''
+    Return the subnets of all VPNs' sites defined over the overlay, as a PrefixTrie whose values are VPN names.
+    '''
+    @staticmethod
+    def get_vpn_networks(overlay):
+        vpn_networks = PrefixTrie()
+        # Only VPN overlays define VPNs
+        if not hasattr(overlay, 'get_vpns'):
+            return vpn_networks
+        for vpn in overlay.get_vpns().values():
+            for site in vpn.get_sites():
+                vpn_networks.insert(str(site.get_network()), vpn.get_name())
+        return vpn_networks
+
     '''
     Collect data for this metric.
     '''
@@ -29,32 +51,116 @@ class ControlPlaneMessages(Collector):
 
 """
 This class models a control plane messages collector for Mininet environment. This means starting a Sniffer on lo
-interface and collecting messages into a pcap file inside TMP folder.
+interface and collecting messages into a pcap file inside TMP folder. If the parameter "online" is "yes", packets are
+also analyzed as they arrive (see utils.openflow.OpenFlowAccumulator): the values of the accumulators are published
+every "publish_interval" seconds into a summary inside TMP folder, and the alternative is considered converged when no
+state-changing message has been sniffed for "quiet_period" seconds. At the end, the summary and the messages of each
+time window (parameter "window", in seconds) are written, thus the pcap file is not needed anymore: it is not stored if
+the parameter "store" is "no".
 """
 
 
 class MininetControlPlaneMessages(ControlPlaneMessages):
 
+    SNIFF_FILE_NAME = 'sniff.pcap'
+    SUMMARY_FILE_NAME = 'cp-online.json'
+    RATES_FILE_NAME = 'cp-online.npz'
+
     def __init__(self):
         ControlPlaneMessages.__init__(self)
+        # The accumulators of the online analysis, if any
+        self._accumulator = None
+        # The time (seconds) without state-changing messages after which the alternative is considered converged
+        self._quiet_period = None
 
     def __repr__(self):
         return self.__class__.__name__
 
+    '''
+    Return the summary written by the online analysis, or None if it is not available.
+    '''
+    @classmethod
+    def load_summary(cls):
+        summary_file_name = FileSystem.get_instance().get_tmp_folder() + '/' + cls.SUMMARY_FILE_NAME
+        if not os.path.exists(summary_file_name):
+            return None
+        with open(summary_file_name) as summary_file:
+            return json.load(summary_file)
+
+    '''
+    Return True if no state-changing message has been sniffed during the quiet period, or None if packets are not
+    analyzed online.
+    '''
+    def is_converged(self):
+        if self._accumulator is None:
+            return None
+        last_change = self._accumulator.get_last_change()
+        return last_change is not None and time.time() - last_change >= self._quiet_period
+
+    '''
+    Remove the files of a previous collection, so that extractors do not read them.
+    '''
+    def _clean(self):
+        for file_name in (self.SNIFF_FILE_NAME, self.SUMMARY_FILE_NAME, self.RATES_FILE_NAME):
+            path = self._fs.get_tmp_folder() + '/' + file_name
+            if os.path.exists(path):
+                self._fs.delete(path)
+
+    '''
+    Write the current values of the accumulators into the summary. The file is replaced atomically, so that it can be
+    read at any time.
+    '''
+    def _write_summary(self):
+        summary = self._accumulator.get_summary()
+        summary_file_name = self._fs.get_tmp_folder() + '/' + self.SUMMARY_FILE_NAME
+        with open(summary_file_name + '.part', 'w') as summary_file:
+            json.dump(summary, summary_file, indent=1, sort_keys=True)
+        os.rename(summary_file_name + '.part', summary_file_name)
+        return summary
+
+    '''
+    Publish the values of the accumulators every interval seconds, until the collector is stopped.
+    '''
+    def _publish(self, interval):
+        while not self._stop_event.wait(interval):
+            summary = self._write_summary()
+            self._log.info(self.__class__.__name__, 'Packets: %s; last state change: %s; rates: %s.',
+                           summary['packets'], summary['last_change'], summary['rates'])
+
     '''
     Collect data for this collector.
     '''
     def collect_data(self):
+        online = self.get_parameter('online', 'no') == 'yes'
+        store = self.get_parameter('store', 'yes') == 'yes'
+        if not online and not store:
+            self._log.warning(self.__class__.__name__, 'Packets are not analyzed online: the sniff will be stored.')
+            store = True
+        self._clean()
         self._log.debug(self.__class__.__name__, 'Creating a new sniffer on interface lo.')
         # Starting a sniffer
-        self._sniffer = Sniffer('lo', self._fs.get_tmp_folder() + '/sniff.pcap')
+        self._sniffer = Sniffer('lo', self._fs.get_tmp_folder() + '/' + self.SNIFF_FILE_NAME if store else None)
+        publisher = None
+        if online:
+            self._quiet_period = self.get_parameter('quiet_period', 5.0, float)
+            self._accumulator = OpenFlowAccumulator(self.get_parameter('window', 1.0, float),
+                                                    self.get_vpn_networks(self._overlay))
+            self._sniffer.add_listener(self._accumulator.feed)
+            publisher = Thread(target=self._publish, args=(self.get_parameter('publish_interval', 5.0, float),))
+            publisher.daemon = True
+            publisher.start()
         # Sniff data
         self._log.info(self.__class__.__name__, 'Starting to sniff control plane messages.')
-        self._sniffer.sniff()
+        try:
+            self._sniffer.sniff(self._stop_event, self._set_ready)
+        finally:
+            if online:
+                # The publisher has to stop even if sniffing failed
+                self._stop_event.set()
+                publisher.join()
+                self._write_summary()
+                start, messages, volume = self._accumulator.get_rates()
+                np.savez_compressed(self._fs.get_tmp_folder() + '/' + self.RATES_FILE_NAME,
+                                    window=self._accumulator.get_window(), start=start, messages=messages,
+                                    bytes=volume)
         self._log.info(self.__class__.__name__, 'Sniffer has been finished to collect data.')
-
-    '''
-    Run the thread containing the control plane messages collector.
-    '''
-    def run(self):
-        self.collect_data()
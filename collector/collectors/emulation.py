@@ -0,0 +1,184 @@
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+import psutil
+
+from collector.collector import SamplingCollector
+from utils.fs import FileSystem
+from utils.process import ProcessTree
+
+"""
+This class models an abstract emulation resources collector, namely a collector that periodically samples the resources
+used by the environment emulating the overlay.
+"""
+
+
+class EmulationResources(SamplingCollector):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        SamplingCollector.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Take a sample.
+    '''
+    @abstractmethod
+    def sample(self, timestamp):
+        pass
+
+    '''
+    Store all samples taken so far.
+    '''
+    @abstractmethod
+    def flush(self):
+        pass
+
+"""
+This class models an emulation resources collector for Mininet environment. Mininet runs a shell for each node (whose
+command line ends with "mininet:<node_name>"), and each host lives into its own network namespace; the processes
+started by a node are children of its shell. Switches, instead, share the root namespace and, being userspace
+datapaths, their packet processing is performed by ovs-vswitchd, whose work cannot be split among bridges: thus, each
+node is mapped to the process tree of its shell, while ovs-vswitchd and ovsdb-server are accounted as two further
+groups. For each group, the CPU time (user plus system, cumulative), the RSS and the number of processes are sampled,
+together with the CPU time, the memory and the load average of the whole machine.
+The samples are stored into TMP folder (emulation-resources.npz) with the following arrays:
+ - timestamps: the timestamp of each sample;
+ - groups, kinds, namespaces: name, kind (host, switch or ovs) and network namespace of each group;
+ - cpu, rss, processes: arrays indexed by [sample, group];
+ - system_busy, system_total: the busy and total CPU time of the machine (cumulative, summed over all CPUs);
+ - memory_used, memory_total, loadavg: the memory used, the total memory and the 1-minute load average;
+ - cpus: the number of CPUs.
+"""
+
+
+class MininetEmulationResources(EmulationResources):
+
+    SAMPLES_FILE_NAME = 'emulation-resources.npz'
+    # The prefix of the command line argument identifying the shell of a Mininet node
+    SHELL_PREFIX = 'mininet:'
+    # The Open vSwitch daemons
+    OVS_PROCESSES = ('ovs-vswitchd', 'ovsdb-server')
+
+    def __init__(self):
+        EmulationResources.__init__(self)
+        # The groups of processes, and their kinds. Groups are created upon the first sample
+        self._groups = []
+        self._kinds = []
+        # The network namespace of each group. This is a map<group, string>
+        self._namespaces = {}
+        # Timestamps and samples
+        self._timestamps = []
+        self._samples = dict((name, []) for name in
+                             ('cpu', 'rss', 'processes', 'system_busy', 'system_total', 'memory_used',
+                              'memory_total', 'loadavg'))
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Create the groups of processes starting from the overlay.
+    '''
+    def _create_groups(self):
+        hosts = sorted(self._overlay.get_hosts().keys())
+        switches = sorted(switch.get_name() for switch in self._overlay.get_nodes().values())
+        self._groups = hosts + switches + list(self.OVS_PROCESSES)
+        self._kinds = ['host'] * len(hosts) + ['switch'] * len(switches) + ['ovs'] * len(self.OVS_PROCESSES)
+
+    '''
+    Return the group which a process belongs to, given its name and command line, or None if the process does not
+    belong to any group by itself (it could still belong to the group of an ancestor).
+    '''
+    def _classify(self, name, cmdline, groups):
+        if name in self.OVS_PROCESSES:
+            return name
+        for argument in cmdline[-1:]:
+            if argument.startswith(self.SHELL_PREFIX) and argument[len(self.SHELL_PREFIX):] in groups:
+                return argument[len(self.SHELL_PREFIX):]
+        return None
+
+    '''
+    Return the network namespace of a process, or an empty string if it cannot be read.
+    '''
+    @staticmethod
+    def _get_namespace(pid):
+        try:
+            return os.readlink('/proc/%s/ns/net' % pid)
+        except OSError:
+            return ''
+
+    '''
+    Take a sample.
+    '''
+    def sample(self, timestamp):
+        if not self._groups:
+            self._create_groups()
+        groups = dict((group, i) for i, group in enumerate(self._groups))
+        # Read parent and group of each process; then assign each process to the group of its nearest ancestor
+        parents = {}
+        own_groups = {}
+        processes = {}
+        for process in psutil.process_iter():
+            try:
+                parents[process.pid] = ProcessTree.call(process, 'ppid')
+                own_groups[process.pid] = self._classify(ProcessTree.call(process, 'name'),
+                                                         ProcessTree.call(process, 'cmdline'), groups)
+                processes[process.pid] = process
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        resolved = {}
+        cpu = np.zeros(len(self._groups))
+        rss = np.zeros(len(self._groups))
+        counts = np.zeros(len(self._groups))
+        for pid, process in processes.items():
+            # Walk up the ancestors until a group (or the root) is found
+            chain = []
+            current = pid
+            while current in processes and current not in resolved and own_groups[current] is None:
+                chain.append(current)
+                current = parents[current]
+            group = resolved.get(current, own_groups.get(current))
+            for ancestor in chain:
+                resolved[ancestor] = group
+            resolved[pid] = group
+            if group is None:
+                continue
+            if own_groups[pid] is not None and group not in self._namespaces:
+                self._namespaces[group] = self._get_namespace(pid)
+            try:
+                cpu_times = ProcessTree.call(process, 'cpu_times')
+                memory = ProcessTree.call(process, 'memory_info')
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            cpu[groups[group]] += cpu_times.user + cpu_times.system
+            rss[groups[group]] += memory.rss
+            counts[groups[group]] += 1
+        system = psutil.cpu_times()
+        memory = psutil.virtual_memory()
+        self._timestamps.append(timestamp)
+        self._samples['cpu'].append(cpu)
+        self._samples['rss'].append(rss)
+        self._samples['processes'].append(counts)
+        self._samples['system_total'].append(sum(system))
+        self._samples['system_busy'].append(sum(system) - system.idle - getattr(system, 'iowait', 0.0))
+        self._samples['memory_used'].append(memory.total - memory.available)
+        self._samples['memory_total'].append(memory.total)
+        self._samples['loadavg'].append(os.getloadavg()[0])
+
+    '''
+    Store all samples taken so far into TMP folder.
+    '''
+    def flush(self):
+        self._log.debug(self.__class__.__name__, 'Writing %s samples into temporary folder.', len(self._timestamps))
+        arrays = dict((name, np.array(values, dtype=np.float64)) for name, values in self._samples.items())
+        for name in ('cpu', 'rss', 'processes'):
+            arrays[name] = arrays[name].reshape(len(self._timestamps), len(self._groups))
+        np.savez_compressed(self._fs.get_tmp_folder() + '/' + self.SAMPLES_FILE_NAME,
+                            timestamps=np.array(self._timestamps, dtype=np.float64),
+                            groups=np.array(self._groups, dtype=str), kinds=np.array(self._kinds, dtype=str),
+                            namespaces=np.array([self._namespaces.get(group, '') for group in self._groups],
+                                                dtype=str),
+                            cpus=psutil.cpu_count() if hasattr(psutil, 'cpu_count') else psutil.NUM_CPUS, **arrays)
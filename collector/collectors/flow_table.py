@@ -0,0 +1,156 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+from collector.collector import SamplingCollector
+from utils.flows import FlowEntry, FlowSnapshot, FlowSnapshotStore
+from utils.flowstats import FlowStatsPoller
+from utils.fs import FileSystem
+
+"""
+This class models an abstract flow table sampler, namely a collector that periodically samples the flow tables of all
+switches in the overlay.
+"""
+
+
+class FlowTableSampler(SamplingCollector):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        SamplingCollector.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Take a sample.
+    '''
+    @abstractmethod
+    def sample(self, timestamp):
+        pass
+
+    '''
+    Store all samples taken so far.
+    '''
+    @abstractmethod
+    def flush(self):
+        pass
+
+"""
+This class models a flow table sampler for Mininet environment. The switches are polled through their management
+sockets (see utils.flowstats.FlowStatsPoller): by default only table statistics are requested, which is enough for
+counting the entries of each switch and cheap enough for sub-second intervals. The number of entries of each switch in
+each sample is stored into TMP folder (flow-counts.npz, with arrays timestamps, switches, roles and counts indexed by
+[sample, switch]; -1 marks a switch that did not reply within parameter "poll_timeout" seconds, by default half of the
+interval). If parameter "flows" is "yes", the whole flow tables are requested and stored too (flow-snapshots.npz, see
+utils.flows.FlowSnapshotStore), marking the switches that did not reply as missing.
+"""
+
+
+class MininetFlowTableSampler(FlowTableSampler):
+
+    COUNTS_FILE_NAME = 'flow-counts.npz'
+    SNAPSHOTS_FILE_NAME = 'flow-snapshots.npz'
+
+    def __init__(self):
+        FlowTableSampler.__init__(self)
+        # The poller, created upon the first sample
+        self._poller = None
+        # The names of the switches, sorted
+        self._switches = []
+        # Timestamps of the samples and number of entries of each switch in each sample
+        self._timestamps = []
+        self._counts = []
+        # Flow snapshots (only if parameter flows is "yes")
+        self._snapshots = []
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Return True if whole flow tables have to be sampled.
+    '''
+    def _samples_flows(self):
+        return self.get_parameter('flows', 'no') == 'yes'
+
+    '''
+    Take a sample.
+    '''
+    def sample(self, timestamp):
+        flows = self._samples_flows()
+        if self._poller is None:
+            self._switches = sorted(switch.get_name() for switch in self._overlay.get_nodes().values())
+            # A switch which does not reply within the timeout is missing from the sample: the timeout is shorter than
+            # the interval, thus a slow switch does not delay the following samples
+            interval = self.get_parameter('interval', 1.0, float)
+            self._poller = FlowStatsPoller(self._switches,
+                                           rundir=self.get_parameter('ovs_rundir', '/var/run/openvswitch'),
+                                           timeout=self.get_parameter('poll_timeout', interval / 2, float))
+        stats = self._poller.poll(flows=flows, tables=not flows)
+        counts = []
+        snapshot = FlowSnapshot(timestamp)
+        for switch_name in self._switches:
+            switch_stats = stats[switch_name]
+            if switch_stats['error'] is not None:
+                counts.append(-1)
+                snapshot.set_missing(switch_name)
+            elif flows:
+                entries = [FlowEntry.from_stats(flow) for flow in switch_stats['flows']]
+                snapshot.add_entries(switch_name, entries)
+                counts.append(len(entries))
+            else:
+                counts.append(sum(table['active'] for table in switch_stats['tables']))
+        self._timestamps.append(timestamp)
+        self._counts.append(counts)
+        if flows:
+            self._snapshots.append(snapshot)
+
+    '''
+    Store all samples taken so far into TMP folder.
+    '''
+    def flush(self):
+        if self._poller is not None:
+            self._poller.close()
+        roles = dict((switch.get_name(), switch.get_role()) for switch in self._overlay.get_nodes().values())
+        self._log.debug(self.__class__.__name__, 'Writing %s samples into temporary folder.', len(self._timestamps))
+        np.savez_compressed(self._fs.get_tmp_folder() + '/' + self.COUNTS_FILE_NAME,
+                            timestamps=np.array(self._timestamps, dtype=np.float64),
+                            switches=np.array(self._switches, dtype=str),
+                            roles=np.array([roles[name] for name in self._switches], dtype=str),
+                            counts=np.array(self._counts, dtype=np.int32).reshape(
+                                len(self._timestamps), len(self._switches)))
+        if self._snapshots:
+            FlowSnapshotStore.save(self._fs.get_tmp_folder() + '/' + self.SNAPSHOTS_FILE_NAME, self._snapshots)
+
+"""
+This class models an abstract flow snapshot sampler, namely a flow table sampler that always samples the whole flow
+tables.
+"""
+
+
+class FlowSnapshotSampler(FlowTableSampler):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        FlowTableSampler.__init__(self)
+
+"""
+This class models a flow snapshot sampler for Mininet environment. Samples are stored into TMP folder as the ones of
+MininetFlowTableSampler, but into different files, thus both samplers can run in the same simulation.
+"""
+
+
+class MininetFlowSnapshotSampler(MininetFlowTableSampler):
+
+    COUNTS_FILE_NAME = 'flow-snapshot-counts.npz'
+    SNAPSHOTS_FILE_NAME = 'flow-snapshot-series.npz'
+
+    def __init__(self):
+        MininetFlowTableSampler.__init__(self)
+
+    '''
+    Return True if whole flow tables have to be sampled.
+    '''
+    def _samples_flows(self):
+        return True
@@ -0,0 +1,124 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+
+from collector.collector import SamplingCollector
+from utils.fs import FileSystem
+
+"""
+This class models an abstract interface counters collector, namely a collector that periodically samples the traffic
+counters of the network interfaces used by the overlay.
+"""
+
+
+class InterfaceCounters(SamplingCollector):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        SamplingCollector.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Take a sample.
+    '''
+    @abstractmethod
+    def sample(self, timestamp):
+        pass
+
+    '''
+    Store all samples taken so far.
+    '''
+    @abstractmethod
+    def flush(self):
+        pass
+
+"""
+This class models an interface counters collector for Mininet environment. Counters are read from /proc/net/dev, which
+lists the interfaces of the root namespace: the switch side of each link (Mininet names it <switch>-eth<port>), the
+bridges and lo (which carries the control plane). The names of the interfaces are computed as Mininet does, namely
+numbering the ports of each node, in the order in which links are added, starting from 1 for switches and from 0 for
+hosts; for links between switches, the interface of the first switch is sampled.
+The samples are stored into TMP folder (interface-counters.npz) with the following arrays:
+ - timestamps: the timestamp of each sample;
+ - interfaces, links: the name of each sampled interface and the link (or bridge) it belongs to;
+ - counters: array indexed by [sample, interface, counter], counters being the ones in COUNTERS; NaN marks an
+   interface which did not exist when sampled.
+"""
+
+
+class MininetInterfaceCounters(InterfaceCounters):
+
+    SAMPLES_FILE_NAME = 'interface-counters.npz'
+    # The sampled counters, and their position among the fields of a line of /proc/net/dev
+    COUNTERS = ('rx_bytes', 'rx_packets', 'tx_bytes', 'tx_packets')
+    _COUNTER_FIELDS = (0, 1, 8, 9)
+    PROC_NET_DEV = '/proc/net/dev'
+
+    def __init__(self):
+        InterfaceCounters.__init__(self)
+        # The sampled interfaces and the links they belong to, created upon the first sample
+        self._interfaces = []
+        self._links = []
+        # The position of each interface. This is a map<interface, int>
+        self._positions = {}
+        # Timestamps and samples
+        self._timestamps = []
+        self._counters = []
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Compute the names of the interfaces to sample, starting from the overlay.
+    '''
+    def _create_interfaces(self):
+        switches = set(switch.get_name() for switch in self._overlay.get_nodes().values())
+        # The next port of each node
+        ports = {}
+        for link in self._overlay.get_links():
+            names = []
+            for node in (link.get_from(), link.get_to()):
+                port = ports.get(node.get_name(), 1 if node.get_name() in switches else 0)
+                ports[node.get_name()] = port + 1
+                names.append((node.get_name(), '%s-eth%s' % (node.get_name(), port)))
+            # Only the switch side of a link lives into the root namespace
+            interface = [interface for name, interface in names if name in switches][0]
+            self._interfaces.append(interface)
+            self._links.append('%s-%s' % (names[0][0], names[1][0]))
+        for switch_name in sorted(switches):
+            self._interfaces.append(switch_name)
+            self._links.append(switch_name)
+        self._interfaces.append('lo')
+        self._links.append('lo')
+        self._positions = dict((interface, i) for i, interface in enumerate(self._interfaces))
+
+    '''
+    Take a sample.
+    '''
+    def sample(self, timestamp):
+        if not self._interfaces:
+            self._create_interfaces()
+        counters = np.full((len(self._interfaces), len(self.COUNTERS)), np.nan)
+        with open(self.PROC_NET_DEV) as proc_file:
+            # The first two lines are headers
+            for line in proc_file.readlines()[2:]:
+                interface, fields = line.split(':', 1)
+                position = self._positions.get(interface.strip())
+                if position is not None:
+                    fields = fields.split()
+                    counters[position] = [float(fields[i]) for i in self._COUNTER_FIELDS]
+        self._timestamps.append(timestamp)
+        self._counters.append(counters)
+
+    '''
+    Store all samples taken so far into TMP folder.
+    '''
+    def flush(self):
+        self._log.debug(self.__class__.__name__, 'Writing %s samples into temporary folder.', len(self._timestamps))
+        np.savez_compressed(self._fs.get_tmp_folder() + '/' + self.SAMPLES_FILE_NAME,
+                            timestamps=np.array(self._timestamps, dtype=np.float64),
+                            interfaces=np.array(self._interfaces, dtype=str), links=np.array(self._links, dtype=str),
+                            counters=np.array(self._counters, dtype=np.float64).reshape(
+                                len(self._timestamps), len(self._interfaces), len(self.COUNTERS)))
@@ -1,9 +1,13 @@
 from abc import ABCMeta, abstractmethod
 from threading import Thread
+import time
+import traceback
 
 import utils.class_for_name as Class
 from utils.log import Logger
-from utils.patterns.observer import Observable
+from utils.pool import ProcessPool
+from utils.profiling import Profiler
+from utils.tracing import Tracer
 
 """
 Factory for creating extractors' object.
@@ -61,23 +65,38 @@ class FactoryExtractor(object):
         return self._extractor
 
 """
-Abstract class that model an extractor. An Extractor extends both Thread and Observable object: Thread because the
-extraction is ran in a separated thread with respect to the execution of the environment; Observable because when
-extraction finishes, the extractor notify its observer for stopping the environment.
+Abstract class that model an extractor. An Extractor extends Thread, because the extraction is ran in a separated
+thread with respect to the execution of the environment. All extractors of a simulation run concurrently: they wait
+for a shared start event, set when data are ready to be extracted, and count down a shared latch when they finish, thus
+the simulation knows when the environment can be stopped. Since threads share a single interpreter, extractors whose
+analysis is CPU bound declare it (CPU_BOUND), and execute their heavy work into the shared process pool (_execute).
 """
 
 
-class Extractor(Thread, Observable):
+class Extractor(Thread):
 
     __metaclass__ = ABCMeta
 
+    # Whether the heavy work of this extractor is CPU bound (it can be overridden by the parameter cpu_bound)
+    CPU_BOUND = False
+
     def __init__(self):
         Thread.__init__(self)
-        # This extractor is a observable object, due to the fact that upon extraction finishes, other actions will be
-        # undertaken
-        Observable.__init__(self)
         # Logger
         self._log = Logger.get_instance()
+        # Parameters of the metric, as declared in the configuration file
+        self._parameters = {}
+        # The event set when data are ready, and the latch counted down when the extraction finishes
+        self._start_event = None
+        self._latch = None
+        # Timestamps of the start of the thread, of the start of the extraction and of its end
+        self._started = None
+        self._ready = None
+        self._finished = None
+        # The error which interrupted the extraction, if any
+        self._error = None
+        # The extracted values to store into the results store, as (name, subject, value) tuples
+        self._records = []
 
     '''
     Return the name of this collector.
@@ -85,9 +104,123 @@ class Extractor(Thread, Observable):
     def get_name(self):
         return self.__class__.__name__
 
+    '''
+    Set the parameters of the metric, as declared in the configuration file.
+    '''
+    def set_parameters(self, parameters):
+        self._parameters = dict(parameters)
+
+    '''
+    Return the parameters of the metric.
+    '''
+    def get_parameters(self):
+        return dict(self._parameters)
+
+    '''
+    Return the value of a parameter of the metric converted by cast, or default if it has not been declared.
+    '''
+    def get_parameter(self, name, default=None, cast=str):
+        value = self._parameters.get(name)
+        if value is None:
+            return default
+        return cast(value)
+
+    '''
+    Set the event which signals that data are ready to be extracted and the latch to count down when the extraction
+    finishes.
+    '''
+    def synchronize(self, start_event, latch):
+        self._start_event = start_event
+        self._latch = latch
+
+    '''
+    Return the timings of this extractor, as a map with keys 'wait' (seconds spent waiting for data), 'extraction'
+    (seconds spent extracting data) and 'error' (the error which interrupted the extraction, or None).
+    '''
+    def get_timings(self):
+        timings = {'wait': None, 'extraction': None, 'error': self._error}
+        if self._started is not None and self._ready is not None:
+            timings['wait'] = self._ready - self._started
+        if self._ready is not None and self._finished is not None:
+            timings['extraction'] = self._finished - self._ready
+        return timings
+
+    '''
+    Return the extracted values to store into the results store, as (name, subject, value) tuples.
+    '''
+    def get_records(self):
+        return list(self._records)
+
+    '''
+    Record an extracted value named name, about subject (e.g. a switch; empty if the value is about the whole run). The
+    value is stored into the results store at the end of the simulation; NaN is stored as a missing value.
+    '''
+    def _record(self, name, value, subject=''):
+        value = float(value)
+        self._records.append((name, str(subject), value if value == value else None))
+
+    '''
+    Wait until data are ready to be extracted.
+    '''
+    def _wait_for_data(self):
+        self._log.info(self.__class__.__name__, 'Waiting for data to extract.')
+        if self._start_event is not None:
+            with Tracer.get_instance().span('extractor.wait', extractor=self.get_name()):
+                self._start_event.wait()
+        self._ready = time.time()
+        self._log.info(self.__class__.__name__, 'Data are ready. I am starting to extract data.')
+
+    '''
+    Mark the extraction as failed for a reason other than an exception (e.g. no data have been collected), logging it.
+    The caller is expected to return right after, since the run cannot be completed anyway.
+    '''
+    def _fail(self, message):
+        self._error = message
+        self._log.error(self.__class__.__name__, message)
+
+    '''
+    Return True if the heavy work of this extractor has to be executed into the process pool.
+    '''
+    def is_cpu_bound(self):
+        return self.get_parameter('cpu_bound', 'yes' if self.CPU_BOUND else 'no') == 'yes'
+
+    '''
+    Execute function(*args) and return its result. If this extractor is CPU bound, the function is executed into the
+    process pool: it has to be defined at module level, and both its arguments and its result have to be picklable
+    (e.g. file paths and numpy arrays). The function is executed inline if it is profiled.
+    '''
+    def _execute(self, function, *args):
+        pool = self.is_cpu_bound() and not Profiler.get_instance().is_profiled('extractor.execute')
+        with Tracer.get_instance().span('extractor.execute', extractor=self.get_name(), function=function.__name__,
+                                        pool=pool):
+            if pool:
+                self._log.debug(self.__class__.__name__, 'Executing %s into the process pool.', function.__name__)
+                return ProcessPool.get_instance().apply(function, *args)
+            return function(*args)
+
     '''
     This method implements the strategy for collecting data.
     '''
     @abstractmethod
     def extract_data(self):
         pass
+
+    '''
+    Run the thread in which this extractor is in execution.
+    '''
+    def run(self):
+        self._started = time.time()
+        span = Tracer.get_instance().span('extractor.run', extractor=self.get_name())
+        try:
+            self.extract_data()
+            if self._error is not None:
+                span.set_attribute('error', self._error)
+        except Exception as e:
+            self._error = str(e)
+            span.set_attribute('error', self._error)
+            self._log.error(self.__class__.__name__, 'Extraction failed: %s', traceback.format_exc())
+        finally:
+            span.end()
+            self._finished = time.time()
+            if self._latch is not None:
+                self._latch.count_down()
@@ -0,0 +1,143 @@
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+
+from collector.collectors.controller import MininetControllerResources
+from collector.extractor import Extractor
+from utils.fs import FileSystem
+
+"""
+This class models a controller load extractor. This kind of extractor has in charge the task of measuring the resources
+used by the controller.
+"""
+
+
+class ControllerLoad(Extractor):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        Extractor.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    @abstractmethod
+    def set_simulation_path(self, simulation_path):
+        pass
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    @abstractmethod
+    def set_overlay(self, overlay):
+        pass
+
+    '''
+    Start the process of extracting data.
+    '''
+    @abstractmethod
+    def extract_data(self):
+        pass
+
+"""
+This class implements a controller load extractor for Mininet environment. It is based on a controller resources
+collector: the sampled CPU times and context switches (cumulative) are turned into rates between consecutive samples,
+namely the CPU utilization (1.0 is a whole core) and the context switches per second. The series are stored into
+load.npz (arrays timestamps, fields and series, the latter indexed by [sample, field]; rates are NaN for the first
+sample), while the peak and the mean of each series, together with the CPU time consumed by the controller while being
+sampled, are written into load.data.
+"""
+
+
+class MininetControllerLoad(ControllerLoad):
+
+    # The series computed from the samples
+    FIELDS = ('cpu_utilization', 'rss', 'threads', 'fds', 'ctx_switches_rate', 'processes')
+
+    def __init__(self):
+        ControllerLoad.__init__(self)
+        # Folder in which all extracted data will be stored
+        self._extractor_folder = 'controller-load'
+        # Simulation path for data extraction
+        self._simulation_path = None
+        # The overlay
+        self._overlay = None
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    def set_simulation_path(self, simulation_path):
+        self._simulation_path = simulation_path
+        # Create extractor's folder
+        os.makedirs(self._simulation_path + '/' + self._extractor_folder)
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    def set_overlay(self, overlay):
+        self._overlay = overlay
+
+    '''
+    Compute the series in FIELDS from the samples (indexed by [sample, field], fields being the ones in fields). It
+    returns an array indexed by [sample, series].
+    '''
+    def _compute_series(self, timestamps, fields, samples):
+        column = dict((field, samples[:, i]) for i, field in enumerate(fields))
+        series = np.full((len(timestamps), len(self.FIELDS)), np.nan)
+        elapsed = np.diff(timestamps)
+        cpu = column['cpu_user'] + column['cpu_system']
+        ctx_switches = column['voluntary_ctx_switches'] + column['involuntary_ctx_switches']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            series[1:, 0] = np.diff(cpu) / elapsed
+            series[1:, 4] = np.diff(ctx_switches) / elapsed
+        series[:, 1] = column['rss']
+        series[:, 2] = column['threads']
+        series[:, 3] = column['fds']
+        series[:, 5] = column['processes']
+        return series
+
+    '''
+    Start the process of extracting data.
+    '''
+    def extract_data(self):
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
+        archive = np.load(self._fs.get_tmp_folder() + '/' + MininetControllerResources.SAMPLES_FILE_NAME)
+        try:
+            timestamps = archive['timestamps']
+            fields = list(archive['fields'])
+            samples = archive['samples']
+        finally:
+            archive.close()
+        if len(timestamps) == 0:
+            self._fail('No samples of the controller have been collected.')
+            return
+        series = self._compute_series(timestamps, fields, samples)
+        cpu = samples[:, fields.index('cpu_user')] + samples[:, fields.index('cpu_system')]
+        self._log.debug(self.__class__.__name__, 'Starting to write the controller load into extractor folder.')
+        output_folder = self._simulation_path + '/' + self._extractor_folder
+        np.savez_compressed(output_folder + '/load.npz', timestamps=timestamps, fields=np.array(self.FIELDS),
+                            series=series)
+        with open(output_folder + '/load.data', 'w') as output_file:
+            output_file.write('Samples: %s\n' % len(timestamps))
+            output_file.write('Sampled time (seconds): %s\n' % str(timestamps[-1] - timestamps[0]))
+            output_file.write('CPU time (seconds): %s\n' % str(cpu[-1] - cpu[0]))
+            self._record('cpu_time', cpu[-1] - cpu[0])
+            output_file.write('# series peak mean\n')
+            with np.errstate(invalid='ignore'):
+                for i, field in enumerate(self.FIELDS):
+                    values = series[:, i][~np.isnan(series[:, i])]
+                    if len(values) == 0:
+                        output_file.write('%s nan nan\n' % field)
+                    else:
+                        output_file.write('%s %s %s\n' % (field, values.max(), values.mean()))
+                        self._record('peak', values.max(), field)
+                        self._record('mean', values.mean(), field)
+        self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
@@ -1,11 +1,30 @@
 from abc import ABCMeta, abstractmethod
+import os
 
-from scapy.all import *
-from scapy.layers.inet import TCP
-from scapy.utils import rdpcap
+from scapy.utils import PcapReader
 
+from collector.collectors.cp import ControlPlaneMessages, MininetControlPlaneMessages
 from collector.extractor import Extractor
 from utils.fs import FileSystem
+from utils.openflow import OpenFlowAccumulator
+
+'''
+Analyze the sniff stored into pcap_file by means of an OpenFlowAccumulator, returning its summary. The subnets of the
+VPNs' sites are given by vpn_networks (a PrefixTrie whose values are VPN names). This function is defined at module
+level in order to be executed into the process pool.
+'''
+
+
+def _analyze_capture(pcap_file, vpn_networks):
+    accumulator = OpenFlowAccumulator(vpn_networks=vpn_networks)
+    # Load the sniff packet by packet
+    reader = PcapReader(pcap_file)
+    try:
+        for pkt in reader:
+            accumulator.feed(pkt)
+    finally:
+        reader.close()
+    return accumulator.get_summary()
 
 """
 This class implements an extractor for measuring the convergence time of an alternative.
@@ -44,12 +63,20 @@ class ControlPlaneConvergenceTime(Extractor):
 
 """
 This class implements an extractor for measuring the convergence time of an alternative running on Mininet simulator.
-This extractor is based on a control plane messages collector. The convergence time measure is based on timestamps
-reported in the sniffed packets.
+This extractor is based on a control plane messages collector. The convergence time is the time elapsed from the
+first switch connection to the last state-changing OpenFlow message (FLOW_MOD, GROUP_MOD, BARRIER reply); keepalives
+and TCP acknowledgements are ignored. The alternative is considered converged only if no state-changing message has
+been sniffed during the following quiet period (parameter "quiet_period", in seconds). The convergence time of each VPN
+is computed in the same way, considering only the FLOW_MOD messages matching the subnets of its sites. If the collector
+analyzed the packets online, its summary is used; otherwise, the capture is parsed, which is CPU bound, thus it is
+executed into the process pool.
 """
 
 
 class MininetControlPlaneConvergenceTime(ControlPlaneConvergenceTime):
+
+    CPU_BOUND = True
+
     def __init__(self):
         ControlPlaneConvergenceTime.__init__(self)
         # Folder in which all extracted data will be stored
@@ -80,41 +107,44 @@ class MininetControlPlaneConvergenceTime(ControlPlaneConvergenceTime):
     Start the process of extracting data.
     '''
     def extract_data(self):
-        # First of all, sleep for 1 minute
-        self._log.info(self.__class__.__name__, 'Sleeping waiting for data to extract.')
-        time.sleep(15)
-        self._log.info(self.__class__.__name__, 'I woke up. I am starting to extract data.')
-        # Load the sniff
-        pkts = rdpcap(self._fs.get_tmp_folder() + '/sniff.pcap')
-        # The list of all openflow packets in the sniffing.
-        openflow_packets = []
-        for pkt in pkts:
-            # OpenFlow is not yet implemented as dissector in Scapy, thus just count TCP packets from/to standard
-            # OpenFlow controller port.
-            if TCP in pkt and (pkt[TCP].sport == 6633 or pkt[TCP].dport == 6633):
-                if TCP in pkt:
-                    # Add to the openflow_packet list
-                    openflow_packets.append(pkt)
-        self._log.debug(self.__class__.__name__, 'Calculating the time of the of the last sniffed packet.')
-        # Take the time of the last sniffed packet
-        time_last_packet = openflow_packets[len(openflow_packets) - 1].time
-        self._log.debug(self.__class__.__name__, 'Calculating the time of the of the first sniffed packet.')
-        # Take the time of the first sniffed packet
-        time_first_packet = openflow_packets[0].time
+        # The time (seconds) without state-changing messages after which the alternative is considered converged
+        quiet_period = self.get_parameter('quiet_period', 5.0, float)
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
+        summary = MininetControlPlaneMessages.load_summary()
+        if summary is None:
+            self._log.debug(self.__class__.__name__, 'Looking for state-changing messages in the sniff.')
+            summary = self._execute(_analyze_capture,
+                                    self._fs.get_tmp_folder() + '/' + MininetControlPlaneMessages.SNIFF_FILE_NAME,
+                                    ControlPlaneMessages.get_vpn_networks(self._overlay))
+        else:
+            self._log.debug(self.__class__.__name__, 'Using the summary of the online analysis.')
+        first_connection = summary['first_connection']
+        last_change = summary['last_change']
+        capture_end = summary['capture_end']
+        vpn_last_change = summary['vpn_last_change']
+        if first_connection is None or last_change is None:
+            self._fail('No switch connection or state-changing message has been sniffed.')
+            return
         self._log.debug(self.__class__.__name__, 'Calculating the convergence time.')
         # Calculate the convergence time
-        convergence_time = time_last_packet - time_first_packet
+        convergence_time = last_change - first_connection
+        converged = capture_end - last_change >= quiet_period
+        if not converged:
+            self._log.warning(self.__class__.__name__,
+                              'The capture ended before a quiet period of %s seconds has been observed.', quiet_period)
+        self._record('convergence_time', convergence_time)
+        self._record('converged', converged)
+        for vpn_name, vpn_change in vpn_last_change.items():
+            self._record('convergence_time', vpn_change - first_connection, vpn_name)
         self._log.debug(self.__class__.__name__, 'Starting to write the convergence time into extractor folder.')
         # Write it into a file inside the extractor folder
         output_file_name = self._simulation_path + '/' + self._extractor_folder + '/time.data'
-        output_file = open(output_file_name, 'w')
-        output_file.write('Convergence time (seconds): %s' % str(convergence_time))
+        with open(output_file_name, 'w') as output_file:
+            output_file.write('Convergence time (seconds): %s\n' % str(convergence_time))
+            output_file.write('Quiet period (seconds): %s\n' % str(quiet_period))
+            output_file.write('Converged: %s\n' % ('yes' if converged else 'no'))
+            for vpn_name in sorted(vpn_last_change.keys()):
+                output_file.write('Convergence time of %s (seconds): %s\n' % (
+                    vpn_name, str(vpn_last_change[vpn_name] - first_connection)))
         self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
-        # Notify all observers
-        self.notify_all()
-
-    '''
-    Run the thread in which this extractor is in execution.
-    '''
-    def run(self):
-        self.extract_data()
\ No newline at end of file
@@ -0,0 +1,166 @@
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+
+from collector.collectors.cp import MininetControlPlaneMessages
+from collector.extractor import Extractor
+from utils.fs import FileSystem
+from utils.openflow import OpenFlowCapture, MESSAGE_TYPE_NAMES, DIRECTION_NAMES
+
+'''
+Load the OpenFlow messages from the sniff stored into pcap_file, and bin them into time windows of the given width. It
+returns a tuple (count, start, messages, volume), where count is the number of loaded messages (see
+MininetControlPlaneRate._bin for the others). This function is defined at module level in order to be executed into the
+process pool.
+'''
+
+
+def _load_and_bin(pcap_file, window):
+    capture = OpenFlowCapture.load(pcap_file)
+    start, messages, volume = MininetControlPlaneRate._bin(capture, window)
+    return len(capture), start, messages, volume
+
+"""
+This class implements an extractor for measuring the rate of the control plane messages of an alternative over time.
+"""
+
+
+class ControlPlaneRate(Extractor):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        Extractor.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    @abstractmethod
+    def set_simulation_path(self, simulation_path):
+        pass
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    @abstractmethod
+    def set_overlay(self, overlay):
+        pass
+
+    '''
+    Start the process of extracting data.
+    '''
+    @abstractmethod
+    def extract_data(self):
+        pass
+
+"""
+This class implements an extractor for measuring the rate of control plane messages exchanged by an alternative running
+on Mininet simulator. This extractor is based on a control plane messages collector: the sniffed OpenFlow messages are
+binned into time windows (parameter "window", in seconds) for each direction and each message type. Both the number of
+messages and the number of bytes are stored into a compressed numpy archive (rate.npz) containing the following
+arrays:
+ - window: the width of the time windows;
+ - start: the timestamp of the first sniffed message, namely the start of the first window;
+ - directions, types: the labels of the first two axes of messages and bytes;
+ - messages, bytes: arrays indexed by [direction, type, window].
+If the collector analyzed the messages online with the same window, its rates are used; otherwise, the capture is
+parsed, which is CPU bound, thus it is executed into the process pool.
+"""
+
+
+class MininetControlPlaneRate(ControlPlaneRate):
+
+    CPU_BOUND = True
+
+    def __init__(self):
+        ControlPlaneRate.__init__(self)
+        # Folder in which all extracted data will be stored
+        self._extractor_folder = 'cp-rate'
+        # Simulation path for data extraction
+        self._simulation_path = None
+        # The overlay
+        self._overlay = None
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    def set_simulation_path(self, simulation_path):
+        self._simulation_path = simulation_path
+        # Create extractor's folder
+        os.makedirs(self._simulation_path + '/' + self._extractor_folder)
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    def set_overlay(self, overlay):
+        self._overlay = overlay
+
+    '''
+    Bin the messages of the capture into time windows of the given width. All counters are computed in a single pass,
+    by means of a linear index over [direction, type, window].
+    '''
+    @staticmethod
+    def _bin(capture, window):
+        timestamps = capture.get_timestamps()
+        start = timestamps.min() if len(timestamps) > 0 else 0.0
+        bins = np.floor((timestamps - start) / window).astype(np.int64)
+        number_of_bins = int(bins.max()) + 1 if len(bins) > 0 else 0
+        shape = (len(DIRECTION_NAMES), len(MESSAGE_TYPE_NAMES), number_of_bins)
+        index = (capture.get_directions().astype(np.int64) * shape[1] + capture.get_types()) * shape[2] + bins
+        size = shape[0] * shape[1] * shape[2]
+        messages = np.bincount(index, minlength=size).reshape(shape)
+        volume = np.bincount(index, weights=capture.get_lengths(), minlength=size).reshape(shape)
+        return start, messages.astype(np.int32), volume.astype(np.int64)
+
+    '''
+    Return the rates computed by the online analysis as a tuple (start, messages, volume), or None if they are not
+    available or their windows are not wide window seconds.
+    '''
+    def _load_online_rates(self, window):
+        rates_file_name = self._fs.get_tmp_folder() + '/' + MininetControlPlaneMessages.RATES_FILE_NAME
+        if not os.path.exists(rates_file_name):
+            return None
+        archive = np.load(rates_file_name)
+        try:
+            if float(archive['window']) != window:
+                return None
+            return float(archive['start']), archive['messages'], archive['bytes']
+        finally:
+            archive.close()
+
+    '''
+    Start the process of extracting data.
+    '''
+    def extract_data(self):
+        # The width of the time windows (seconds)
+        window = self.get_parameter('window', 1.0, float)
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
+        rates = self._load_online_rates(window)
+        if rates is None:
+            # Load the OpenFlow messages from the sniff, and bin them
+            count, start, messages, volume = self._execute(
+                _load_and_bin, self._fs.get_tmp_folder() + '/' + MininetControlPlaneMessages.SNIFF_FILE_NAME, window)
+            self._log.debug(self.__class__.__name__, 'Binned %s messages into windows of %s seconds.', count, window)
+        else:
+            self._log.debug(self.__class__.__name__, 'Using the rates of the online analysis.')
+            start, messages, volume = rates
+        for i, type_name in enumerate(MESSAGE_TYPE_NAMES):
+            if messages[:, i].any():
+                self._record('messages', messages[:, i].sum(), type_name)
+        for i, direction_name in enumerate(DIRECTION_NAMES):
+            self._record('bytes', volume[i].sum(), direction_name)
+        if messages.shape[2] > 0:
+            self._record('peak_rate', messages.sum(axis=(0, 1)).max() / window)
+        self._log.debug(self.__class__.__name__, 'Starting to write the rates into extractor folder.')
+        # Write them into a file inside the extractor folder
+        output_file_name = self._simulation_path + '/' + self._extractor_folder + '/rate.npz'
+        np.savez_compressed(output_file_name, window=window, start=start, directions=np.array(DIRECTION_NAMES),
+                            types=np.array(MESSAGE_TYPE_NAMES), messages=messages, bytes=volume)
+        self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
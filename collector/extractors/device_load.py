@@ -1,10 +1,16 @@
 from abc import ABCMeta, abstractmethod
-from subprocess import Popen
+from multiprocessing.pool import ThreadPool
+from subprocess import Popen, PIPE
 import os
 import time
 
+import numpy as np
+
 from collector.extractor import Extractor
+from utils.flows import FlowEntry, FlowSnapshot, FlowSnapshotStore
+from utils.flowstats import FlowStatsPoller
 from utils.fs import FileSystem
+from utils.prefix import PrefixTrie
 
 """
 This class models a device load extractor. This kind of extractor has in charge the task of dumping the routing tables.
@@ -44,7 +50,13 @@ class DeviceLoad(Extractor):
 """
 This class implements an extractor for measuring the device load in terms of how many entries are installed inside the
 routing table. Being an implementation for Mininet, this extractor simply runs an ovs-ofctl dump-flows command on each
-switch in the overlay, and it stores the output inside the extractor folder.
+switch in the overlay, and it parses the output into flow entries. Switches are dumped in parallel by a bounded pool of
+workers (parameter "workers"). The entries of all switches are stored into a single columnar archive (flows.npz, see
+utils.flows.FlowSnapshotStore), while the time taken by each dump, its errors, the number of entries of each switch
+and the timestamp of the whole snapshot are stored into snapshot.data.
+With parameter "backend" set to "openflow", the flow tables are instead requested directly to the management socket of
+each switch (see utils.flowstats.FlowStatsPoller), without running any process: all switches are polled at once, and
+the duration of each switch is the time its replies took.
 """
 
 
@@ -75,38 +87,193 @@ class MininetDeviceLoad(DeviceLoad):
     def set_overlay(self, overlay):
         self._overlay = overlay
 
+    '''
+    Dump the flow table of a switch. It returns a tuple (switch_name, duration, return_code, error, entries).
+    '''
+    def _dump_switch(self, switch):
+        self._log.debug(self.__class__.__name__, 'Extracting routing table from %s', switch.get_name())
+        start = time.time()
+        # Command for extracting data
+        cmd = ['sudo', 'ovs-ofctl', '-O', 'OpenFlow13', 'dump-flows', switch.get_name()]
+        entries = []
+        try:
+            # Create a new subprocess whose output will be parsed into flow entries
+            extractor = Popen(args=cmd, stdout=PIPE, stderr=PIPE)
+            # Wait for process termination
+            output, error = extractor.communicate()
+            error = error.strip()
+            return_code = extractor.returncode
+            entries = FlowEntry.parse_dump(output)
+        except OSError as e:
+            error = str(e)
+            return_code = -1
+        if return_code != 0:
+            self._log.error(self.__class__.__name__, 'Unable to extract routing table from %s: %s',
+                            switch.get_name(), error)
+        return switch.get_name(), time.time() - start, return_code, error, entries
+
+    '''
+    Poll the flow tables of all switches through their management sockets. It returns a list of tuples
+    (switch_name, duration, return_code, error, entries).
+    '''
+    def _poll_switches(self, switches):
+        poller = FlowStatsPoller([switch.get_name() for switch in switches],
+                                 rundir=self.get_parameter('ovs_rundir', '/var/run/openvswitch'))
+        try:
+            stats = poller.poll(flows=True)
+        finally:
+            poller.close()
+        results = []
+        for switch_name, switch_stats in stats.items():
+            if switch_stats['error'] is not None:
+                self._log.error(self.__class__.__name__, 'Unable to extract routing table from %s: %s',
+                                switch_name, switch_stats['error'])
+                results.append((switch_name, switch_stats['duration'], -1, switch_stats['error'], []))
+            else:
+                entries = [FlowEntry.from_stats(flow) for flow in switch_stats['flows']]
+                results.append((switch_name, switch_stats['duration'], 0, '', entries))
+        return results
+
+    '''
+    Further analyze the snapshot, once it has been stored. Subclasses can override this method, by default it does
+    nothing.
+    '''
+    def _analyze_snapshot(self, snapshot):
+        pass
+
     '''
     Start the process of extracting data.
     '''
     def extract_data(self):
-        # First of all, sleep for 1 minute
-        self._log.info(self.__class__.__name__, 'Sleeping waiting for data to extract.')
-        time.sleep(15)
-        self._log.info(self.__class__.__name__, 'I woke up. I am starting to extract data.')
+        # The maximum number of switches dumped at the same time
+        workers = self.get_parameter('workers', 16, int)
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
         switches = self._overlay.get_nodes()
-        # Probably put here the creation of the folder which will contain all datapaths' flow tables.
-        for switch in switches.values():
-            self._log.debug(self.__class__.__name__, 'Extracting routing table from %s', switch.get_name())
-            # Command for extracting data
-            cmd = 'sudo ovs-ofctl -O OpenFlow13 dump-flows ' + switch.get_name()
-            # File into the simulation folder in which storing data
-            output_file_name = self._simulation_path + '/' + self._extractor_folder + '/' + switch.get_name() + '.data'
-            # Create a file starting from its name
-            output_file = open(output_file_name, 'w')
-            self._log.debug(self.__class__.__name__, 'Starting to write the convergence time into extractor folder.')
-            # Create a new subprocess whose output will be redirect into output_file
-            extractor = Popen(args=cmd, stdout=output_file, shell=True)
-            # Write data on disk
-            output_file.flush()
-            os.fsync(output_file.fileno())
-            # Wait for process termination
-            extractor.wait()
+        # The timestamp of the snapshot is the same for all switches
+        snapshot_timestamp = time.time()
+        if self.get_parameter('backend', 'ofctl') == 'openflow':
+            results = self._poll_switches(switches.values())
+        else:
+            pool = ThreadPool(max(1, min(workers, len(switches))))
+            try:
+                results = pool.map(self._dump_switch, switches.values())
+            finally:
+                pool.close()
+                pool.join()
+        snapshot_duration = time.time() - snapshot_timestamp
+        snapshot = FlowSnapshot(snapshot_timestamp)
+        for switch_name, duration, return_code, error, entries in results:
+            snapshot.add_entries(switch_name, entries)
+        self._log.debug(self.__class__.__name__, 'Starting to write the flow entries into extractor folder.')
+        FlowSnapshotStore.save(self._simulation_path + '/' + self._extractor_folder + '/flows.npz', [snapshot])
+        output_file_name = self._simulation_path + '/' + self._extractor_folder + '/snapshot.data'
+        with open(output_file_name, 'w') as output_file:
+            output_file.write('Snapshot timestamp: %s\n' % str(snapshot_timestamp))
+            output_file.write('Snapshot duration (seconds): %s\n' % str(snapshot_duration))
+            for switch_name, duration, return_code, error, entries in sorted(results):
+                output_file.write('%s entries=%s duration=%s return_code=%s error=%s\n' % (
+                    switch_name, len(entries), str(duration), str(return_code), error))
+                self._record('entries', len(entries), switch_name)
+        self._record('entries', sum(len(result[4]) for result in results))
+        self._record('snapshot_duration', snapshot_duration)
+        self._analyze_snapshot(snapshot)
         self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
-        # Notify all observers
-        self.notify_all()
+
+"""
+This class models a VPN device load extractor, namely a device load extractor that attributes the entries of the routing
+tables to the VPNs. Entries which cannot be attributed to a single VPN are accounted under the pseudo-VPNs UNATTRIBUTED
+and SHARED.
+"""
+
+
+class VpnDeviceLoad(DeviceLoad):
+
+    __metaclass__ = ABCMeta
+
+    UNATTRIBUTED = 'unattributed'
+    SHARED = 'shared'
+
+    def __init__(self):
+        DeviceLoad.__init__(self)
+
+"""
+This class implements a VPN device load extractor for Mininet environment. The routing tables are extracted as done by
+MininetDeviceLoad; then, each entry is attributed to a VPN by looking up the IPv4 fields of its match into an index of
+the subnets of all VPNs' sites (see utils.prefix.PrefixTrie). An entry whose fields belong to a single VPN is attributed
+to that VPN; an entry without IPv4 fields belonging to a site (e.g. MPLS switching entries) is "unattributed", while an
+entry whose fields belong to different VPNs is "shared".
+The number of entries of each VPN on each switch is stored into attribution.npz (arrays vpns, switches, roles and
+entries, indexed by [vpn, switch]); for each VPN, vpn.data reports the number of entries and its footprint, namely the
+number of P and PE switches holding at least one of its entries and the number of entries on them.
+"""
+
+
+class MininetVpnDeviceLoad(MininetDeviceLoad, VpnDeviceLoad):
+
+    def __init__(self):
+        MininetDeviceLoad.__init__(self)
+        # Folder in which all extracted data will be stored
+        self._extractor_folder = 'vpn-device-load'
+
+    '''
+    Build the index of the subnets of all VPNs' sites. Values are VPN names.
+    '''
+    def _build_vpn_index(self):
+        index = PrefixTrie()
+        # Only VPN overlays define VPNs
+        if not hasattr(self._overlay, 'get_vpns'):
+            return index
+        for vpn in self._overlay.get_vpns().values():
+            for site in vpn.get_sites():
+                index.insert(str(site.get_network()), vpn.get_name())
+        return index
+
+    '''
+    Return the name of the VPN which an entry is attributed to.
+    '''
+    def _attribute(self, entry, index, cache):
+        vpns = set()
+        for value in entry.get_ipv4_matches():
+            # Many entries share the same fields, thus lookups are cached
+            if value not in cache:
+                cache[value] = index.lookup(value)
+            if cache[value] is not None:
+                vpns.add(cache[value])
+        if not vpns:
+            return self.UNATTRIBUTED
+        if len(vpns) > 1:
+            return self.SHARED
+        return vpns.pop()
 
     '''
-    Run the thread in which this extractor is in execution.
+    Attribute the entries of the snapshot to the VPNs.
     '''
-    def run(self):
-        self.extract_data()
+    def _analyze_snapshot(self, snapshot):
+        index = self._build_vpn_index()
+        self._log.debug(self.__class__.__name__, 'Attributing flow entries to %s VPN subnets.', len(index))
+        vpns = sorted(self._overlay.get_vpns().keys()) if hasattr(self._overlay, 'get_vpns') else []
+        vpns.extend([self.SHARED, self.UNATTRIBUTED])
+        vpn_indexes = dict((vpn_name, i) for i, vpn_name in enumerate(vpns))
+        switches = snapshot.get_switches()
+        roles = dict((switch.get_name(), switch.get_role()) for switch in self._overlay.get_nodes().values())
+        entries = np.zeros((len(vpns), len(switches)), dtype=np.int32)
+        cache = {}
+        for j, switch_name in enumerate(switches):
+            for entry in snapshot.get_entries(switch_name):
+                entries[vpn_indexes[self._attribute(entry, index, cache)], j] += 1
+        output_folder = self._simulation_path + '/' + self._extractor_folder
+        switch_roles = np.array([roles.get(switch_name, '') for switch_name in switches], dtype=str)
+        np.savez_compressed(output_folder + '/attribution.npz', vpns=np.array(vpns, dtype=str),
+                            switches=np.array(switches, dtype=str), roles=switch_roles, entries=entries)
+        is_p = switch_roles == 'P'
+        is_pe = switch_roles == 'PE'
+        with open(output_folder + '/vpn.data', 'w') as output_file:
+            output_file.write('# vpn entries p_switches pe_switches p_entries pe_entries\n')
+            for i, vpn_name in enumerate(vpns):
+                output_file.write('%s %s %s %s %s %s\n' % (
+                    vpn_name, entries[i].sum(), np.count_nonzero(entries[i][is_p]),
+                    np.count_nonzero(entries[i][is_pe]), entries[i][is_p].sum(), entries[i][is_pe].sum()))
+                self._record('vpn_entries', entries[i].sum(), vpn_name)
+                self._record('vpn_p_entries', entries[i][is_p].sum(), vpn_name)
+                self._record('vpn_pe_entries', entries[i][is_pe].sum(), vpn_name)
@@ -0,0 +1,148 @@
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+
+from collector.collectors.flow_table import MininetFlowTableSampler
+from collector.extractor import Extractor
+from utils.fs import FileSystem
+
+"""
+This class models a device load series extractor. This kind of extractor has in charge the task of summarizing how the
+routing tables evolve over time.
+"""
+
+
+class DeviceLoadSeries(Extractor):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        Extractor.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    @abstractmethod
+    def set_simulation_path(self, simulation_path):
+        pass
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    @abstractmethod
+    def set_overlay(self, overlay):
+        pass
+
+    '''
+    Start the process of extracting data.
+    '''
+    @abstractmethod
+    def extract_data(self):
+        pass
+
+"""
+This class implements a device load series extractor for Mininet environment. It is based on a flow table sampler:
+the sampled number of entries of each switch is stored into the extractor folder (series.npz), and it is summarized,
+for each switch and for each role (aggregating the switches with the same role), by the peak occupancy and by the time
+to steady state, namely the time after which the number of entries does not differ from its final value by more than
+parameter "tolerance" entries. Times are relative to the first sample. A sample of a role is missing if any of its
+switches did not reply; missing samples are ignored.
+"""
+
+
+class MininetDeviceLoadSeries(DeviceLoadSeries):
+    def __init__(self):
+        DeviceLoadSeries.__init__(self)
+        # Folder in which all extracted data will be stored
+        self._extractor_folder = 'device-load-series'
+        # Simulation path for data extraction
+        self._simulation_path = None
+        # The overlay
+        self._overlay = None
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    def set_simulation_path(self, simulation_path):
+        self._simulation_path = simulation_path
+        # Create extractor's folder
+        os.makedirs(self._simulation_path + '/' + self._extractor_folder)
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    def set_overlay(self, overlay):
+        self._overlay = overlay
+
+    '''
+    Summarize each column of series (indexed by [sample, column]; NaN marks a missing sample, which is ignored). It
+    returns the arrays (peak, time_of_peak, final, time_to_steady_state), with one element for each column.
+    '''
+    @staticmethod
+    def _summarize(timestamps, series, tolerance):
+        samples, columns = series.shape
+        relative = timestamps - timestamps[0]
+        valid = ~np.isnan(series)
+        has_valid = valid.any(axis=0)
+        # Peak occupancy
+        filled = np.where(valid, series, -np.inf)
+        peak_index = np.argmax(filled, axis=0)
+        peak = np.where(has_valid, filled[peak_index, np.arange(columns)], np.nan)
+        time_of_peak = np.where(has_valid, relative[peak_index], np.nan)
+        # Final value, namely the last valid sample
+        last_valid = samples - 1 - np.argmax(valid[::-1], axis=0)
+        final = np.where(has_valid, series[last_valid, np.arange(columns)], np.nan)
+        # Time to steady state: the first valid sample following the last valid one deviating from the final value
+        with np.errstate(invalid='ignore'):
+            deviating = valid & ~(np.abs(series - final) <= tolerance)
+        last_deviating = np.where(deviating.any(axis=0), samples - 1 - np.argmax(deviating[::-1], axis=0), -1)
+        steady_index = np.argmax(valid & (np.arange(samples)[:, np.newaxis] > last_deviating), axis=0)
+        time_to_steady_state = np.where(has_valid, relative[steady_index], np.nan)
+        return peak, time_of_peak, final, time_to_steady_state
+
+    '''
+    Start the process of extracting data.
+    '''
+    def extract_data(self):
+        tolerance = self.get_parameter('tolerance', 0, float)
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
+        archive = np.load(self._fs.get_tmp_folder() + '/' + MininetFlowTableSampler.COUNTS_FILE_NAME)
+        try:
+            timestamps = archive['timestamps']
+            switches = list(archive['switches'])
+            roles = list(archive['roles'])
+            counts = archive['counts']
+        finally:
+            archive.close()
+        if len(timestamps) == 0:
+            self._fail('No samples have been collected.')
+            return
+        series = np.where(counts < 0, np.nan, counts.astype(np.float64))
+        # Aggregate the switches by role: if any switch of a role is missing from a sample, so is the role
+        role_names = sorted(set(roles))
+        role_series = np.column_stack([series[:, [r == role for r in roles]].sum(axis=1) for role in role_names])
+        self._log.debug(self.__class__.__name__, 'Summarizing %s samples of %s switches.', len(timestamps),
+                        len(switches))
+        switch_summary = self._summarize(timestamps, series, tolerance)
+        role_summary = self._summarize(timestamps, role_series, tolerance)
+        self._log.debug(self.__class__.__name__, 'Starting to write the series into extractor folder.')
+        output_folder = self._simulation_path + '/' + self._extractor_folder
+        np.savez_compressed(output_folder + '/series.npz', timestamps=timestamps, switches=np.array(switches),
+                            roles=np.array(roles), counts=counts, role_names=np.array(role_names),
+                            role_counts=role_series)
+        with open(output_folder + '/summary.data', 'w') as output_file:
+            output_file.write('# name peak time_of_peak final time_to_steady_state\n')
+            for names, summary in ((role_names, role_summary), (switches, switch_summary)):
+                for i, name in enumerate(names):
+                    output_file.write('%s %s %s %s %s\n' % (name, summary[0][i], summary[1][i], summary[2][i],
+                                                            summary[3][i]))
+                    for j, value_name in enumerate(('peak', 'time_of_peak', 'final', 'time_to_steady_state')):
+                        self._record(value_name, summary[j][i], name)
+        self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
@@ -0,0 +1,155 @@
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+
+from collector.collectors.emulation import MininetEmulationResources
+from collector.extractor import Extractor
+from utils.fs import FileSystem
+
+"""
+This class models an emulation overhead extractor. This kind of extractor has in charge the task of measuring the
+resources used by the environment, which are not available for the alternative under test.
+"""
+
+
+class EmulationOverhead(Extractor):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        Extractor.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    @abstractmethod
+    def set_simulation_path(self, simulation_path):
+        pass
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    @abstractmethod
+    def set_overlay(self, overlay):
+        pass
+
+    '''
+    Start the process of extracting data.
+    '''
+    @abstractmethod
+    def extract_data(self):
+        pass
+
+"""
+This class implements an emulation overhead extractor for Mininet environment. It is based on an emulation resources
+collector: cumulative CPU times are turned into utilizations between consecutive samples (1.0 is a whole core for the
+groups, the whole machine for the system). The utilization and the RSS of each group are stored into overhead.npz
+(arrays timestamps, groups, kinds, namespaces, cpu and rss, indexed by [sample, group], and system_cpu, memory_used,
+loadavg). The peak and mean of the machine's utilization, memory and load, the same figures aggregated by kind of group
+and the groups using most CPU are written into overhead.data. When the utilization of the machine reaches parameter
+"saturation" (0.9 by default) the machine is considered saturated, and the results of the simulation may be skewed
+by the emulation rather than depend on the alternative.
+"""
+
+
+class MininetEmulationOverhead(EmulationOverhead):
+
+    # Number of groups reported as top CPU consumers
+    TOP_GROUPS = 5
+
+    def __init__(self):
+        EmulationOverhead.__init__(self)
+        # Folder in which all extracted data will be stored
+        self._extractor_folder = 'emulation-overhead'
+        # Simulation path for data extraction
+        self._simulation_path = None
+        # The overlay
+        self._overlay = None
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    def set_simulation_path(self, simulation_path):
+        self._simulation_path = simulation_path
+        # Create extractor's folder
+        os.makedirs(self._simulation_path + '/' + self._extractor_folder)
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    def set_overlay(self, overlay):
+        self._overlay = overlay
+
+    '''
+    Return the rate of change of a cumulative series (indexed by sample along the first axis) with respect to the
+    reference series, which is either the timestamps or the total CPU time.
+    '''
+    @staticmethod
+    def _rate(series, reference):
+        elapsed = np.diff(reference)
+        if series.ndim > 1:
+            elapsed = elapsed[:, np.newaxis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.diff(series, axis=0) / elapsed
+
+    '''
+    Write (and record) the peak and the mean of a series.
+    '''
+    def _write_statistics(self, output_file, name, series):
+        if len(series) == 0:
+            output_file.write('%s nan nan\n' % name)
+        else:
+            output_file.write('%s %s %s\n' % (name, np.nanmax(series), np.nanmean(series)))
+            self._record('peak', np.nanmax(series), name)
+            self._record('mean', np.nanmean(series), name)
+
+    '''
+    Start the process of extracting data.
+    '''
+    def extract_data(self):
+        saturation = self.get_parameter('saturation', 0.9, float)
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
+        archive = np.load(self._fs.get_tmp_folder() + '/' + MininetEmulationResources.SAMPLES_FILE_NAME)
+        try:
+            data = dict((name, archive[name]) for name in archive.files)
+        finally:
+            archive.close()
+        timestamps = data['timestamps']
+        if len(timestamps) < 2:
+            self._fail('Not enough samples of the emulation have been collected.')
+            return
+        kinds = data['kinds']
+        cpu = self._rate(data['cpu'], timestamps)
+        system_cpu = self._rate(data['system_busy'], data['system_total'])
+        rss = data['rss'][1:]
+        self._log.debug(self.__class__.__name__, 'Starting to write the emulation overhead into extractor folder.')
+        output_folder = self._simulation_path + '/' + self._extractor_folder
+        np.savez_compressed(output_folder + '/overhead.npz', timestamps=timestamps[1:], groups=data['groups'],
+                            kinds=kinds, namespaces=data['namespaces'], cpu=cpu, rss=rss, system_cpu=system_cpu,
+                            memory_used=data['memory_used'][1:], loadavg=data['loadavg'][1:])
+        with open(output_folder + '/overhead.data', 'w') as output_file:
+            output_file.write('CPUs: %s\n' % int(data['cpus']))
+            output_file.write('Memory (bytes): %s\n' % int(data['memory_total'][0]))
+            with np.errstate(invalid='ignore'):
+                saturated = system_cpu >= saturation
+            output_file.write('Saturated: %s\n' % ('yes' if saturated.any() else 'no'))
+            output_file.write('Saturated time (seconds): %s\n' % str(np.diff(timestamps)[saturated].sum()))
+            self._record('saturated_time', np.diff(timestamps)[saturated].sum())
+            output_file.write('# series peak mean\n')
+            self._write_statistics(output_file, 'system_cpu', system_cpu)
+            self._write_statistics(output_file, 'memory_used', data['memory_used'])
+            self._write_statistics(output_file, 'loadavg', data['loadavg'])
+            for kind in sorted(set(kinds)):
+                self._write_statistics(output_file, kind + '_cpu', cpu[:, kinds == kind].sum(axis=1))
+                self._write_statistics(output_file, kind + '_rss', rss[:, kinds == kind].sum(axis=1))
+            mean_cpu = np.nanmean(cpu, axis=0)
+            for i in np.argsort(-mean_cpu)[:self.TOP_GROUPS]:
+                self._write_statistics(output_file, 'group_cpu:' + data['groups'][i], cpu[:, i])
+        self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
@@ -0,0 +1,144 @@
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+
+from collector.collectors.flow_table import MininetFlowSnapshotSampler
+from collector.extractor import Extractor
+from utils.flows import FlowDelta, FlowSnapshotStore
+from utils.fs import FileSystem
+
+'''
+Compare the consecutive flow snapshots stored into snapshots_file. It returns a tuple (timestamps, switches, churn,
+flaps), where churn is an array indexed by [added/removed/modified, interval, switch] (-1 marks an interval ending with
+a snapshot from which the switch is missing) and flaps maps each switch to the number of entries added again after
+having been removed. This function is defined at module level in order to be
+executed into the process pool.
+'''
+
+
+def _compute_churn(snapshots_file):
+    snapshots = FlowSnapshotStore.load(snapshots_file)
+    deltas = FlowDelta.series(snapshots)
+    switches = sorted(set(name for snapshot in snapshots for name in snapshot.get_switches()))
+    churn = np.zeros((3, len(deltas), len(switches)), dtype=np.int32)
+    flaps = dict((name, 0) for name in switches)
+    # The keys of the entries removed so far from each switch
+    removed_keys = dict((name, set()) for name in switches)
+    for i, interval in enumerate(deltas):
+        for j, switch_name in enumerate(switches):
+            delta = interval.get(switch_name)
+            if delta is None:
+                churn[:, i, j] = -1
+                continue
+            churn[:, i, j] = delta.get_counts()
+            flaps[switch_name] += sum(1 for entry in delta.get_added()
+                                      if entry.get_key() in removed_keys[switch_name])
+            removed_keys[switch_name].update(entry.get_key() for entry in delta.get_removed())
+    timestamps = np.array([snapshot.get_timestamp() for snapshot in snapshots])
+    return timestamps, switches, churn, flaps
+
+"""
+This class models a flow table churn extractor. This kind of extractor has in charge the task of measuring how many
+entries of the flow tables are added, removed and modified over time.
+"""
+
+
+class FlowTableChurn(Extractor):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        Extractor.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    @abstractmethod
+    def set_simulation_path(self, simulation_path):
+        pass
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    @abstractmethod
+    def set_overlay(self, overlay):
+        pass
+
+    '''
+    Start the process of extracting data.
+    '''
+    @abstractmethod
+    def extract_data(self):
+        pass
+
+"""
+This class implements a flow table churn extractor for Mininet environment. It is based on a flow snapshot sampler:
+consecutive snapshots are compared (see utils.flows.FlowDelta) and the number of added, removed and modified entries of
+each switch in each interval is stored into a compressed numpy archive (churn.npz) containing the following arrays:
+ - timestamps: the timestamp of each snapshot, thus interval i goes from timestamps[i] to timestamps[i + 1];
+ - switches: the label of the second axis of the other arrays;
+ - added, removed, modified: arrays indexed by [interval, switch]; -1 marks an interval at the end of which the flow
+   table of the switch could not be read (the changes are then accounted in the first interval ending with a read
+   flow table).
+Moreover, the totals of each switch are written into churn.data, together with the number of flaps, namely the entries
+added again after having been removed. Comparing the snapshots is CPU bound, thus it is executed into the process pool.
+"""
+
+
+class MininetFlowTableChurn(FlowTableChurn):
+
+    CPU_BOUND = True
+
+    def __init__(self):
+        FlowTableChurn.__init__(self)
+        # Folder in which all extracted data will be stored
+        self._extractor_folder = 'flow-churn'
+        # Simulation path for data extraction
+        self._simulation_path = None
+        # The overlay
+        self._overlay = None
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    def set_simulation_path(self, simulation_path):
+        self._simulation_path = simulation_path
+        # Create extractor's folder
+        os.makedirs(self._simulation_path + '/' + self._extractor_folder)
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    def set_overlay(self, overlay):
+        self._overlay = overlay
+
+    '''
+    Start the process of extracting data.
+    '''
+    def extract_data(self):
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
+        self._log.debug(self.__class__.__name__, 'Comparing the flow snapshots.')
+        timestamps, switches, churn, flaps = self._execute(
+            _compute_churn, self._fs.get_tmp_folder() + '/' + MininetFlowSnapshotSampler.SNAPSHOTS_FILE_NAME)
+        self._log.debug(self.__class__.__name__, 'Starting to write the churn into extractor folder.')
+        output_folder = self._simulation_path + '/' + self._extractor_folder
+        np.savez_compressed(output_folder + '/churn.npz',
+                            timestamps=timestamps, switches=np.array(switches), added=churn[0], removed=churn[1],
+                            modified=churn[2])
+        with open(output_folder + '/churn.data', 'w') as output_file:
+            output_file.write('# switch added removed modified flaps\n')
+            totals = np.maximum(churn, 0).sum(axis=1)
+            for j, switch_name in enumerate(switches):
+                output_file.write('%s %s %s %s %s\n' % (switch_name, totals[0, j], totals[1, j], totals[2, j],
+                                                        flaps[switch_name]))
+                for i, value_name in enumerate(('added', 'removed', 'modified')):
+                    self._record(value_name, totals[i, j], switch_name)
+                self._record('flaps', flaps[switch_name], switch_name)
+        self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
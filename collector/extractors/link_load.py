@@ -0,0 +1,133 @@
+from abc import ABCMeta, abstractmethod
+import os
+
+import numpy as np
+
+from collector.collectors.interfaces import MininetInterfaceCounters
+from collector.extractor import Extractor
+from utils.fs import FileSystem
+
+"""
+This class models a link load extractor. This kind of extractor has in charge the task of measuring the traffic carried
+by the links of the overlay over time.
+"""
+
+
+class LinkLoad(Extractor):
+
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        Extractor.__init__(self)
+        # The FileSystem handler
+        self._fs = FileSystem.get_instance()
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    @abstractmethod
+    def set_simulation_path(self, simulation_path):
+        pass
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    @abstractmethod
+    def set_overlay(self, overlay):
+        pass
+
+    '''
+    Start the process of extracting data.
+    '''
+    @abstractmethod
+    def extract_data(self):
+        pass
+
+"""
+This class implements a link load extractor for Mininet environment. It is based on an interface counters collector:
+the counters of consecutive samples are turned into rates (per second), NaN marking the intervals in which an
+interface did not exist or its counters have been reset. The rates are stored into rates.npz (arrays timestamps, namely
+the end of each interval, interfaces, links, counters and rates, the latter indexed by [interval, interface, counter]),
+while load.data reports, for each interface, the bytes transmitted and received over the whole simulation and the peak
+and mean of the total (rx plus tx) bytes per second.
+"""
+
+
+class MininetLinkLoad(LinkLoad):
+    def __init__(self):
+        LinkLoad.__init__(self)
+        # Folder in which all extracted data will be stored
+        self._extractor_folder = 'link-load'
+        # Simulation path for data extraction
+        self._simulation_path = None
+        # The overlay
+        self._overlay = None
+
+    def __repr__(self):
+        return self.__class__.__name__
+
+    '''
+    Set the simulation path in which save the extracted data.
+    '''
+    def set_simulation_path(self, simulation_path):
+        self._simulation_path = simulation_path
+        # Create extractor's folder
+        os.makedirs(self._simulation_path + '/' + self._extractor_folder)
+
+    '''
+    Set the overlay on which the simulation is running on.
+    '''
+    def set_overlay(self, overlay):
+        self._overlay = overlay
+
+    '''
+    Compute the rates between consecutive samples of the counters (indexed by [sample, interface, counter]).
+    '''
+    @staticmethod
+    def _rates(timestamps, counters):
+        deltas = np.diff(counters, axis=0)
+        with np.errstate(invalid='ignore'):
+            # Counters reset when an interface is recreated
+            deltas[deltas < 0] = np.nan
+        return deltas / np.diff(timestamps)[:, np.newaxis, np.newaxis]
+
+    '''
+    Start the process of extracting data.
+    '''
+    def extract_data(self):
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
+        archive = np.load(self._fs.get_tmp_folder() + '/' + MininetInterfaceCounters.SAMPLES_FILE_NAME)
+        try:
+            data = dict((name, archive[name]) for name in archive.files)
+        finally:
+            archive.close()
+        timestamps = data['timestamps']
+        if len(timestamps) < 2:
+            self._fail('Not enough samples of the interfaces have been collected.')
+            return
+        counters = list(MininetInterfaceCounters.COUNTERS)
+        rates = self._rates(timestamps, data['counters'])
+        elapsed = np.diff(timestamps)[:, np.newaxis]
+        rx_bytes = rates[:, :, counters.index('rx_bytes')]
+        tx_bytes = rates[:, :, counters.index('tx_bytes')]
+        total = rx_bytes + tx_bytes
+        self._log.debug(self.__class__.__name__, 'Starting to write the link load into extractor folder.')
+        output_folder = self._simulation_path + '/' + self._extractor_folder
+        np.savez_compressed(output_folder + '/rates.npz', timestamps=timestamps[1:], interfaces=data['interfaces'],
+                            links=data['links'], counters=np.array(counters), rates=rates)
+        with open(output_folder + '/load.data', 'w') as output_file:
+            output_file.write('# interface link rx_bytes tx_bytes peak_bytes_per_second mean_bytes_per_second\n')
+            with np.errstate(invalid='ignore'):
+                received = np.nansum(rx_bytes * elapsed, axis=0)
+                transmitted = np.nansum(tx_bytes * elapsed, axis=0)
+                for i, interface in enumerate(data['interfaces']):
+                    values = total[:, i][~np.isnan(total[:, i])]
+                    peak, mean = (values.max(), values.mean()) if len(values) > 0 else (np.nan, np.nan)
+                    output_file.write('%s %s %s %s %s %s\n' % (interface, data['links'][i], int(received[i]),
+                                                               int(transmitted[i]), peak, mean))
+                    self._record('rx_bytes', received[i], interface)
+                    self._record('tx_bytes', transmitted[i], interface)
+                    self._record('peak_bytes_per_second', peak, interface)
+                    self._record('mean_bytes_per_second', mean, interface)
+        self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
@@ -2,11 +2,33 @@ from abc import ABCMeta, abstractmethod
 
 from scapy.all import *
 from scapy.layers.inet import TCP
-from scapy.utils import rdpcap
+from scapy.utils import PcapReader
 
+from collector.collectors.cp import MininetControlPlaneMessages
 from collector.extractor import Extractor
 from utils.fs import FileSystem
 
+'''
+Count the OpenFlow packets included into the sniff stored into pcap_file. This function is defined at module level in
+order to be executed into the process pool.
+'''
+
+
+def _count_openflow_packets(pcap_file):
+    # Counter for counting all openflow packets included into the sniffing.
+    count = 0
+    # Load the sniff packet by packet
+    reader = PcapReader(pcap_file)
+    try:
+        for pkt in reader:
+            # OpenFlow is not yet implemented as dissector in Scapy, thus just count TCP packets from/to standard
+            # OpenFlow controller port.
+            if TCP in pkt and (pkt[TCP].sport == 6633 or pkt[TCP].dport == 6633):
+                count += 1
+    finally:
+        reader.close()
+    return count
+
 """
 This class implements an extractor for measuring the control plane overhead in terms of number of exchanged control
 plane messages.
@@ -46,11 +68,15 @@ class ControlPlaneOverhead(Extractor):
 """
 This class implements an extractor for measuring the number of control plane messages exchanged by an alternative
 running on Mininet simulator. This extractor is based on a control plane messages collector. The measure is based on
-the sniffed packets.
+the sniffed packets: if the collector analyzed them online, its summary is used; otherwise, the capture is parsed, which
+is CPU bound, thus it is executed into the process pool.
 """
 
 
 class MininetControlPlaneOverhead(ControlPlaneOverhead):
+
+    CPU_BOUND = True
+
     def __init__(self):
         ControlPlaneOverhead.__init__(self)
         # Folder in which all extracred data will be stored
@@ -81,32 +107,19 @@ class MininetControlPlaneOverhead(ControlPlaneOverhead):
     Start the process of extracting data.
     '''
     def extract_data(self):
-        # First of all, sleep for 1 minute
-        self._log.info(self.__class__.__name__, 'Sleeping waiting for data to extract.')
-        time.sleep(15)
-        self._log.info(self.__class__.__name__, 'I woke up. I am starting to extract data.')
-        # Load the sniff
-        pkts = rdpcap(self._fs.get_tmp_folder() + '/sniff.pcap')
-        # Counter for counting all openflow packets included into the sniffing.
-        count = 0
+        # First of all, wait for the data to be ready
+        self._wait_for_data()
         self._log.debug(self.__class__.__name__, 'Calculating the total number of exchanged control plane messages.')
-        for pkt in pkts:
-            # OpenFlow is not yet implemented as dissector in Scapy, thus just count TCP packets from/to standard
-            # OpenFlow controller port.
-            if TCP in pkt and (pkt[TCP].sport == 6633 or pkt[TCP].dport == 6633):
-                if TCP in pkt:
-                    count += 1
+        summary = MininetControlPlaneMessages.load_summary()
+        if summary is None:
+            count = self._execute(_count_openflow_packets,
+                                  self._fs.get_tmp_folder() + '/' + MininetControlPlaneMessages.SNIFF_FILE_NAME)
+        else:
+            count = summary['packets']
         self._log.debug(self.__class__.__name__, 'Starting to write the convergence time into extractor folder.')
         # Write it into a file inside the extractor folder
         output_file_name = self._simulation_path + '/' + self._extractor_folder + '/overhead.data'
-        output_file = open(output_file_name, 'w')
-        output_file.write('Exchanged packets: %s' % str(count))
+        with open(output_file_name, 'w') as output_file:
+            output_file.write('Exchanged packets: %s' % str(count))
+        self._record('packets', count)
         self._log.info(self.__class__.__name__, 'All data has been correctly extracted.')
-        # Notify all observers
-        self.notify_all()
-
-    '''
-    Run the thread in which this extractor is in execution.
-    '''
-    def run(self):
-        self.extract_data()
\ No newline at end of file
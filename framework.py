@@ -1,5 +1,7 @@
 import argparse
 import os.path
+import random
+import shutil
 
 from utils.log import Logger
 from utils.parser.parser import Parser
@@ -7,6 +9,15 @@ from utils.parser.parser import Parser
 from loader.environment import EnvironmentLoader
 from model.topology.topology import Topology
 from model.simulation import Simulation
+from utils.fingerprint import Fingerprint
+from utils.fs import FileSystem
+from utils.journal import Journal
+from utils.pool import ProcessPool
+from utils.profiling import Profiler
+from utils.resources import AdmissionControl, AdmissionError
+from utils.results import ResultsStore
+from utils.statistics import AdaptiveStopping, PERCENTILES, summarize
+from utils.tracing import Tracer
 
 """
 This is the main framework's class. It has in charge the orchestration of the different operations of the
@@ -22,6 +33,15 @@ class ComparisonFramework(object):
         self._parser = Parser()
         # The topology
         self._topology = None
+        # The configuration file
+        self._config_file = None
+        # Whether simulations are executed even if a completed one with the same fingerprint exists
+        self._force = False
+        # Whether the last campaign is resumed, according to the run journal
+        self._resume = False
+        # The names of the services and of the alternatives to test (None means all of them)
+        self._services = None
+        self._alternatives = None
         # Factory loader. For each alternative, a new environment is loaded in accord with the alternative itself.
         self._loader = EnvironmentLoader()
 
@@ -35,6 +55,36 @@ class ComparisonFramework(object):
                                '--topology',
                                required=True,
                                help='The topology on which framework runs. It must be a GraphML file.')
+        self._arg.add_argument('-f',
+                               '--force',
+                               action='store_true',
+                               help='Execute all simulations, even the ones already completed with the same '
+                                    'fingerprint.')
+        self._arg.add_argument('-r',
+                               '--resume',
+                               action='store_true',
+                               help='Resume an interrupted campaign: skip the simulations done according to the run '
+                                    'journal, and clean up the half-finished ones.')
+        self._arg.add_argument('-s',
+                               '--service',
+                               action='append',
+                               help='Test only this service (it can be repeated).')
+        self._arg.add_argument('-a',
+                               '--alternative',
+                               action='append',
+                               help='Test only this alternative (it can be repeated).')
+        self._arg.add_argument('-p',
+                               '--profile',
+                               help='Profile the given phases: comma separated names of spans, which may contain '
+                                    'wildcards (e.g. framework.create_overlay,scenario.*,extractor.execute).')
+        self._arg.add_argument('--profiler',
+                               default='cprofile',
+                               choices=sorted(Profiler.SESSIONS.keys()),
+                               help='The profiler of the phases (default: cprofile).')
+        self._arg.add_argument('--profile-top',
+                               type=int,
+                               default=20,
+                               help='The number of top functions of each profiled phase to print (default: 20).')
 
     def __repr__(self):
         return "Comparison Framework v. 0.1"
@@ -45,14 +95,190 @@ class ComparisonFramework(object):
     def _init(self):
         args = self._arg.parse_args()
         config_file = str(args.config_file)
+        self._config_file = config_file
         topology = str(args.topology)
         topology_path = os.path.abspath(topology)
+        self._force = args.force
+        self._resume = args.resume
+        self._services = args.service
+        self._alternatives = args.alternative
+        if args.profile:
+            Profiler.get_instance().configure([phase for phase in args.profile.split(',') if phase], args.profiler,
+                                              args.profile_top)
         self._log.info(self.__class__.__name__, 'Creating the topology.')
         self._topology = Topology(topology_path)
 
         # Parse config_file
         self._log.info(self.__class__.__name__, 'Parsing configuration file.')
         self._parser.parse(config_file)
+        parameters = self._parser.get_framework_parameters()
+        # The process pool used by CPU-bound extractors is shared by all simulations
+        ProcessPool.get_instance().set_processes(parameters.get('processes'))
+        AdmissionControl.get_instance().set_margin(parameters.get('admission_margin', 1.25))
+        Tracer.get_instance().set_enabled(parameters.get('tracing', 'yes') == 'yes')
+
+    '''
+    Load fresh services from the configuration file. Alternatives, metrics and their threads cannot be executed twice,
+    thus each repetition of a simulation needs its own objects.
+    '''
+    def _reload_services(self):
+        parser = Parser()
+        parser.parse(self._config_file)
+        return parser.get_services()
+
+    '''
+    Return the parameters of the framework for a repetition of a simulation. The seed is always explicit, thus every
+    simulation is reproducible and so are the ones skipped because of their fingerprint: it is the seed declared in the
+    configuration file (1 by default) plus the number of the repetition.
+    '''
+    @staticmethod
+    def _get_repetition_parameters(parameters, repetition):
+        repetition_parameters = dict(parameters)
+        repetition_parameters['seed'] = str(int(parameters.get('seed', 1)) + repetition)
+        return repetition_parameters
+
+    '''
+    Return the adaptive stopping policy for the repetitions of simulations, as declared in the configuration file.
+    '''
+    @staticmethod
+    def _get_stopping(parameters):
+        tolerance = parameters.get('tolerance')
+        targets = parameters.get('stop_on')
+        if targets is not None:
+            if not isinstance(targets, list):
+                targets = [targets]
+            targets = [tuple(target.split(':', 1)) for target in targets]
+        return AdaptiveStopping(int(parameters.get('min_repetitions', 3)), float(parameters.get('confidence', 0.95)),
+                                float(tolerance) if tolerance is not None else None, targets)
+
+    '''
+    Simulate an alternative of a service, unless it has been already simulated in the same way: a simulation is skipped
+    if a completed one with the same fingerprint exists (unless forced) or, when resuming, if the run journal says that
+    it is done (entries is the replayed journal); half-finished simulations are cleaned up. It returns the run id of the
+    simulation, or of the one which made it superfluous.
+    '''
+    def _simulate(self, service, alternative, parameters, entries):
+        fingerprint = Fingerprint.create(self._topology.get_graphml_file(), service, alternative, parameters)
+        entry = entries.get(fingerprint.get_digest())
+        if entry is not None and entry['state'] == Journal.DONE:
+            self._log.info(self.__class__.__name__, 'Alternative %s has been already simulated in %s; skip it.',
+                           alternative.get_name(), entry.get('path'))
+            return entry.get('run_id')
+        if entry is not None and entry['state'] in (Journal.RUNNING, Journal.EXTRACTED):
+            self._clean_up(alternative, entry)
+        # Skip the alternative if it has been already simulated in the same way
+        if not self._force:
+            run = ResultsStore.get_instance().find_run(fingerprint.get_digest())
+            if run is not None:
+                self._log.info(self.__class__.__name__, 'Alternative %s has been already simulated in %s with the same '
+                               'fingerprint; skip it.', alternative.get_name(), run['path'])
+                return run['run_id']
+        Journal.get_instance().record(fingerprint.get_digest(), Journal.PLANNED, service=service.get_name(),
+                                      alternative=alternative.get_name())
+        # Trace the phases of the simulation, and export them into its folder
+        tracer = Tracer.get_instance()
+        tracer.reset()
+        with tracer.span('framework.simulate', service=service.get_name(), alternative=alternative.get_name(),
+                         seed=parameters.get('seed')):
+            simulation = self._run_simulation(service, alternative, parameters, fingerprint)
+        if simulation is None:
+            return None
+        tracer.export(simulation.get_simulation_path())
+        Profiler.get_instance().export(simulation.get_simulation_path())
+        return simulation.get_run_id()
+
+    '''
+    Create the overlay of an alternative and run its simulation, returning it (or None if the environment cannot be
+    started).
+    '''
+    def _run_simulation(self, service, alternative, parameters, fingerprint):
+        tracer = Tracer.get_instance()
+        # The same seed gives the same random choices to all alternatives (e.g. PEs and sites' subnets)
+        random.seed(parameters['seed'])
+        '''
+        Creating overlay and adding it to the topology object.
+        '''
+        self._log.info(self.__class__.__name__, 'Creating overlay for alternative %s.', alternative.get_name())
+        # Creating the overlay for current alternative
+        with tracer.span('framework.create_overlay'):
+            overlay = alternative.create_overlay(self._topology.get_topology_from_graphml())
+        self._log.info(self.__class__.__name__, 'Adding overlay %s for alternative %s to the topology.',
+                       overlay.get_name(), alternative.get_name())
+        self._topology.add_overlay(overlay)
+
+        '''
+        Loading environment, creating the simulation and running it.
+        '''
+        self._log.info(self.__class__.__name__, 'Loading the environment for the alternative %s.', alternative)
+        # Load an environment for the current alternative of this service
+        environment = self._loader.load(alternative.get_environment())
+        # Do not start an environment which the host cannot run
+        if parameters.get('admission', 'yes') == 'yes':
+            try:
+                with tracer.span('framework.admission'):
+                    environment.admit(overlay, float(parameters.get('admission_timeout', 600)))
+            except AdmissionError as e:
+                self._log.error(self.__class__.__name__, 'Alternative %s cannot be simulated: %s',
+                                alternative.get_name(), e)
+                return None
+        # Create the simulation
+        simulation = Simulation(self._topology, service, environment, alternative, parameters, fingerprint)
+        self._log.info(
+            self.__class__.__name__,
+            'A new simulation has been created for service %s and alternative %s.',
+            service.get_name(), alternative)
+        # Run the simulation
+        simulation.start()
+        simulation.join()
+        return simulation
+
+    '''
+    Clean up the half-finished simulation of an alternative, described by its last entry of the run journal: stop what
+    it left running, and delete its folder and its results.
+    '''
+    def _clean_up(self, alternative, entry):
+        self._log.info(self.__class__.__name__, 'Cleaning up the half-finished simulation of alternative %s (%s).',
+                       alternative.get_name(), entry.get('path'))
+        alternative.get_scenario().clean_up()
+        self._loader.load(alternative.get_environment()).clean_up()
+        if entry.get('path') is not None and os.path.isdir(entry['path']):
+            shutil.rmtree(entry['path'])
+        if entry.get('run_id') is not None:
+            ResultsStore.get_instance().delete_run(entry['run_id'])
+
+    '''
+    Return the values stored for the given runs, as a map<(metric, name, subject), list of values>.
+    '''
+    @staticmethod
+    def _get_samples(run_ids):
+        samples = {}
+        for run_id, service, alternative, topology, metric, name, subject, value in \
+                ResultsStore.get_instance().query(run_id=run_ids):
+            samples.setdefault((metric, name, subject), []).append(value if value is not None else float('nan'))
+        return samples
+
+    '''
+    Write the statistics of the values extracted by the repetitions of the simulation of an alternative into
+    statistics.data, inside the folder of the alternative.
+    '''
+    def _write_statistics(self, service, alternative, run_ids, stopping):
+        samples = self._get_samples(run_ids)
+        folder = os.path.join(FileSystem.get_instance().get_simulations_folder(), service.get_name().lower(),
+                              alternative.get_name())
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(os.path.join(folder, 'statistics.data'), 'w') as output_file:
+            output_file.write('Runs: %s\n' % ' '.join(run_ids))
+            output_file.write('Confidence: %s\n' % stopping.get_confidence())
+            output_file.write('# metric name subject n mean stddev ci_low ci_high %s\n' %
+                              ' '.join('p%s' % percentile for percentile in PERCENTILES))
+            for metric, name, subject in sorted(samples.keys()):
+                summary = summarize(samples[(metric, name, subject)], stopping.get_confidence())
+                columns = ['n', 'mean', 'stddev', 'ci_low', 'ci_high'] + ['p%s' % p for p in PERCENTILES]
+                output_file.write('%s %s %s %s\n' % (metric, name, subject or '-',
+                                                      ' '.join(str(summary.get(column, 'nan')) for column in columns)))
+        self._log.info(self.__class__.__name__, 'Statistics of %s runs of alternative %s have been written.',
+                       len(run_ids), alternative.get_name())
 
     '''
     Run the framework
@@ -63,37 +289,41 @@ class ComparisonFramework(object):
         # Run simulation: for each service to evaluate, create a simulation and delegate to the loader objects
         # the decision about the environment to load based on the alternatives
         services = self._parser.get_services()
+        parameters = self._parser.get_framework_parameters()
+        # Each simulation may be repeated (with a different seed) until its results are statistically sound
+        repetitions = int(parameters.get('repetitions', 1))
+        stopping = self._get_stopping(parameters)
+        entries = Journal.get_instance().load() if self._resume else {}
 
-        for service in services:
+        for i, service in enumerate(services):
+            if self._services is not None and service.get_name() not in self._services:
+                continue
             # For each alternative of this service, create a simulation
-            for alternative in service.get_alternatives():
-                '''
-                Creating overlay and adding it to the topology object.
-                '''
-                self._log.info(self.__class__.__name__, 'Creating overlay for alternative %s.', alternative.get_name())
-                # Creating the overlay for current alternative
-                overlay = alternative.create_overlay(self._topology.get_topology_from_graphml())
-                self._log.info(self.__class__.__name__, 'Adding overlay %s for alternative %s to the topology.',
-                               overlay.get_name(), alternative.get_name())
-                self._topology.add_overlay(overlay)
-
-                '''
-                Loading environment, creating the simulation and running it.
-                '''
-                self._log.info(self.__class__.__name__, 'Loading the environment for the alternative %s.', alternative)
-                # Load an environment for the current alternative of this service
-                environment = self._loader.load(alternative.get_environment())
-                # Create the simulation
-                simulation = Simulation(self._topology, service, environment, alternative)
-                self._log.info(
-                    self.__class__.__name__,
-                    'A new simulation has been created for service %s and alternative %s.',
-                    service.get_name(), alternative)
-                # Run the simulation
-                simulation.start()
-                simulation.join()
+            for j, alternative in enumerate(service.get_alternatives()):
+                if self._alternatives is not None and alternative.get_name() not in self._alternatives:
+                    continue
+                run_ids = []
+                for repetition in range(repetitions):
+                    if repetition > 0:
+                        current_service = self._reload_services()[i]
+                        current_alternative = current_service.get_alternatives()[j]
+                    else:
+                        current_service, current_alternative = service, alternative
+                    run_id = self._simulate(current_service, current_alternative,
+                                            self._get_repetition_parameters(parameters, repetition), entries)
+                    if run_id is not None:
+                        run_ids.append(run_id)
+                    if repetitions > 1 and stopping.is_satisfied(len(run_ids), self._get_samples(run_ids)):
+                        self._log.info(self.__class__.__name__, 'Results of alternative %s are statistically sound '
+                                       'after %s repetitions; stop repeating.', alternative.get_name(), len(run_ids))
+                        break
+                if repetitions > 1:
+                    self._write_statistics(service, alternative, run_ids, stopping)
 
             self._log.info(self.__class__.__name__, 'All alternatives for service %s have been successfully tested.',
                            service.get_name())
 
         self._log.info(self.__class__.__name__, 'All services have been successfully tested; framework will stop.')
+        ProcessPool.get_instance().close()
+        for line in Profiler.get_instance().get_summary():
+            self._log.info(self.__class__.__name__, line)
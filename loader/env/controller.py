@@ -6,6 +6,7 @@ import psutil
 
 from utils.fs import FileSystem
 from utils.log import Logger
+from utils.process import ProcessTree
 
 """
 This class is able to run an SDN controller.
@@ -13,6 +14,10 @@ This class is able to run an SDN controller.
 
 
 class ControllerStarter(object):
+
+    # The file, into TMP folder, containing the pid of the running controller and its creation time
+    PID_FILE_NAME = 'controller.pid'
+
     def __init__(self, controller_path, controller_cmd):
         # Get the framework file system handler
         self._fs = FileSystem.get_instance()
@@ -32,8 +37,96 @@ class ControllerStarter(object):
         self._fs.cd(self._path)
         self._log.debug(self.__class__.__name__, 'Starting the controller.')
         self._controller_process = Popen(self._cmd, shell=True, stdout=PIPE, stderr=PIPE)
+        # Publish the pid, thus collectors can monitor the controller; the creation time identifies the process, since
+        # the pid can be reused (e.g. after a reboot)
+        try:
+            create_time = ProcessTree.call(psutil.Process(self._controller_process.pid), 'create_time')
+        except psutil.NoSuchProcess:
+            create_time = None
+        with open(self._fs.get_tmp_folder() + '/' + self.PID_FILE_NAME, 'w') as pid_file:
+            pid_file.write('%s %r\n' % (self._controller_process.pid, create_time))
         self._log.info(self.__class__.__name__, 'Controller has been correctly started.')
 
+    '''
+    Return the version of the controller placed in controller_path, namely the git revision of its folder (followed by
+    "-dirty" if it has local changes), or None if it is not a git repository.
+    '''
+    @staticmethod
+    def get_version(controller_path):
+        path = os.path.expanduser(controller_path)
+        try:
+            process = Popen(['git', '-C', path, 'rev-parse', 'HEAD'], stdout=PIPE, stderr=PIPE)
+            revision = process.communicate()[0].strip()
+            if process.returncode != 0:
+                return None
+            process = Popen(['git', '-C', path, 'status', '--porcelain', '--untracked-files=no'],
+                            stdout=PIPE, stderr=PIPE)
+            changes = process.communicate()[0].strip()
+        except OSError:
+            return None
+        return revision + '-dirty' if changes else revision
+
+    '''
+    Read the pid file inside TMP folder. It returns the tuple (pid, create_time), where create_time is None if it has
+    not been recorded, or None if there is no valid pid file.
+    '''
+    @classmethod
+    def read_pid_file(cls):
+        pid_file_name = FileSystem.get_instance().get_tmp_folder() + '/' + cls.PID_FILE_NAME
+        if not os.path.exists(pid_file_name):
+            return None
+        with open(pid_file_name) as pid_file:
+            fields = pid_file.read().split()
+        try:
+            pid = int(fields[0])
+            create_time = float(fields[1]) if len(fields) > 1 and fields[1] != 'None' else None
+        except (IndexError, ValueError):
+            return None
+        return pid, create_time
+
+    '''
+    Return the process identified by recorded, a (pid, create_time) tuple read from the pid file, or None if there is no
+    such process. A process is the recorded one only if its creation time matches too: otherwise (e.g. after a reboot)
+    the pid may belong to another process.
+    '''
+    @staticmethod
+    def find_process(recorded):
+        if recorded is None or recorded[1] is None:
+            return None
+        try:
+            process = psutil.Process(recorded[0])
+            if abs(ProcessTree.call(process, 'create_time') - recorded[1]) < 0.01:
+                return process
+        except psutil.NoSuchProcess:
+            pass
+        return None
+
+    '''
+    Kill the controller left running by an interrupted execution of the framework, if any, by means of the pid file
+    inside TMP folder. The process is killed only if it is still the controller (see find_process): otherwise the pid
+    file is just deleted.
+    '''
+    @classmethod
+    def kill_stale(cls):
+        fs = FileSystem.get_instance()
+        log = Logger.get_instance()
+        pid_file_name = fs.get_tmp_folder() + '/' + cls.PID_FILE_NAME
+        if not os.path.exists(pid_file_name):
+            return
+        recorded = cls.read_pid_file()
+        process = cls.find_process(recorded)
+        if process is not None:
+            log.info(cls.__name__, 'Killing the controller left running (pid %s).', process.pid)
+            try:
+                for child in ProcessTree.call(process, 'children', recursive=True):
+                    child.kill()
+                process.kill()
+            except psutil.NoSuchProcess:
+                pass
+        elif recorded is not None and psutil.pid_exists(recorded[0]):
+            log.warning(cls.__name__, 'Process %s is not the controller left running; it is not killed.', recorded[0])
+        fs.delete(pid_file_name)
+
     '''
     Stop the controller.
     '''
@@ -43,7 +136,7 @@ class ControllerStarter(object):
         process = psutil.Process(self._controller_process.pid)
         self._log.debug(self.__class__.__name__, 'All child have been kept.')
         # Get all child' PID
-        child_pid = process.get_children(recursive=True)
+        child_pid = ProcessTree.call(process, 'children', recursive=True)
         self._log.debug(self.__class__.__name__, 'Starting to kill each children.')
         # Kill each children
         for pid in child_pid:
@@ -51,4 +144,5 @@ class ControllerStarter(object):
         self._log.debug(self.__class__.__name__, 'Killing controller process.')
         # Finally, kill controller process
         self._controller_process.kill()
+        self._fs.delete(self._fs.get_tmp_folder() + '/' + self.PID_FILE_NAME)
         self._log.info(self.__class__.__name__, 'Controller has been correctly stopped.')
@@ -4,6 +4,7 @@ from subprocess import Popen, PIPE
 from mininet.net import Mininet
 from mininet.node import OVSSwitch, RemoteController
 from utils.log import Logger
+from utils.tracing import Tracer
 
 """
 This class implements a custom switch that can be associated to the Mininet instance. A CustomSwitch is based on
@@ -80,12 +81,14 @@ This class implements a thread in which Mininet will be executed.
 
 
 class MininetStartSimulation(Thread):
-    def __init__(self, mininet_topology):
+    def __init__(self, mininet_topology, on_started=None):
         Thread.__init__(self)
         # Logger
         self._log = Logger.get_instance()
         # The reference to the topology executing into mininet
         self._mininet_topology = mininet_topology
+        # Function called once Mininet has been started
+        self._on_started = on_started
 
     '''
     Run the Mininet environment.
@@ -93,8 +96,11 @@ class MininetStartSimulation(Thread):
     def run(self):
         self._log.debug(self.__class__.__name__, 'Preparing to execute a Mininet instance.')
         net = self._mininet_topology.get_mininet_object()
-        net.start()
+        with Tracer.get_instance().span('mininet.start'):
+            net.start()
         self._log.info(self.__class__.__name__, 'Mininet has been correctly started.')
+        if self._on_started is not None:
+            self._on_started()
 
     '''
     Stop the Mininet environment.
@@ -103,7 +109,14 @@ class MininetStartSimulation(Thread):
         self._log.debug(self.__class__.__name__, 'Preparing to stop Mininet instance.')
         # net = self._mininet_topology.get_mininet_object()
         # net.stop()
-        # Run mn -c for cleaning virtual interfaces and bridges
-        mininet_stop = Popen('sudo mn -c', shell=True, stdout=PIPE, stderr=PIPE)
-        mininet_stop.wait()
+        self.clean_up()
         self._log.debug(self.__class__.__name__, 'Mininet has been correctly stopped.')
+
+    '''
+    Run mn -c for cleaning virtual interfaces and bridges.
+    '''
+    @staticmethod
+    def clean_up():
+        with Tracer.get_instance().span('mininet.clean_up'):
+            mininet_stop = Popen('sudo mn -c', shell=True, stdout=PIPE, stderr=PIPE)
+            mininet_stop.wait()
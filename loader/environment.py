@@ -1,8 +1,11 @@
+import time
 from abc import ABCMeta, abstractmethod
 
 from loader.env.mininet_simulator import MininetTopology, MininetStartSimulation
 import utils.class_for_name as Class
 from utils.log import Logger
+from utils.resources import AdmissionControl, HostResources, ResourceEstimator
+from utils.tracing import Tracer
 
 """
 This class has in charge the task to load the environment.
@@ -46,6 +49,20 @@ class Environment(object):
     def run(self, overlay):
         pass
 
+    '''
+    This method removes what an interrupted execution of this environment left behind.
+    '''
+    @abstractmethod
+    def clean_up(self):
+        pass
+
+    '''
+    This method checks that the host can run this environment for overlay, waiting at most timeout seconds for enough
+    resources; it raises a utils.resources.AdmissionError if it cannot. By default, environments are always admitted.
+    '''
+    def admit(self, overlay, timeout=0):
+        pass
+
 
 """
 This class models a Mininet environment, namely an environment in which the creation of configuration files consists
@@ -60,6 +77,12 @@ class MininetEnvironment(Environment):
         # Object for directly handler Mininet environment
         self._mininet_topology = None
         self._mininet_starter = None
+        # The overlay running into Mininet, and the resources it uses
+        self._overlay = None
+        self._start = None
+        self._baseline = None
+        self._started_usage = None
+        self._startup_time = None
 
     def __repr__(self):
         return self.__class__.__name__
@@ -69,7 +92,12 @@ class MininetEnvironment(Environment):
     '''
     def run(self, overlay):
         self._log.info(self.__class__.__name__, 'Initializing the environment')
+        self._overlay = overlay
+        self._start = time.time()
+        self._baseline = HostResources.get_usage()
         self._log.debug(self.__class__.__name__, 'Creating the topology in Mininet, starting from the current overlay.')
+        span = Tracer.get_instance().span('mininet.build', switches=len(overlay.get_nodes()),
+                                          hosts=len(overlay.get_hosts()), links=len(overlay.get_links()))
         # Create the network
         self._mininet_topology = MininetTopology(overlay)
         self._log.debug(self.__class__.__name__, 'Adding switches to Mininet.')
@@ -81,14 +109,47 @@ class MininetEnvironment(Environment):
         self._log.debug(self.__class__.__name__, 'Adding links to Mininet.')
         # Add links to MininetTopology
         self._mininet_topology.add_links()
+        span.end()
         # Create a MininetStartSimulationObject
         self._log.debug(self.__class__.__name__, 'Starting a Mininet environment.')
-        self._mininet_starter = MininetStartSimulation(self._mininet_topology)
+        self._mininet_starter = MininetStartSimulation(self._mininet_topology, self._started)
         self._mininet_starter.start()
         self._log.debug(self.__class__.__name__, 'Mininet is now correctly running.')
 
     '''
-    This method implements the steps for stopping this environment.
+    This method checks that the host can run Mininet for overlay, according to the resources estimated for it.
+    '''
+    def admit(self, overlay, timeout=0):
+        estimate = ResourceEstimator.get_instance().estimate(overlay)
+        self._log.info(self.__class__.__name__, 'Estimated startup time of Mininet: %.1f seconds.', estimate['startup'])
+        AdmissionControl.get_instance().admit(estimate, timeout)
+
+    '''
+    Called when Mininet has been started: its resources are now in use, thus they do not need to be reserved anymore.
+    '''
+    def _started(self):
+        self._startup_time = time.time() - self._start
+        self._started_usage = HostResources.get_usage()
+        AdmissionControl.get_instance().release()
+
+    '''
+    This method implements the steps for stopping this environment. The resources used by Mininet (the largest ones
+    between the end of its startup and its stop) are recorded for the estimation of the next ones.
     '''
     def stop(self):
+        usage = HostResources.get_usage()
         self._mininet_starter.stop()
+        if self._startup_time is not None:
+            used = dict((name, max(self._started_usage[name], usage[name]) - self._baseline[name])
+                        for name in HostResources.RESOURCES)
+            used['startup'] = self._startup_time
+            ResourceEstimator.get_instance().record(self._overlay, used)
+        else:
+            AdmissionControl.get_instance().release()
+
+    '''
+    This method removes the virtual interfaces and bridges left behind by an interrupted execution of Mininet.
+    '''
+    def clean_up(self):
+        self._log.info(self.__class__.__name__, 'Cleaning up a previous execution of Mininet.')
+        MininetStartSimulation.clean_up()
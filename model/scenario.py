@@ -26,6 +26,20 @@ class Scenario(object):
     def get_name(self):
         pass
 
+    '''
+    Return the parameters of this scenario, as declared in the configuration file.
+    '''
+    @abstractmethod
+    def get_parameters(self):
+        pass
+
+    '''
+    Return the version of the software run by this scenario (e.g. the controller), or None if it is unknown.
+    '''
+    @abstractmethod
+    def get_version(self):
+        pass
+
     '''
     Start this scenario.
     '''
@@ -33,6 +47,13 @@ class Scenario(object):
     def start(self):
         pass
 
+    '''
+    Remove what an interrupted execution of this scenario left behind (e.g. a running controller).
+    '''
+    @abstractmethod
+    def clean_up(self):
+        pass
+
     '''
     Destroy this scenario
     '''
@@ -1,9 +1,14 @@
-from threading import Thread
+from threading import Thread, Event
+import json
 import os
 import time
 
 from utils.log import Logger
 from utils.fs import FileSystem
+from utils.journal import Journal
+from utils.patterns.latch import CountDownLatch
+from utils.results import ResultsStore
+from utils.tracing import Tracer
 
 """
 This class models a simulation. A simulation consists of a folder in which frameworks stores some useful information.
@@ -20,7 +25,14 @@ All simulations are contained in the folder "simulation" and it has the followin
 
 class Simulation(Thread):
 
-    def __init__(self, topology, service, environment, alternative):
+    # Time (seconds) given to the alternative for settling before extracting data
+    SETTLE_TIME = 15
+    # Maximum time (seconds) to wait for a collector to become ready or to flush its data
+    COLLECTOR_TIMEOUT = 30
+    # Time (seconds) between two checks of the convergence of the alternative
+    CONVERGENCE_POLL_INTERVAL = 1.0
+
+    def __init__(self, topology, service, environment, alternative, parameters=None, fingerprint=None):
         Thread.__init__(self)
         """ Utils objects """
         # Get the object for filesystem handling
@@ -43,9 +55,17 @@ class Simulation(Thread):
         self._alternative = alternative
         # The metrics to evaluate during this simulation
         self._metrics = alternative.get_metrics()
-        # Extractor count. This variable is used to keep track of how many extractors notified this object
-        self._extractor_number = len(self._metrics)
-        self._extractor_count = 0
+        # The fingerprint of this simulation (see utils.fingerprint.Fingerprint), if any. Its digest identifies the
+        # simulation into the run journal
+        self._fingerprint = fingerprint
+        self._journal = Journal.get_instance() if fingerprint is not None else None
+        # Parameters of the framework, as declared in the configuration file
+        parameters = parameters or {}
+        self._parameters = dict(parameters)
+        self._settle_time = float(parameters.get('settle_time', self.SETTLE_TIME))
+        self._collector_timeout = float(parameters.get('collector_timeout', self.COLLECTOR_TIMEOUT))
+        # Whether the run ends as soon as a collector tells that the alternative has converged
+        self._early_stop = parameters.get('early_stop', 'no') == 'yes'
         # Initialize the simulation
         self._init()
 
@@ -77,6 +97,11 @@ class Simulation(Thread):
         self._simulation_path = os.path.join(alternative_path, time.strftime('%Y%m%d%H%M%S', time.localtime()))
         self._log.info(self.__class__.__name__, 'Creating folder for this simulation.')
         os.makedirs(self._simulation_path)
+        # Keep track of what has been simulated
+        if self._fingerprint is not None:
+            with open(os.path.join(self._simulation_path, 'fingerprint.json'), 'w') as fingerprint_file:
+                json.dump({'digest': self._fingerprint.get_digest(), 'components': self._fingerprint.get_components()},
+                          fingerprint_file, indent=1, sort_keys=True)
 
     '''
     Return the topology which the simulation is running on.
@@ -102,29 +127,55 @@ class Simulation(Thread):
     def get_simulation_path(self):
         return self._simulation_path
 
+    '''
+    Return the identifier of this simulation in the results store, namely the path of its folder relative to the root
+    simulation path (service/alternative/timestamp).
+    '''
+    def get_run_id(self):
+        return os.path.relpath(self._simulation_path, self._root_simulation_path)
+
+    '''
+    Record the state of this simulation into the run journal.
+    '''
+    def _record(self, state):
+        if self._journal is not None:
+            self._journal.record(self._fingerprint.get_digest(), state, service=self._service.get_name(),
+                                 alternative=self._alternative.get_name(), path=self._simulation_path,
+                                 run_id=self.get_run_id())
+
     '''
     Run the simulation
     '''
     def run(self):
+        self._record(Journal.RUNNING)
+        tracer = Tracer.get_instance()
         # The list of activated collectors
-        activated_collectors = []
+        collectors = []
         self._log.info(self.__class__.__name__, 'Preparing the execution of collectors.')
+        span = tracer.span('simulation.start_collectors')
         # First of all, for each metric of this simulation, run a collector if it is needed
         for metric in self._metrics:
             collector = metric.get_collector()
             if collector is not None:
-                if collector.get_name() not in activated_collectors:
+                if collector.get_name() not in [activated.get_name() for activated in collectors]:
                     self._log.debug(self.__class__.__name__,
                                     'A new collector %s has been detected; start it.', collector.get_name())
+                    collector.set_overlay(self._alternative.get_overlay())
                     collector.start()
                     # Put the collector into the list of activated collectors
-                    activated_collectors.append(collector.get_name())
+                    collectors.append(collector)
                     self._log.debug(self.__class__.__name__,
                                     'Collector %s has been added to the list of activated collectors.',
                                     collector.get_name())
                 else:
                     self._log.debug(self.__class__.__name__,
                                     'Collector %s has been already started.', collector.get_name())
+        span.end()
+        # Do not miss anything: wait for collectors to actually collect data
+        with tracer.span('simulation.collectors_warmup', collectors=len(collectors)):
+            for collector in collectors:
+                if not collector.wait_ready(self._collector_timeout):
+                    self._log.warning(self.__class__.__name__, 'Collector %s is not ready yet.', collector.get_name())
 
         '''
         Running a simulation consists in:
@@ -133,31 +184,109 @@ class Simulation(Thread):
         '''
 
         self._log.info(self.__class__.__name__, 'Setting up scenario for alternative %s.', self._alternative.get_name())
-        self._alternative.setting_up_scenario()
+        with tracer.span('simulation.setting_up_scenario'):
+            self._alternative.setting_up_scenario()
         self._log.info(self.__class__.__name__, 'Preparing the environment %s to be executed.', self._environment)
-        self._environment.run(self._alternative.get_overlay())
+        with tracer.span('simulation.run_environment', environment=self._environment):
+            self._environment.run(self._alternative.get_overlay())
 
         self._log.info(self.__class__.__name__, 'Preparing the execution of all extractors.')
-        # At the end of the simulation, run extractor for each metric
+        # At the end of the simulation, run extractor for each metric. All extractors run concurrently: they start
+        # extracting when data are ready, and count down the latch when they finish
+        start_event = Event()
+        latch = CountDownLatch(len(self._metrics))
+        extractors = []
         for metric in self._metrics:
             extractor = metric.get_extractor()
             self._log.debug(self.__class__.__name__, 'Extractor %s has been loaded.', extractor.get_name())
             extractor.set_simulation_path(self._simulation_path)
             extractor.set_overlay(self._alternative.get_overlay())
-            extractor.add_observer(self)
+            extractor.synchronize(start_event, latch)
             self._log.debug(self.__class__.__name__, 'Extractor %s is now going in execution.', extractor.get_name())
             extractor.start()
-            extractor.join()
+            extractors.append(extractor)
+        with tracer.span('simulation.wait_for_convergence', early_stop=self._early_stop):
+            self._wait_for_convergence(collectors)
+        # Data are ready once collectors have been stopped and their data flushed
+        with tracer.span('simulation.stop_collectors'):
+            self._stop_collectors(collectors)
+        start_event.set()
+        with tracer.span('simulation.extraction', extractors=len(extractors)):
+            latch.wait()
+        self._log.info(self.__class__.__name__, 'All extractors done; stop the environment.')
+        self._write_timings(extractors)
+        with tracer.span('simulation.store_results'):
+            self._store_results(extractors)
+        self._record(Journal.EXTRACTED)
+        with tracer.span('simulation.destroy_scenario'):
+            self._alternative.destroy()
+        with tracer.span('simulation.stop_environment'):
+            self._environment.stop()
+        self._log.info(self.__class__.__name__, 'Environment has been stopped.')
+        self._record(Journal.DONE)
 
     '''
-    This method is implemented in accord with Observer pattern. It observes the extractor: when all extractors ends
-    their task, the update method will stop the environment.
+    Wait until the alternative converges, namely for the settle time or, if early stop is enabled, until a collector
+    tells that the alternative has converged (the settle time being the maximum wait).
     '''
-    def update(self):
-        self._extractor_count += 1
-        if self._extractor_count == self._extractor_number:
-            self._log.info(self.__class__.__name__, 'All extractors done; stop the environment.')
-            self._alternative.destroy()
-            self._environment.stop()
-            self._log.info(self.__class__.__name__, 'Environment has been stopped.')
-            self._extractor_count = 0
+    def _wait_for_convergence(self, collectors):
+        self._log.info(self.__class__.__name__, 'Waiting %s seconds for the alternative to settle.', self._settle_time)
+        deadline = time.time() + self._settle_time
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            if self._early_stop and any(collector.is_converged() for collector in collectors):
+                self._log.info(self.__class__.__name__, 'The alternative has converged; ending the run %s seconds '
+                                                        'early.', remaining)
+                break
+            time.sleep(min(self.CONVERGENCE_POLL_INTERVAL, remaining))
+
+    '''
+    Stop all collectors and wait for their data to be flushed.
+    '''
+    def _stop_collectors(self, collectors):
+        self._log.info(self.__class__.__name__, 'Stopping all collectors.')
+        for collector in collectors:
+            collector.stop()
+        for collector in collectors:
+            if not collector.wait_flushed(self._collector_timeout):
+                self._log.warning(self.__class__.__name__, 'Collector %s did not flush its data in time.',
+                                  collector.get_name())
+        self._log.info(self.__class__.__name__, 'All collectors have been stopped.')
+
+    '''
+    Write the time spent by each extractor into the simulation folder (timings.data).
+    '''
+    def _write_timings(self, extractors):
+        with open(os.path.join(self._simulation_path, 'timings.data'), 'w') as output_file:
+            output_file.write('# extractor wait extraction error\n')
+            for extractor in extractors:
+                timings = extractor.get_timings()
+                output_file.write('%s %s %s %s\n' % (extractor.get_name(), timings['wait'], timings['extraction'],
+                                                     timings['error'] or ''))
+
+    '''
+    Store the values extracted by all extractors into the results store. The run is keyed by service, alternative,
+    topology and parameters (those of the framework, and those of each metric); it is completed if all extractors
+    succeeded and recorded some values, otherwise it is simulated again instead of being reused.
+    '''
+    def _store_results(self, extractors):
+        parameters = {'framework': self._parameters}
+        records = []
+        for metric, extractor in zip(self._metrics, extractors):
+            parameters[metric.get_name()] = extractor.get_parameters()
+            records.extend((metric.get_name(), name, subject, value)
+                           for name, subject, value in extractor.get_records())
+        store = ResultsStore.get_instance()
+        try:
+            store.add_run(self.get_run_id(), self._service.get_name(), self._alternative.get_name(),
+                          os.path.basename(self._topology.get_graphml_file()), parameters, self._simulation_path,
+                          time.time(), self._fingerprint.get_digest() if self._fingerprint is not None else None,
+                          all(extractor.get_timings()['error'] is None and extractor.get_records()
+                              for extractor in extractors))
+            store.add_records(self.get_run_id(), records)
+        except Exception as e:
+            self._log.error(self.__class__.__name__, 'Results cannot be stored into %s: %s', store.get_path(), e)
+            return
+        self._log.info(self.__class__.__name__, '%s values have been stored into the results store.', len(records))
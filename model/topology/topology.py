@@ -30,6 +30,12 @@ class Topology(object):
     def __repr__(self):
         return "Topology[name=%s, #overlays=%s]" % (self._name, self._overlays)
 
+    '''
+    Return the path of the GraphML file of the topology.
+    '''
+    def get_graphml_file(self):
+        return self._topology_as_graphml
+
     '''
     Return the topology read by a GraphML file.
     '''
@@ -0,0 +1,46 @@
+#! /usr/bin/env python
+
+import argparse
+
+from utils.results import ResultsStore
+
+"""
+Command line interface to the results store. Without a metric, it lists the stored runs; with a metric and the name of
+a value, it prints the comparison table of that value among the selected runs; with --records, it prints the single
+values instead.
+"""
+
+
+def main():
+    arg = argparse.ArgumentParser(description='Query the results of the Comparison Framework')
+    arg.add_argument('-m', '--metric', help='The metric (e.g. control-plane-overhead).')
+    arg.add_argument('-n', '--name', help='The name of the value (e.g. packets).')
+    arg.add_argument('--subject', help='Select only the values about this subject (e.g. a switch).')
+    for column in ResultsStore.RUN_COLUMNS:
+        arg.add_argument('--' + column.replace('_', '-'), dest=column, action='append',
+                         help='Select only the runs with this %s (it can be repeated).' % column.replace('_', ' '))
+    arg.add_argument('-g', '--group-by', default='service,alternative,topology',
+                     help='Comma separated columns to group the runs by (default: service,alternative,topology).')
+    arg.add_argument('-s', '--by-subject', action='store_true', help='Compare the values of each subject separately.')
+    arg.add_argument('-r', '--records', action='store_true', help='Print the single values instead of comparing them.')
+    arg.add_argument('-d', '--database', help='The results store (default: simulations/results.db).')
+    args = arg.parse_args()
+
+    store = ResultsStore(args.database) if args.database else ResultsStore.get_instance()
+    filters = dict((column, getattr(args, column)) for column in ResultsStore.RUN_COLUMNS
+                   if getattr(args, column) is not None)
+    if args.records or (args.metric is not None and args.name is None):
+        header = ['run_id', 'service', 'alternative', 'topology', 'metric', 'name', 'subject', 'value']
+        rows = store.query(args.metric, args.name, args.subject, **filters)
+    elif args.metric is None:
+        header = ['run_id', 'service', 'alternative', 'topology']
+        rows = [tuple(run[column] for column in header) for run in store.get_runs(**filters)]
+    else:
+        group_by = [column for column in args.group_by.split(',') if column]
+        header, rows = store.compare(args.metric, args.name, group_by, args.by_subject, args.subject, **filters)
+    print('\t'.join(header))
+    for row in rows:
+        print('\t'.join(str(value) for value in row))
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ from services.vpn.configurator import Rm3SdnVpnConfigurator
 from services.vpn.overlay import VpnOverlay
 from services.vpn.scenario import Rm3SdnVpnScenario
 from services.vpn.vpn import Switch, Link
+from utils.tracing import Tracer
 
 """
 This class implements the rm3-sdn-vpn's alternative.
@@ -83,7 +84,8 @@ class Rm3SdnVpnAlternative(Alternative):
     '''
     def setting_up_scenario(self):
         # Generate the configuration file
-        self._configurator.write_configurations(self._overlay)
+        with Tracer.get_instance().span('scenario.write_configurations'):
+            self._configurator.write_configurations(self._overlay)
         # Start the scenario
         self._scenario.start()
 
@@ -51,8 +51,9 @@ class Rm3SdnVpnConfigurator(Configurator):
             vpn.add_site(self._create_site(vpn, pes[1], overlay, i))
             self._log.debug(self.__class__.__name__, 'Sites have been correctly created.')
 
-            # Add VPN to the map of VPNs
+            # Add VPN to the map of VPNs, and to the overlay
             self._vpns[name] = vpn
+            overlay.add_vpn(vpn)
         self._log.info(self.__class__.__name__, 'All VPNs have been created.')
 
     '''
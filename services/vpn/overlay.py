@@ -16,6 +16,8 @@ class VpnOverlay(Overlay):
         # Internal data structures
         self._switches = {}
         self._hosts = {}
+        # VPNs defined over this overlay. This is a map<vpn_name, VirtualPrivateNetwork>
+        self._vpns = {}
         # This is a map<device, list of all connected devices>; it is an OrderedDict to preserve the mapping between
         # host-pe connections.
         self._links = [] #OrderedDict()
@@ -51,6 +53,13 @@ class VpnOverlay(Overlay):
         self._hosts[host.get_name()] = host
         self._log.debug(self.__class__.__name__, 'Host %s added.', host)
 
+    '''
+    Add a new VPN to this overlay.
+    '''
+    def add_vpn(self, vpn):
+        self._vpns[vpn.get_name()] = vpn
+        self._log.debug(self.__class__.__name__, 'VPN %s added.', vpn.get_name())
+
     '''
     Return a datapath starting from its datapath ID.
     '''
@@ -75,6 +84,12 @@ class VpnOverlay(Overlay):
     def get_hosts(self):
         return self._hosts
 
+    '''
+    Return all VPNs defined over this overlay.
+    '''
+    def get_vpns(self):
+        return self._vpns
+
     '''
     Return a random pair of PEs. On each PE, an host will be attached, in order to create VPN's sites.
     '''
@@ -3,6 +3,7 @@ import shutil
 
 from loader.env.controller import ControllerStarter
 from model.scenario import Scenario
+from utils.tracing import Tracer
 
 """
 This class models a scenario for Rm3SdnVpn alternative. It has in charge the task of running the controller.
@@ -16,6 +17,7 @@ class Rm3SdnVpnScenario(Scenario):
         self._name = self.__class__.__name__
         # Take params from kwargs
         params = kwargs.get('scenario')
+        self._parameters = dict(params)
         # Number of VPNs
         self._number_of_vpns = int(params['number_of_vpns'])
         # Controller (actually, the path to the controller. ryu-manager is required.)
@@ -37,6 +39,18 @@ class Rm3SdnVpnScenario(Scenario):
     def get_name(self):
         return self._name
 
+    '''
+    Return the parameters of this scenario, as declared in the configuration file.
+    '''
+    def get_parameters(self):
+        return dict(self._parameters)
+
+    '''
+    Return the version of the controller.
+    '''
+    def get_version(self):
+        return ControllerStarter.get_version(self._controller_path)
+
     '''
     Return the number of VPNs declared in this scenario.
     '''
@@ -76,9 +90,16 @@ class Rm3SdnVpnScenario(Scenario):
         # Essentially, this method has in charge the task of running controller
         self._log.debug(self.__class__.__name__, 'Starting controller.')
         self._controller = ControllerStarter(self._controller_path, self._controller_cmd)
-        self._controller.start()
+        with Tracer.get_instance().span('scenario.start_controller', vpns=self._number_of_vpns):
+            self._controller.start()
         self._log.info(self.__class__.__name__, 'Controller has been correctly started.')
 
+    '''
+    This method stops the controller left running by an interrupted execution of this scenario.
+    '''
+    def clean_up(self):
+        ControllerStarter.kill_stale()
+
     '''
     This method destroys the scenario previously created.
     '''
@@ -90,5 +111,6 @@ class Rm3SdnVpnScenario(Scenario):
         self._fs.delete(self._vpns_conf_file)
         self._log.debug(self.__class__.__name__, 'Stopping the controller.')
         # Stop the controller
-        self._controller.stop()
+        with Tracer.get_instance().span('scenario.stop_controller'):
+            self._controller.stop()
         self._log.info(self.__class__.__name__, 'Scenario %s has been correctly stopped.', self._name)
\ No newline at end of file
@@ -0,0 +1,40 @@
+import socket
+import struct
+import unittest
+
+from utils.openflow import OFPXMC_OPENFLOW_BASIC, OpenFlow13Codec
+
+'''
+Build an APPLY_ACTIONS instruction made of a single set_field action, padded as switches do.
+'''
+
+
+def set_field_instruction(field, value):
+    oxm = struct.pack('!HBB', OFPXMC_OPENFLOW_BASIC, field << 1, len(value)) + value
+    length = (4 + len(oxm) + 7) // 8 * 8
+    action = struct.pack('!HH', 25, length) + oxm + b'\x00' * (length - 4 - len(oxm))
+    return struct.pack('!HH4x', 4, 8 + len(action)) + action
+
+
+class SetFieldTest(unittest.TestCase):
+
+    def test_mpls_label(self):
+        self.assertEqual(OpenFlow13Codec.decode_instructions(set_field_instruction(34, struct.pack('!I', 100))),
+                         ['set_field:100->mpls_label'])
+
+    def test_ipv4(self):
+        self.assertEqual(OpenFlow13Codec.decode_instructions(set_field_instruction(12, socket.inet_aton('10.0.0.1'))),
+                         ['set_field:10.0.0.1->nw_dst'])
+
+    def test_vlan(self):
+        self.assertEqual(OpenFlow13Codec.decode_instructions(set_field_instruction(6, struct.pack('!H', 0x1000 | 10))),
+                         ['set_field:10->dl_vlan'])
+
+    def test_consecutive_actions(self):
+        instruction = set_field_instruction(34, struct.pack('!I', 100))
+        action = instruction[8:] + struct.pack('!HHIH6x', 0, 16, 2, 0)
+        self.assertEqual(OpenFlow13Codec.decode_instructions(struct.pack('!HH4x', 4, 8 + len(action)) + action),
+                         ['set_field:100->mpls_label', 'output:2'])
+
+if __name__ == '__main__':
+    unittest.main()
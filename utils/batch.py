@@ -0,0 +1,342 @@
+import glob
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+from threading import Thread, Lock
+
+import networkx as nx
+from configobj import ConfigObj
+
+from utils.fs import FileSystem
+from utils.log import Logger
+from utils.resources import ResourceEstimator
+from utils.results import ResultsStore
+from utils.scheduler import Scheduler
+
+"""
+This class models a job of a batch, namely the simulation of an alternative of a service over a topology. The size of
+the simulation (nodes and links of the topology, and VPNs of the scenario) drives the estimation of its cost.
+"""
+
+
+class Job(object):
+    def __init__(self, topology, service, alternative, nodes=0, links=0, vpns=0):
+        # The absolute path of the GraphML file of the topology
+        self._topology = topology
+        self._service = service
+        self._alternative = alternative
+        self._nodes = nodes
+        self._links = links
+        self._vpns = vpns
+
+    def __repr__(self):
+        return 'Job[topology=%s, service=%s, alternative=%s]' % (self.get_topology_name(), self._service,
+                                                                 self._alternative)
+
+    '''
+    Return the path of the GraphML file of the topology.
+    '''
+    def get_topology(self):
+        return self._topology
+
+    '''
+    Return the name of the topology, namely the name of its GraphML file without extension.
+    '''
+    def get_topology_name(self):
+        return os.path.splitext(os.path.basename(self._topology))[0]
+
+    def get_service(self):
+        return self._service
+
+    def get_alternative(self):
+        return self._alternative
+
+    def get_nodes(self):
+        return self._nodes
+
+    def get_links(self):
+        return self._links
+
+    def get_vpns(self):
+        return self._vpns
+
+    '''
+    Return the identifier of this job, used as the name of its workspace.
+    '''
+    def get_id(self):
+        return '%s-%s-%s' % (self.get_topology_name(), self._service.lower(), self._alternative)
+
+"""
+This class implements the batch mode of the framework: it simulates the alternatives of the services declared in a
+configuration file over a corpus of topologies. Each job (a topology, a service and an alternative) is executed by a
+separate instance of the framework, run by one of the local workers into an isolated workspace, namely a folder inside
+the workspaces folder (named after the job) holding its own log, tmp and simulations folders. Since a workspace only
+depends on its job, running a batch again skips the simulations already completed, in accord with their fingerprints.
+When a job ends, its results are merged into the results store of the batch, prefixing their run ids with the identifier
+of the job. Progress, estimated time to completion and the time spent by each job (batch.data, inside the workspaces
+folder) are reported.
+Jobs are assigned to the workers by a Scheduler (see utils.scheduler), whose costs are fitted on the timings of the
+previous batches; a worker without jobs left takes the last job of the most loaded one.
+Note that the files of the framework are isolated, but the emulator and the controller are shared by the whole host:
+run more workers only if the environment of the alternatives allows it.
+"""
+
+
+class Batch(object):
+
+    TIMINGS_FILE_NAME = 'batch.data'
+    OUTPUT_FILE_NAME = 'framework.out'
+    # Number of nodes and links of the topologies, by path
+    _sizes = {}
+
+    def __init__(self, config_file, workers=1, workspaces_folder=None, arguments=None):
+        # Logger
+        self._log = Logger.get_instance()
+        self._config_file = os.path.abspath(config_file)
+        self._workers = max(1, int(workers))
+        if workspaces_folder is None:
+            workspaces_folder = os.path.join(FileSystem.get_instance().get_root_folder(), 'workspaces')
+        self._workspaces_folder = os.path.abspath(workspaces_folder)
+        # Further arguments passed to each instance of the framework (e.g. --force)
+        self._arguments = list(arguments or [])
+        self._framework = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'framework.py')
+        # The state of the batch, shared by the workers
+        self._lock = Lock()
+        # The jobs left to each worker
+        self._queues = []
+        self._processes = set()
+        self._total = 0
+        self._finished = []
+        self._start = None
+        self._stopped = False
+
+    def __repr__(self):
+        return 'Batch[config_file=%s, workers=%s]' % (self._config_file, self._workers)
+
+    '''
+    Return the number of nodes and links of the topology stored into a GraphML file.
+    '''
+    @classmethod
+    def get_size(cls, path):
+        if path not in cls._sizes:
+            graph = nx.read_graphml(path)
+            cls._sizes[path] = (graph.number_of_nodes(), graph.number_of_edges())
+        return cls._sizes[path]
+
+    '''
+    Return the GraphML files matching patterns (globs or paths), whose number of nodes and links is within the given
+    bounds (None means no bound), sorted by size.
+    '''
+    @classmethod
+    def select_topologies(cls, patterns, min_nodes=None, max_nodes=None, min_links=None, max_links=None):
+        paths = set()
+        for pattern in patterns:
+            paths.update(os.path.abspath(path) for path in glob.glob(os.path.expanduser(pattern)))
+        topologies = []
+        for path in paths:
+            nodes, links = cls.get_size(path)
+            if (min_nodes is not None and nodes < min_nodes) or (max_nodes is not None and nodes > max_nodes) or \
+                    (min_links is not None and links < min_links) or (max_links is not None and links > max_links):
+                continue
+            topologies.append((nodes, links, path))
+        return [path for nodes, links, path in sorted(topologies)]
+
+    '''
+    Return the jobs simulating each alternative of each service declared in the configuration file over each topology.
+    '''
+    def plan(self, topologies):
+        configuration = ConfigObj(infile=self._config_file)
+        services = configuration['Framework']['services']
+        if not isinstance(services, list):
+            services = [services]
+        jobs = []
+        for topology in topologies:
+            for service in services:
+                service = service.replace(' ', '')
+                alternatives = configuration[service]['alternatives']
+                if not isinstance(alternatives, list):
+                    alternatives = [alternatives]
+                for alternative in alternatives:
+                    nodes, links = self.get_size(topology)
+                    vpns = int(configuration[service].get(alternative, {}).get('number_of_vpns', 0))
+                    jobs.append(Job(topology, service, alternative, nodes, links, vpns))
+        self._log.info(self.__class__.__name__, '%s jobs have been planned over %s topologies.', len(jobs),
+                       len(topologies))
+        return jobs
+
+    '''
+    Prepare the workspace of a job, returning its path.
+    '''
+    def _prepare_workspace(self, job):
+        workspace = os.path.join(self._workspaces_folder, job.get_id())
+        for folder in ('log', 'tmp', 'simulations'):
+            if not os.path.isdir(os.path.join(workspace, folder)):
+                os.makedirs(os.path.join(workspace, folder))
+        # The framework reads its system configuration relatively to the working folder
+        conf = os.path.join(workspace, 'conf')
+        if not os.path.lexists(conf):
+            os.symlink(os.path.join(os.path.dirname(self._framework), 'conf'), conf)
+        # The resources used by the emulations are shared by all jobs, since they depend on the host
+        simulations_folder = FileSystem.get_instance().get_simulations_folder()
+        if not os.path.isdir(simulations_folder):
+            os.makedirs(simulations_folder)
+        history = os.path.join(workspace, 'simulations', ResourceEstimator.HISTORY_FILE_NAME)
+        if not os.path.lexists(history):
+            os.symlink(os.path.join(simulations_folder, ResourceEstimator.HISTORY_FILE_NAME), history)
+        return workspace
+
+    '''
+    Execute a job into its workspace, returning the exit code of the framework.
+    '''
+    def _execute(self, job):
+        workspace = self._prepare_workspace(job)
+        command = [sys.executable, self._framework, '-c', self._config_file, '-t', job.get_topology(),
+                   '-s', job.get_service(), '-a', job.get_alternative()] + self._arguments
+        with open(os.path.join(workspace, 'log', self.OUTPUT_FILE_NAME), 'a') as output_file:
+            with self._lock:
+                if self._stopped:
+                    return None
+                process = subprocess.Popen(command, cwd=workspace, stdout=output_file, stderr=subprocess.STDOUT)
+                self._processes.add(process)
+            code = process.wait()
+            with self._lock:
+                self._processes.discard(process)
+        # Merge the results of the job into the results store of the batch
+        database = os.path.join(workspace, 'simulations', ResultsStore.DATABASE_FILE_NAME)
+        if os.path.exists(database):
+            ResultsStore.get_instance().merge(database, job.get_id() + '/')
+        return code
+
+    '''
+    Return the next job of a worker, or None if no job is left. When its own jobs are over, a worker takes the last job
+    of the worker with most jobs left.
+    '''
+    def _next_job(self, worker):
+        with self._lock:
+            if self._queues[worker]:
+                return self._queues[worker].popleft()
+            queue = max(self._queues, key=len)
+            if queue:
+                return queue.pop()
+        return None
+
+    '''
+    Body of a worker: execute jobs until no job is left.
+    '''
+    def _work(self, worker):
+        while not self._stopped:
+            job = self._next_job(worker)
+            if job is None:
+                return
+            start = time.time()
+            try:
+                code = self._execute(job)
+            except Exception as e:
+                self._log.error(self.__class__.__name__, 'Job %s failed: %s.', job.get_id(), e)
+                code = -1
+            if code is None:
+                return
+            self._report(job, start, time.time() - start, code)
+
+    '''
+    Record that a job finished, and log the progress of the batch with the estimated time to its completion.
+    '''
+    def _report(self, job, start, elapsed, code):
+        with self._lock:
+            self._finished.append((job, start, elapsed, code))
+            finished = len(self._finished)
+            with open(os.path.join(self._workspaces_folder, self.TIMINGS_FILE_NAME), 'a') as output_file:
+                output_file.write('%s %s %s %s %s %s %s %s %s\n' % (
+                    job.get_id(), job.get_topology_name(), job.get_service(), job.get_alternative(), job.get_nodes(),
+                    job.get_links(), job.get_vpns(), elapsed, code))
+        # Jobs are executed by all workers at the same time
+        throughput = finished / (time.time() - self._start)
+        eta = (self._total - finished) / throughput if throughput > 0 else float('nan')
+        self._log.info(self.__class__.__name__, '[%s/%s] Job %s %s in %.1f seconds; ETA %s.', finished, self._total,
+                       job.get_id(), 'succeeded' if code == 0 else 'failed (exit code %s)' % code, elapsed,
+                       self._format_duration(eta))
+
+    '''
+    Format a duration (seconds) as hours, minutes and seconds.
+    '''
+    @staticmethod
+    def _format_duration(seconds):
+        if seconds != seconds:
+            return 'unknown'
+        minutes, seconds = divmod(int(round(seconds)), 60)
+        hours, minutes = divmod(minutes, 60)
+        return '%d:%02d:%02d' % (hours, minutes, seconds)
+
+    '''
+    Return the timings of the jobs successfully executed by the previous batches, as a list of (job, elapsed) tuples.
+    '''
+    def load_history(self):
+        history = []
+        path = os.path.join(self._workspaces_folder, self.TIMINGS_FILE_NAME)
+        if not os.path.exists(path):
+            return history
+        with open(path) as input_file:
+            for line in input_file:
+                fields = line.split()
+                # Skip comments, and the lines written by batches which did not record the size of the jobs
+                if len(fields) != 9 or line.startswith('#') or fields[8] != '0':
+                    continue
+                job_id, topology, service, alternative, nodes, links, vpns, elapsed, code = fields
+                history.append((Job(topology, service, alternative, int(nodes), int(links), int(vpns)),
+                                float(elapsed)))
+        return history
+
+    '''
+    Schedule jobs among the workers, returning the scheduler.
+    '''
+    def schedule(self, jobs):
+        scheduler = Scheduler(self._workers)
+        history = self.load_history()
+        scheduler.fit(history)
+        self._queues = [deque(worker_jobs) for worker_jobs in scheduler.schedule(jobs)]
+        self._log.info(self.__class__.__name__, '%s jobs have been scheduled on %s workers (based on %s timings); '
+                       'estimated makespan: %.1f.', len(jobs), self._workers, len(history), scheduler.get_makespan())
+        return scheduler
+
+    '''
+    Return the jobs of each worker, in order of execution.
+    '''
+    def get_queues(self):
+        return [list(queue) for queue in self._queues]
+
+    '''
+    Execute jobs with the configured number of workers, returning a list of (job, start, elapsed, exit code) tuples.
+    If interrupted, the running instances of the framework are terminated.
+    '''
+    def run(self, jobs):
+        if not os.path.isdir(self._workspaces_folder):
+            os.makedirs(self._workspaces_folder)
+        self.schedule(jobs)
+        with open(os.path.join(self._workspaces_folder, self.TIMINGS_FILE_NAME), 'a') as output_file:
+            output_file.write('# job topology service alternative nodes links vpns elapsed code\n')
+        self._total = len(jobs)
+        self._start = time.time()
+        workers = [Thread(target=self._work, args=(i,), name='BatchWorker-%s' % i)
+                   for i in range(min(self._workers, len(jobs)))]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+        try:
+            # Join with a timeout, so that the main thread can be interrupted
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(1.0)
+        except KeyboardInterrupt:
+            self._log.warning(self.__class__.__name__, 'Batch interrupted; terminating the running jobs.')
+            with self._lock:
+                self._stopped = True
+                for process in self._processes:
+                    process.terminate()
+            for worker in workers:
+                worker.join()
+        failed = len([code for job, start, elapsed, code in self._finished if code != 0])
+        self._log.info(self.__class__.__name__, '%s of %s jobs finished (%s failed) in %s.', len(self._finished),
+                       self._total, failed, self._format_duration(time.time() - self._start))
+        return list(self._finished)
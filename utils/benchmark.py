@@ -0,0 +1,518 @@
+from abc import ABCMeta, abstractmethod
+from multiprocessing import Pipe, Process
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import struct
+import time
+import traceback
+
+import networkx as nx
+import numpy as np
+import psutil
+from scapy.layers.inet import IP, TCP
+from scapy.layers.l2 import Ether
+from scapy.packet import Raw
+from scapy.utils import PcapWriter
+
+from collector.extractors.convergence_time import _analyze_capture
+from collector.extractors.cp_rate import _load_and_bin
+from collector.extractors.overhead import _count_openflow_packets
+from model.topology.topology import Topology
+from services.vpn.alternative import Rm3SdnVpnAlternative
+from services.vpn.configurator import Rm3SdnVpnConfigurator
+from services.vpn.overlay import VpnOverlay
+from services.vpn.vpn import Switch
+from utils.openflow import OFP_TCP_PORT, OpenFlow13Codec
+from utils.prefix import PrefixTrie
+from utils.tracing import monotonic
+
+"""
+This file contains the benchmarks of the hot paths of the framework: reading topologies, building the overlays and the
+VPNs, writing the configuration of the controller and analyzing the sniffs of the control plane. Benchmarks need neither
+Mininet nor root privileges: their inputs are synthetic topologies and synthetic captures of OpenFlow traffic, generated
+with a fixed seed at several scales (SCALES).
+"""
+
+# The size of the synthetic inputs at each scale: number of nodes of the topologies (the number of VPNs is half of it)
+# and number of packets of the captures
+SCALES = {
+    'small': {'nodes': 25, 'packets': 1000},
+    'medium': {'nodes': 100, 'packets': 5000},
+    'large': {'nodes': 400, 'packets': 20000}
+}
+SCALE_NAMES = ['small', 'medium', 'large']
+
+'''
+Write a synthetic topology with the given number of nodes into path, as a GraphML file in the format of the Topology
+Zoo: a preferential attachment graph (about two links for each node), whose nodes have a label and a VRF role (half
+of them are PEs).
+'''
+
+
+def write_topology(path, nodes, seed=1):
+    graph = nx.barabasi_albert_graph(nodes, 2, seed=seed)
+    for node in graph.nodes():
+        graph.node[node]['label'] = 'N%04d' % node
+        graph.node[node]['vrf_role'] = 'PE' if node % 2 == 0 else 'P'
+    nx.write_graphml(graph, path)
+
+'''
+Return the subnets of the sites of the VPNs of a synthetic capture with the given number of packets.
+'''
+
+
+def get_capture_networks(packets):
+    return ['10.%s.%s.0/24' % (i // 256, i % 256) for i in range(max(2, packets // 100))]
+
+'''
+Write a synthetic capture of the control plane with the given number of packets into path, as a pcap file: a switch
+connects to the controller every 500 packets (TCP handshake, HELLO and FEATURES), then the controller installs FLOW_MOD
+messages matching the subnets of the VPNs (see get_capture_networks), interleaved by BARRIER, ECHO and PACKET_IN
+messages and by TCP acknowledgements. Packets are 1 ms apart.
+'''
+
+
+def write_capture(path, packets, seed=1):
+    generator = random.Random(seed)
+    networks = get_capture_networks(packets)
+    controller = '10.255.255.254'
+    # The state of the connection of each switch: [address, port, next sequence number to and from the controller]
+    switches = []
+    writer = PcapWriter(path)
+    written = [0]
+
+    # Write a TCP segment of a switch connection, from the switch if to_controller is True
+    def write(switch, to_controller, flags, payload=b''):
+        address, port, sequences = switch
+        index = 0 if to_controller else 1
+        if to_controller:
+            segment = IP(src=address, dst=controller) / TCP(sport=port, dport=OFP_TCP_PORT, flags=flags,
+                                                            seq=sequences[0], ack=sequences[1])
+        else:
+            segment = IP(src=controller, dst=address) / TCP(sport=OFP_TCP_PORT, dport=port, flags=flags,
+                                                            seq=sequences[1], ack=sequences[0])
+        pkt = Ether() / segment
+        if payload:
+            pkt = pkt / Raw(load=payload)
+        pkt.time = 1e9 + written[0] * 0.001
+        writer.write(pkt)
+        written[0] += 1
+        sequences[index] += len(payload) + (1 if 'S' in flags else 0)
+
+    try:
+        xid = 0
+        while written[0] < packets:
+            xid += 1
+            if written[0] // 500 >= len(switches):
+                # A new switch connects to the controller
+                switch = ['10.254.%s.%s' % (len(switches) // 256, len(switches) % 256 + 1), 40000 + len(switches),
+                          [generator.randint(0, 2 ** 30), generator.randint(0, 2 ** 30)]]
+                switches.append(switch)
+                write(switch, True, 'S')
+                write(switch, False, 'SA')
+                write(switch, True, 'A')
+                write(switch, True, 'PA', OpenFlow13Codec.hello(xid))
+                write(switch, False, 'PA', OpenFlow13Codec.hello(xid))
+                write(switch, False, 'PA', OpenFlow13Codec.message(5, xid))
+                write(switch, True, 'PA', OpenFlow13Codec.message(6, xid, b'\x00' * 24))
+                continue
+            switch = generator.choice(switches)
+            draw = generator.random()
+            if draw < 0.6:
+                write(switch, False, 'PA', _flow_mod(xid, generator.choice(networks)))
+            elif draw < 0.7:
+                write(switch, False, 'PA', OpenFlow13Codec.message(20, xid))
+                write(switch, True, 'PA', OpenFlow13Codec.message(21, xid))
+            elif draw < 0.8:
+                write(switch, True, 'PA', OpenFlow13Codec.message(2, xid))
+                write(switch, False, 'PA', OpenFlow13Codec.message(3, xid))
+            elif draw < 0.9:
+                write(switch, True, 'PA', OpenFlow13Codec.message(10, xid, b'\x00' * 32))
+            else:
+                write(switch, True, 'A')
+    finally:
+        writer.close()
+    return networks
+
+'''
+Build an OpenFlow 1.3 FLOW_MOD message adding a flow which matches the IPv4 packets destined to network.
+'''
+
+
+def _flow_mod(xid, network):
+    address, length = network.split('/')
+    mask = (0xffffffff << (32 - int(length))) & 0xffffffff
+    # OXM fields ETH_TYPE (IPv4) and IPV4_DST (masked)
+    fields = struct.pack('!HBBH', 0x8000, 5 << 1, 2, 0x0800) + \
+        struct.pack('!HBB', 0x8000, (12 << 1) | 1, 8) + socket.inet_aton(address) + struct.pack('!I', mask)
+    match = struct.pack('!HH', 1, 4 + len(fields)) + fields
+    match += b'\x00' * (-len(match) % 8)
+    # cookie, cookie_mask, table_id, command (ADD), idle and hard timeouts, priority, buffer_id, out_port, out_group,
+    # flags
+    body = struct.pack('!QQBBHHHIIIH2x', 0, 0, 0, 0, 0, 0, 100, 0xffffffff, 0xffffffff, 0xffffffff, 0) + match
+    return OpenFlow13Codec.message(14, xid, body)
+
+"""
+This class models a stage of the framework to benchmark. Its synthetic inputs are generated once for each scale
+(generate); before each measured execution, the objects it needs are set up (setup), so that only run is timed. The
+throughput of a stage is measured in units (e.g. nodes or packets) per second.
+"""
+
+
+class BenchmarkStage(object):
+
+    __metaclass__ = ABCMeta
+
+    # The name of the stage, the measure of its size (see SCALES) and the unit of its throughput
+    NAME = None
+    SIZE = None
+    UNIT = None
+
+    def __repr__(self):
+        return 'BenchmarkStage[name=%s]' % self.NAME
+
+    def get_name(self):
+        return self.NAME
+
+    def get_unit(self):
+        return self.UNIT
+
+    '''
+    Return the size of the inputs of this stage at a scale.
+    '''
+    def get_size(self, scale):
+        return SCALES[scale][self.SIZE]
+
+    '''
+    Generate the synthetic inputs of this stage at a scale into folder (or reuse them, if they exist), returning them.
+    '''
+    @abstractmethod
+    def generate(self, scale, folder):
+        pass
+
+    '''
+    Return the state needed by run, starting from the inputs.
+    '''
+    def setup(self, inputs):
+        return inputs
+
+    '''
+    Execute the stage on state, returning the number of processed units.
+    '''
+    @abstractmethod
+    def run(self, state):
+        pass
+
+"""
+This class models the stages whose input is a synthetic topology.
+"""
+
+
+class TopologyStage(BenchmarkStage):
+
+    __metaclass__ = ABCMeta
+
+    SIZE = 'nodes'
+    UNIT = 'nodes'
+
+    def generate(self, scale, folder):
+        nodes = self.get_size(scale)
+        path = os.path.join(folder, 'topology-%s.graphml' % nodes)
+        if not os.path.exists(path):
+            write_topology(path, nodes)
+        return path
+
+    '''
+    Return a new alternative, whose scenario declares one VPN every two nodes of graph.
+    '''
+    @staticmethod
+    def _create_alternative(graph):
+        # The VPNs of the alternative are placed at random
+        random.seed(1)
+        scenario = {'number_of_vpns': len(graph) // 2, 'controller_path': '', 'controller_cmd': ''}
+        return Rm3SdnVpnAlternative('rm3-sdn-vpn', scenario=scenario)
+
+"""
+This stage reads a topology from its GraphML file (model.topology.topology.Topology).
+"""
+
+
+class ReadTopologyStage(TopologyStage):
+    NAME = 'topology'
+
+    def run(self, state):
+        topology = Topology(state)
+        return len(topology.get_overlay('TopologyOverlay').get_vertices())
+
+"""
+This stage creates the overlay of the rm3-sdn-vpn alternative: switches, VPNs, hosts and links.
+"""
+
+
+class CreateOverlayStage(TopologyStage):
+    NAME = 'overlay'
+
+    def setup(self, inputs):
+        graph = nx.read_graphml(inputs)
+        return self._create_alternative(graph), graph
+
+    def run(self, state):
+        alternative, graph = state
+        return len(alternative.create_overlay(graph).get_nodes())
+
+"""
+This stage creates the VPNs over an overlay of switches (services.vpn.configurator.Rm3SdnVpnConfigurator).
+"""
+
+
+class CreateVpnsStage(TopologyStage):
+    NAME = 'vpns'
+    UNIT = 'vpns'
+
+    def setup(self, inputs):
+        graph = nx.read_graphml(inputs)
+        overlay = VpnOverlay()
+        for node in graph.nodes():
+            overlay.add_node(Switch(int(node) + 1, graph.node[node]['label'], graph.node[node]['vrf_role']))
+        random.seed(1)
+        return Rm3SdnVpnConfigurator(), overlay, len(graph) // 2
+
+    def run(self, state):
+        configurator, overlay, number_of_vpns = state
+        configurator.create_vpns(overlay, number_of_vpns)
+        return number_of_vpns
+
+"""
+This stage writes the configuration files of the controller (system.conf and the XML file vpns.xml).
+"""
+
+
+class WriteConfigurationsStage(TopologyStage):
+    NAME = 'xml'
+    UNIT = 'vpns'
+
+    def setup(self, inputs):
+        alternative = self._create_alternative(nx.read_graphml(inputs))
+        overlay = alternative.create_overlay(nx.read_graphml(inputs))
+        return alternative.get_configurator(), overlay
+
+    def run(self, state):
+        configurator, overlay = state
+        configurator.write_configurations(overlay)
+        return len(overlay.get_vpns())
+
+"""
+This class models the stages whose input is a synthetic capture of the control plane, analyzed as the extractors do
+when the collector did not analyze it online.
+"""
+
+
+class CaptureStage(BenchmarkStage):
+
+    __metaclass__ = ABCMeta
+
+    SIZE = 'packets'
+    UNIT = 'packets'
+
+    def generate(self, scale, folder):
+        packets = self.get_size(scale)
+        path = os.path.join(folder, 'capture-%s.pcap' % packets)
+        if not os.path.exists(path):
+            write_capture(path + '.part', packets)
+            os.rename(path + '.part', path)
+        return path, packets
+
+"""
+This stage counts the OpenFlow packets of a capture (collector.extractors.overhead).
+"""
+
+
+class ControlPlaneOverheadStage(CaptureStage):
+    NAME = 'cp-overhead'
+
+    def run(self, state):
+        path, packets = state
+        _count_openflow_packets(path)
+        return packets
+
+"""
+This stage looks for the state-changing messages of a capture, also for each VPN
+(collector.extractors.convergence_time).
+"""
+
+
+class ControlPlaneConvergenceTimeStage(CaptureStage):
+    NAME = 'cp-convergence-time'
+
+    def setup(self, inputs):
+        path, packets = inputs
+        vpn_networks = PrefixTrie()
+        for i, network in enumerate(get_capture_networks(packets)):
+            vpn_networks.insert(network, 'vpn-%s' % i)
+        return path, packets, vpn_networks
+
+    def run(self, state):
+        path, packets, vpn_networks = state
+        _analyze_capture(path, vpn_networks)
+        return packets
+
+"""
+This stage bins the OpenFlow messages of a capture into time windows (collector.extractors.cp_rate).
+"""
+
+
+class ControlPlaneRateStage(CaptureStage):
+    NAME = 'cp-rate'
+
+    def run(self, state):
+        path, packets = state
+        _load_and_bin(path, 1.0)
+        return packets
+
+# All stages, in order of execution
+STAGES = [ReadTopologyStage(), CreateOverlayStage(), CreateVpnsStage(), WriteConfigurationsStage(),
+          ControlPlaneOverheadStage(), ControlPlaneConvergenceTimeStage(), ControlPlaneRateStage()]
+STAGE_NAMES = [stage.get_name() for stage in STAGES]
+
+'''
+Execute a stage repeat times, sending its measures through connection. This function is executed into a new process,
+so that the peak memory of the stage is not affected by the other stages.
+'''
+
+
+def _measure(stage, inputs, repeat, connection):
+    try:
+        process = psutil.Process(os.getpid())
+        initial_memory = process.memory_info().rss
+        elapsed = []
+        units = 0
+        for i in range(repeat):
+            state = stage.setup(inputs)
+            start = monotonic()
+            units = stage.run(state)
+            elapsed.append(monotonic() - start)
+        # The peak resident set size of a new process starts from its resident set size (ru_maxrss is in kilobytes)
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - initial_memory
+        connection.send({'units': units, 'elapsed': elapsed, 'peak_memory': max(0, peak_memory)})
+    except Exception:
+        connection.send({'error': traceback.format_exc()})
+    finally:
+        connection.close()
+
+"""
+This class implements the benchmark suite: it measures each stage at each scale, in a new process, and compares the
+results with a baseline. For each stage and scale, the results report the size of the inputs, the best and the median
+time of repeat executions, the throughput (units per second, in the best execution) and the peak memory, namely the
+growth of the peak resident set size of the process during the executions (setup included). Results are saved as JSON.
+"""
+
+
+class Benchmark(object):
+
+    # Peak memory differences (bytes) below this one are not regressions, since they are within the noise of the
+    # allocator
+    MEMORY_TOLERANCE = 1024 * 1024
+
+    def __init__(self, folder, repeat=5):
+        # The folder of the synthetic inputs
+        self._folder = folder
+        self._repeat = max(1, int(repeat))
+        self._results = {}
+
+    def __repr__(self):
+        return 'Benchmark[repeat=%s, #results=%s]' % (self._repeat, len(self._results))
+
+    '''
+    Return the key of the results of a stage at a scale.
+    '''
+    @staticmethod
+    def get_key(stage_name, scale):
+        return '%s/%s' % (stage_name, scale)
+
+    '''
+    Return the results measured so far, as a map<key, map<measure, value>>.
+    '''
+    def get_results(self):
+        return dict(self._results)
+
+    '''
+    Measure a stage at a scale, returning its results. It raises a RuntimeError if the stage fails.
+    '''
+    def measure(self, stage, scale):
+        if not os.path.exists(self._folder):
+            os.makedirs(self._folder)
+        inputs = stage.generate(scale, self._folder)
+        receiver, sender = Pipe(duplex=False)
+        process = Process(target=_measure, args=(stage, inputs, self._repeat, sender))
+        process.start()
+        sender.close()
+        try:
+            measures = receiver.recv()
+        except EOFError:
+            measures = {'error': 'The process exited with code %s.' % process.exitcode}
+        process.join()
+        if 'error' in measures:
+            raise RuntimeError('Stage %s failed at scale %s: %s' % (stage.get_name(), scale, measures['error']))
+        best = min(measures['elapsed'])
+        result = {
+            'stage': stage.get_name(),
+            'scale': scale,
+            'size': stage.get_size(scale),
+            'unit': stage.get_unit(),
+            'units': measures['units'],
+            'best': best,
+            'median': float(np.median(measures['elapsed'])),
+            'throughput': measures['units'] / best if best > 0 else None,
+            'peak_memory': measures['peak_memory']
+        }
+        self._results[self.get_key(stage.get_name(), scale)] = result
+        return result
+
+    '''
+    Save the results into path, as JSON.
+    '''
+    def save(self, path):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        document = {'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'host': platform.node(),
+                    'python': platform.python_version(), 'repeat': self._repeat, 'results': self._results}
+        with open(path + '.part', 'w') as output_file:
+            json.dump(document, output_file, indent=2, sort_keys=True)
+        os.rename(path + '.part', path)
+
+    '''
+    Load the results saved into path.
+    '''
+    @staticmethod
+    def load(path):
+        with open(path) as input_file:
+            return json.load(input_file)['results']
+
+    '''
+    Compare results with baseline (both maps<key, map<measure, value>>), returning a list of (key, measure, value,
+    baseline value, relative change) tuples, one for each regression: a throughput lower than the baseline one by more
+    than threshold (e.g. 0.1 means 10%), or a peak memory higher by more than threshold (and MEMORY_TOLERANCE). Results
+    missing from the baseline are not compared.
+    '''
+    @classmethod
+    def compare(cls, results, baseline, threshold):
+        regressions = []
+        for key in sorted(results.keys()):
+            if key not in baseline or results[key]['size'] != baseline[key]['size']:
+                continue
+            throughput = results[key]['throughput']
+            baseline_throughput = baseline[key]['throughput']
+            if throughput and baseline_throughput and throughput < baseline_throughput * (1 - threshold):
+                regressions.append((key, 'throughput', throughput, baseline_throughput,
+                                    throughput / baseline_throughput - 1))
+            memory = results[key]['peak_memory']
+            baseline_memory = baseline[key]['peak_memory']
+            if memory > baseline_memory * (1 + threshold) and memory - baseline_memory > cls.MEMORY_TOLERANCE:
+                regressions.append((key, 'peak_memory', memory, baseline_memory,
+                                    memory / float(baseline_memory) - 1 if baseline_memory else float('inf')))
+        return regressions
@@ -0,0 +1,75 @@
+import hashlib
+import json
+
+"""
+This class models the fingerprint of an experiment, namely of the simulation of an alternative. Two simulations with
+the same fingerprint are expected to give the same results, thus a simulation whose fingerprint matches a completed one
+can be skipped. The fingerprint is made of the following components:
+ - topology: the hash of the content of the GraphML file;
+ - service, alternative, adapter and environment: the names of the service, of the alternative, of the class
+   implementing it and of the environment;
+ - scenario and version: the parameters of the scenario and the version of the software it runs (e.g. the controller);
+ - seed: the seed of the random generator (always explicit, 1 if not declared);
+ - framework: the parameters of the framework which affect the results;
+ - metrics: the parameters of each metric to evaluate.
+"""
+
+
+class Fingerprint(object):
+
+    # Parameters of the framework which do not affect the results
+    IGNORED_PARAMETERS = ('collector_timeout', 'processes', 'seed', 'repetitions', 'min_repetitions', 'confidence',
+                          'tolerance', 'stop_on', 'admission', 'admission_timeout', 'admission_margin', 'tracing')
+
+    def __init__(self, components):
+        self._components = components
+        self._digest = hashlib.sha1(json.dumps(components, sort_keys=True)).hexdigest()
+
+    def __repr__(self):
+        return 'Fingerprint[digest=%s]' % self._digest
+
+    '''
+    Create the fingerprint of the simulation of an alternative of a service over the topology stored into
+    topology_file, given the parameters of the framework.
+    '''
+    @classmethod
+    def create(cls, topology_file, service, alternative, framework_parameters):
+        scenario = alternative.get_scenario()
+        components = {
+            'topology': cls.hash_file(topology_file),
+            'service': service.get_name(),
+            'alternative': alternative.get_name(),
+            'adapter': alternative.__class__.__module__ + '.' + alternative.__class__.__name__,
+            'environment': alternative.get_environment(),
+            'scenario': scenario.get_parameters(),
+            'version': scenario.get_version(),
+            'seed': framework_parameters.get('seed'),
+            'framework': dict((name, value) for name, value in framework_parameters.items()
+                              if name not in cls.IGNORED_PARAMETERS),
+            'metrics': dict((metric.get_name(), metric.get_extractor().get_parameters())
+                            for metric in alternative.get_metrics())
+        }
+        return cls(components)
+
+    '''
+    Return the hash of the content of a file.
+    '''
+    @staticmethod
+    def hash_file(path):
+        digest = hashlib.sha1()
+        with open(path, 'rb') as input_file:
+            for block in iter(lambda: input_file.read(65536), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    '''
+    Return the digest identifying this fingerprint.
+    '''
+    def get_digest(self):
+        return self._digest
+
+    '''
+    Return the components of this fingerprint, as a map.
+    '''
+    def get_components(self):
+        return dict(self._components)
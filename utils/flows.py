@@ -0,0 +1,426 @@
+import numpy as np
+
+"""
+This file contains the structured representation of the flow tables of the switches. Flow entries are built either
+from the output of ovs-ofctl dump-flows or from the flow statistics decoded by utils.openflow.OpenFlow13Codec; in both
+cases matches and actions use the ovs-ofctl notation, normalized so that entries coming from different sources can be
+compared.
+"""
+
+# Default priority of a flow (ovs-ofctl does not print it)
+DEFAULT_PRIORITY = 32768
+
+# Fields of an ovs-ofctl dump-flows line which are not part of the match
+_STATISTICS_FIELDS = ('cookie', 'duration', 'table', 'n_packets', 'n_bytes', 'priority', 'idle_timeout',
+                      'hard_timeout', 'idle_age', 'hard_age', 'importance')
+# Match fields whose value is an IPv4 address (possibly masked)
+IPV4_FIELDS = ('nw_src', 'nw_dst', 'ipv4_src', 'ipv4_dst', 'arp_spa', 'arp_tpa')
+_FLAGS = ('send_flow_rem', 'reset_counts', 'no_packet_counts', 'no_byte_counts', 'check_overlap')
+# Shorthands used by ovs-ofctl for common protocols
+_SHORTHANDS = {
+    'ip': (('dl_type', '0x0800'),),
+    'ipv6': (('dl_type', '0x86dd'),),
+    'arp': (('dl_type', '0x0806'),),
+    'rarp': (('dl_type', '0x8035'),),
+    'mpls': (('dl_type', '0x8847'),),
+    'mplsm': (('dl_type', '0x8848'),),
+    'icmp': (('dl_type', '0x0800'), ('nw_proto', '1')),
+    'tcp': (('dl_type', '0x0800'), ('nw_proto', '6')),
+    'udp': (('dl_type', '0x0800'), ('nw_proto', '17')),
+    'sctp': (('dl_type', '0x0800'), ('nw_proto', '132'))
+}
+
+'''
+Normalize the value of a match field.
+'''
+
+
+def _normalize_field(name, value):
+    if name == 'dl_type':
+        return '0x%04x' % int(value, 0)
+    return value
+
+'''
+Split a string on the commas which are not enclosed into parentheses.
+'''
+
+
+def _split(text):
+    tokens = []
+    depth = 0
+    current = []
+    for char in text:
+        if char == ',' and depth == 0:
+            tokens.append(''.join(current).strip())
+            current = []
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        current.append(char)
+    if current:
+        tokens.append(''.join(current).strip())
+    return [token for token in tokens if token]
+
+"""
+This class models an entry of a flow table.
+"""
+
+
+class FlowEntry(object):
+    def __init__(self, table, priority, cookie, match, actions, packet_count=0, byte_count=0, duration=0.0):
+        self._table = int(table)
+        self._priority = int(priority)
+        self._cookie = int(cookie)
+        # The match is a tuple of (field, value) tuples, sorted by field
+        self._match = tuple(sorted((name, _normalize_field(name, value)) for name, value in match))
+        # The actions are a tuple of strings, in execution order
+        self._actions = tuple(actions)
+        # Counters
+        self._packets = int(packet_count)
+        self._bytes = int(byte_count)
+        self._duration = float(duration)
+        # The identity of the entry in its table and the digest of its content (computed lazily)
+        self._key = (self._table, self._priority, self._match)
+        self._digest = None
+
+    def __repr__(self):
+        return 'FlowEntry[table=%s, priority=%s, match=%s, actions=%s]' % (
+            self._table, self._priority, self.get_match_string(), self.get_actions_string())
+
+    '''
+    Create an entry starting from the flow statistics decoded by utils.openflow.OpenFlow13Codec.
+    '''
+    @classmethod
+    def from_stats(cls, flow):
+        return cls(flow['table'], flow['priority'], flow['cookie'], flow['match'], flow['actions'],
+                   flow['packets'], flow['bytes'], flow['duration'])
+
+    '''
+    Create an entry starting from a line of the output of ovs-ofctl dump-flows. It returns None if the line does not
+    describe a flow.
+    '''
+    @classmethod
+    def parse(cls, line):
+        line = line.strip()
+        if ' actions=' not in line and not line.startswith('actions='):
+            return None
+        fields, actions = line.rsplit('actions=', 1)
+        statistics = {'table': '0', 'priority': str(DEFAULT_PRIORITY), 'cookie': '0', 'n_packets': '0',
+                      'n_bytes': '0', 'duration': '0s'}
+        match = []
+        for token in _split(fields):
+            if '=' in token:
+                name, value = token.split('=', 1)
+                if name in _STATISTICS_FIELDS:
+                    statistics[name] = value
+                else:
+                    match.append((name, value))
+            elif token in _SHORTHANDS:
+                match.extend(_SHORTHANDS[token])
+            elif token not in _FLAGS:
+                match.append((token, ''))
+        actions = _split(actions)
+        if actions == ['drop']:
+            actions = []
+        return cls(statistics['table'], statistics['priority'], int(statistics['cookie'], 0), match, actions,
+                   statistics['n_packets'], statistics['n_bytes'], statistics['duration'].rstrip('s'))
+
+    '''
+    Parse the whole output of ovs-ofctl dump-flows into a list of entries.
+    '''
+    @classmethod
+    def parse_dump(cls, dump):
+        entries = []
+        for line in dump.splitlines():
+            entry = cls.parse(line)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    def get_table(self):
+        return self._table
+
+    def get_priority(self):
+        return self._priority
+
+    def get_cookie(self):
+        return self._cookie
+
+    def get_match(self):
+        return self._match
+
+    def get_match_string(self):
+        return ','.join('%s=%s' % field if field[1] != '' else field[0] for field in self._match)
+
+    '''
+    Return the values of the IPv4 fields of the match, as strings in the form "a.b.c.d[/mask]".
+    '''
+    def get_ipv4_matches(self):
+        return [value for name, value in self._match if name in IPV4_FIELDS]
+
+    def get_actions(self):
+        return self._actions
+
+    def get_actions_string(self):
+        return ','.join(self._actions) or 'drop'
+
+    def get_packets(self):
+        return self._packets
+
+    def get_bytes(self):
+        return self._bytes
+
+    def get_duration(self):
+        return self._duration
+
+    '''
+    Return the key of this entry, namely what identifies it into a switch (table, priority and match).
+    '''
+    def get_key(self):
+        return self._key
+
+    '''
+    Return the digest of the content of this entry which is not part of its key (cookie and actions). Counters are
+    not part of the content.
+    '''
+    def get_digest(self):
+        if self._digest is None:
+            self._digest = hash((self._cookie, self._actions))
+        return self._digest
+
+"""
+This class models a snapshot of the flow tables of a set of switches, taken at a given time. Switches whose flow table
+could not be read are marked as missing: they have no entries, which does not mean that their flow table is empty.
+"""
+
+
+class FlowSnapshot(object):
+    def __init__(self, timestamp):
+        self._timestamp = timestamp
+        # The entries of each switch. This is a map<switch_name, list(FlowEntry)>
+        self._entries = {}
+        # The switches whose flow table could not be read
+        self._missing = set()
+
+    def __repr__(self):
+        return 'FlowSnapshot[timestamp=%s, #switches=%s]' % (self._timestamp, len(self._entries))
+
+    def get_timestamp(self):
+        return self._timestamp
+
+    def add_entries(self, switch_name, entries):
+        self._entries.setdefault(switch_name, []).extend(entries)
+
+    '''
+    Mark a switch as missing, namely its flow table could not be read.
+    '''
+    def set_missing(self, switch_name):
+        self._missing.add(switch_name)
+        self._entries.pop(switch_name, None)
+
+    '''
+    Return True if the flow table of a switch could not be read.
+    '''
+    def is_missing(self, switch_name):
+        return switch_name in self._missing
+
+    '''
+    Return the names of the switches in this snapshot (missing ones included), sorted.
+    '''
+    def get_switches(self):
+        return sorted(set(self._entries.keys()) | self._missing)
+
+    def get_entries(self, switch_name):
+        return self._entries.get(switch_name, [])
+
+    '''
+    Return the number of entries of each switch. This is a map<switch_name, int>.
+    '''
+    def get_counts(self):
+        return dict((name, len(entries)) for name, entries in self._entries.items())
+
+"""
+This class models the difference between two versions of the flow table of a switch: the entries which have been
+added, the ones which have been removed and the ones whose content (cookie or actions) has been modified. Entries are
+indexed by key, thus two versions are compared in linear time.
+"""
+
+
+class FlowDelta(object):
+    def __init__(self, added, removed, modified):
+        self._added = added
+        self._removed = removed
+        # Modified entries, as (previous_entry, current_entry) tuples
+        self._modified = modified
+
+    def __repr__(self):
+        return 'FlowDelta[added=%s, removed=%s, modified=%s]' % self.get_counts()
+
+    def get_added(self):
+        return self._added
+
+    def get_removed(self):
+        return self._removed
+
+    def get_modified(self):
+        return self._modified
+
+    '''
+    Return the tuple (#added, #removed, #modified).
+    '''
+    def get_counts(self):
+        return len(self._added), len(self._removed), len(self._modified)
+
+    '''
+    Index a list of entries by key. This is a map<key, FlowEntry>.
+    '''
+    @staticmethod
+    def index(entries):
+        return dict((entry.get_key(), entry) for entry in entries)
+
+    '''
+    Compute the delta between two versions of a flow table, given as indexes (see index).
+    '''
+    @classmethod
+    def compute(cls, previous, current):
+        added = [entry for key, entry in current.items() if key not in previous]
+        removed = []
+        modified = []
+        for key, entry in previous.items():
+            current_entry = current.get(key)
+            if current_entry is None:
+                removed.append(entry)
+            elif current_entry.get_digest() != entry.get_digest():
+                modified.append((entry, current_entry))
+        return cls(added, removed, modified)
+
+    '''
+    Compute the deltas between two snapshots. It returns a map<switch_name, FlowDelta>, with an element for each switch
+    in either of the snapshots, unless it is missing from either of them.
+    '''
+    @classmethod
+    def between(cls, previous, current):
+        switches = set(previous.get_switches()) | set(current.get_switches())
+        return dict((name, cls.compute(cls.index(previous.get_entries(name)), cls.index(current.get_entries(name))))
+                    for name in switches if not previous.is_missing(name) and not current.is_missing(name))
+
+    '''
+    Compute the deltas between each pair of consecutive snapshots. Each snapshot is indexed only once. It returns a
+    list with an element for each interval, namely a map<switch_name, FlowDelta>. A switch has no element in the
+    intervals ending with a snapshot from which it is missing (or preceding its first read flow table): its last read
+    flow table is carried forward, and compared with the next one read.
+    '''
+    @classmethod
+    def series(cls, snapshots):
+        deltas = []
+        # The last read flow table of each switch, indexed
+        previous = {}
+        for i, snapshot in enumerate(snapshots):
+            current = dict(previous)
+            for name in snapshot.get_switches():
+                if not snapshot.is_missing(name):
+                    current[name] = cls.index(snapshot.get_entries(name))
+            if i > 0:
+                deltas.append(dict((name, cls.compute(previous[name], current[name])) for name in previous
+                                   if not snapshot.is_missing(name)))
+            previous = current
+        return deltas
+
+"""
+This class stores a sequence of flow snapshots into a single compressed numpy archive. Entries are stored column-wise,
+sorted by snapshot and switch, with the following arrays:
+ - timestamps: the timestamp of each snapshot;
+ - switches: the names of the switches (the switch index used by the other arrays);
+ - counts: the number of entries of each switch in each snapshot, indexed by [snapshot, switch]; -1 marks a switch
+   missing from a snapshot;
+ - offsets: the position of the first entry of each (snapshot, switch) pair, namely the cumulative sum of counts;
+ - table, priority, cookie, packets, bytes, duration, match, actions: one element for each entry.
+"""
+
+
+class FlowSnapshotStore(object):
+
+    '''
+    Save a list of snapshots into file_name.
+    '''
+    @staticmethod
+    def save(file_name, snapshots):
+        switches = sorted(set(name for snapshot in snapshots for name in snapshot.get_switches()))
+        counts = np.zeros((len(snapshots), len(switches)), dtype=np.int32)
+        columns = dict((name, []) for name in
+                       ('table', 'priority', 'cookie', 'packets', 'bytes', 'duration', 'match', 'actions'))
+        for i, snapshot in enumerate(snapshots):
+            for j, switch_name in enumerate(switches):
+                if snapshot.is_missing(switch_name):
+                    counts[i, j] = -1
+                    continue
+                entries = snapshot.get_entries(switch_name)
+                counts[i, j] = len(entries)
+                for entry in entries:
+                    columns['table'].append(entry.get_table())
+                    columns['priority'].append(entry.get_priority())
+                    columns['cookie'].append(entry.get_cookie())
+                    columns['packets'].append(entry.get_packets())
+                    columns['bytes'].append(entry.get_bytes())
+                    columns['duration'].append(entry.get_duration())
+                    columns['match'].append(entry.get_match_string())
+                    columns['actions'].append(entry.get_actions_string())
+        offsets = np.concatenate(([0], np.cumsum(np.maximum(counts, 0).ravel()))).astype(np.int64)
+        np.savez_compressed(
+            file_name,
+            timestamps=np.array([snapshot.get_timestamp() for snapshot in snapshots], dtype=np.float64),
+            switches=np.array(switches, dtype=str), counts=counts, offsets=offsets,
+            table=np.array(columns['table'], dtype=np.uint8),
+            priority=np.array(columns['priority'], dtype=np.int32),
+            cookie=np.array(columns['cookie'], dtype=np.uint64),
+            packets=np.array(columns['packets'], dtype=np.uint64),
+            bytes=np.array(columns['bytes'], dtype=np.uint64),
+            duration=np.array(columns['duration'], dtype=np.float64),
+            match=np.array(columns['match'], dtype=str), actions=np.array(columns['actions'], dtype=str))
+
+    '''
+    Load only the entry counts from file_name, without decoding the entries. It returns the tuple
+    (timestamps, switches, counts).
+    '''
+    @staticmethod
+    def load_counts(file_name):
+        archive = np.load(file_name)
+        try:
+            return archive['timestamps'], list(archive['switches']), archive['counts']
+        finally:
+            archive.close()
+
+    '''
+    Load the list of snapshots stored into file_name.
+    '''
+    @staticmethod
+    def load(file_name):
+        archive = np.load(file_name)
+        try:
+            data = dict((name, archive[name]) for name in archive.files)
+        finally:
+            archive.close()
+        switches = list(data['switches'])
+        offsets = data['offsets']
+        snapshots = []
+        for i, timestamp in enumerate(data['timestamps']):
+            snapshot = FlowSnapshot(float(timestamp))
+            for j, switch_name in enumerate(switches):
+                if data['counts'][i, j] < 0:
+                    snapshot.set_missing(switch_name)
+                    continue
+                start = offsets[i * len(switches) + j]
+                end = offsets[i * len(switches) + j + 1]
+                entries = []
+                for k in range(start, end):
+                    match = [tuple(field.split('=', 1)) if '=' in field else (field, '')
+                             for field in _split(str(data['match'][k]))]
+                    actions = _split(str(data['actions'][k]))
+                    entries.append(FlowEntry(data['table'][k], data['priority'][k], data['cookie'][k], match,
+                                             [] if actions == ['drop'] else actions, data['packets'][k],
+                                             data['bytes'][k], data['duration'][k]))
+                snapshot.add_entries(switch_name, entries)
+            snapshots.append(snapshot)
+        return snapshots
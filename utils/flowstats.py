@@ -0,0 +1,189 @@
+import binascii
+import errno
+import os
+import select
+import socket
+import time
+
+from utils.log import Logger
+from utils.openflow import OpenFlow13Codec, OFP_HEADER, OFP_HEADER_LENGTH, split_messages
+
+"""
+This class models a persistent OpenFlow 1.3 connection to the management socket of an Open vSwitch bridge (the same
+socket used by ovs-ofctl).
+"""
+
+
+class SwitchConnection(object):
+    def __init__(self, name, path):
+        # The name of the switch (namely, the name of the bridge)
+        self._name = name
+        # The path of the management socket
+        self._path = path
+        self._socket = None
+        # Bytes received and not yet consumed
+        self._buffer = b''
+
+    def __repr__(self):
+        return 'SwitchConnection[name=%s, path=%s]' % (self._name, self._path)
+
+    def get_name(self):
+        return self._name
+
+    def fileno(self):
+        return self._socket.fileno()
+
+    def is_connected(self):
+        return self._socket is not None
+
+    '''
+    Open the connection and send the HELLO message. The HELLO of the switch will be consumed as any other message.
+    '''
+    def connect(self):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(self._path)
+        self._socket.sendall(OpenFlow13Codec.hello(0))
+        self._socket.setblocking(0)
+        self._buffer = b''
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def send(self, data):
+        self._socket.setblocking(1)
+        try:
+            self._socket.sendall(data)
+        finally:
+            self._socket.setblocking(0)
+
+    '''
+    Read the available bytes, returning the list of complete messages as (version, type, data) tuples.
+    '''
+    def receive(self):
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except socket.error as e:
+                if e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not data:
+                raise socket.error(errno.ECONNRESET, 'Connection closed by %s' % self._name)
+            self._buffer += data
+        messages, self._buffer = split_messages(self._buffer)
+        return messages
+
+"""
+This class polls the flow and table statistics of a set of Open vSwitch bridges. A persistent connection is kept with
+each switch, and the requests are sent to all switches at once: the replies are then collected, as they arrive, by a
+single select loop. Connections are (re)opened lazily, thus the same poller can be used for frequent sampling.
+"""
+
+
+class FlowStatsPoller(object):
+    def __init__(self, switch_names, rundir='/var/run/openvswitch', timeout=10.0):
+        # Logger
+        self._log = Logger.get_instance()
+        # Connections to the switches. This is a map<switch_name, SwitchConnection>
+        self._connections = dict(
+            (name, SwitchConnection(name, os.path.join(rundir, name + '.mgmt'))) for name in switch_names)
+        # Maximum time (seconds) to wait for the replies of a poll
+        self._timeout = timeout
+        # Transaction id of the next request
+        self._xid = 1
+
+    def __repr__(self):
+        return 'FlowStatsPoller[#switches=%s]' % len(self._connections)
+
+    def _next_xid(self):
+        xid = self._xid
+        self._xid = (self._xid + 1) & 0xffffffff or 1
+        return xid
+
+    '''
+    Close all connections.
+    '''
+    def close(self):
+        for connection in self._connections.values():
+            connection.close()
+
+    '''
+    Poll all switches. If flows is True, flow statistics are requested; if tables is True, table statistics are
+    requested. It returns a map<switch_name, dict> where each dict contains the keys 'flows' and 'tables' (the decoded
+    statistics, or None if not requested), 'error' (None if the switch replied correctly) and 'duration' (the time, in
+    seconds, from the start of the poll to the last reply of the switch, or to its error).
+    '''
+    def poll(self, flows=True, tables=False):
+        results = dict((name, {'flows': [] if flows else None, 'tables': [] if tables else None, 'error': None,
+                               'duration': None}) for name in self._connections.keys())
+        # Outstanding requests for each connection. This is a map<SwitchConnection, set(xid)>
+        pending = {}
+        start = time.time()
+        for name, connection in self._connections.items():
+            try:
+                if not connection.is_connected():
+                    connection.connect()
+                xids = set()
+                if flows:
+                    xid = self._next_xid()
+                    connection.send(OpenFlow13Codec.flow_stats_request(xid))
+                    xids.add(xid)
+                if tables:
+                    xid = self._next_xid()
+                    connection.send(OpenFlow13Codec.table_stats_request(xid))
+                    xids.add(xid)
+                pending[connection] = xids
+            except socket.error as e:
+                connection.close()
+                results[name]['error'] = str(e)
+                results[name]['duration'] = time.time() - start
+        deadline = start + self._timeout
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            readable = select.select(list(pending.keys()), [], [], remaining)[0]
+            for connection in readable:
+                result = results[connection.get_name()]
+                try:
+                    # Handling a message may send a reply (e.g. to an echo request)
+                    for version, message_type, data in connection.receive():
+                        self._handle(connection, message_type, data, result, pending)
+                except socket.error as e:
+                    connection.close()
+                    result['error'] = str(e)
+                    result['duration'] = time.time() - start
+                    del pending[connection]
+                    continue
+                if connection in pending and not pending[connection]:
+                    result['duration'] = time.time() - start
+                    del pending[connection]
+        for connection in pending.keys():
+            # Replies not received in time: the connection is no longer in a known state
+            connection.close()
+            results[connection.get_name()]['error'] = 'Timeout'
+            results[connection.get_name()]['duration'] = time.time() - start
+        return results
+
+    '''
+    Handle a message received from a switch while polling. It raises a socket.error if a reply cannot be sent.
+    '''
+    def _handle(self, connection, message_type, data, result, pending):
+        version, message_type, length, xid = OFP_HEADER.unpack(data[:OFP_HEADER_LENGTH])
+        if message_type == OpenFlow13Codec.OFPT_ECHO_REQUEST:
+            connection.send(OpenFlow13Codec.echo_reply(data))
+        elif message_type == OpenFlow13Codec.OFPT_ERROR:
+            if xid in pending.get(connection, ()):
+                error = data[OFP_HEADER_LENGTH:OFP_HEADER_LENGTH + 4]
+                result['error'] = 'OpenFlow error %s' % binascii.hexlify(error)
+                pending[connection].discard(xid)
+        elif message_type == OpenFlow13Codec.OFPT_MULTIPART_REPLY:
+            multipart_type, more, body = OpenFlow13Codec.parse_multipart_reply(data)
+            if multipart_type == OpenFlow13Codec.OFPMP_FLOW:
+                result['flows'].extend(OpenFlow13Codec.parse_flow_stats(body))
+            elif multipart_type == OpenFlow13Codec.OFPMP_TABLE:
+                result['tables'].extend(OpenFlow13Codec.parse_table_stats(body))
+            if not more:
+                pending.get(connection, set()).discard(xid)
@@ -0,0 +1,103 @@
+import json
+import os
+import time
+from threading import Lock
+
+from utils.fs import FileSystem
+from utils.log import Logger
+
+"""
+This class implements the run journal, namely an append-only file (journal.jsonl, inside the simulations folder) in
+which the framework records the state of each simulation, so that an interrupted campaign can be resumed. Each line is
+a JSON object with the key of the simulation (the digest of its fingerprint), its new state, the time of the change and
+further information (e.g. the simulation folder). The states of a simulation are:
+ - planned: the simulation is going to be executed by the current campaign;
+ - running: the simulation folder has been created and the environment is going to be started;
+ - extracted: all extractors finished and their results have been stored;
+ - done: the environment has been stopped.
+Lines are written and synced one by one, thus an interruption can truncate only the last one, which is ignored.
+"""
+
+
+class Journal(object):
+    __instance = None
+
+    FILE_NAME = 'journal.jsonl'
+    PLANNED = 'planned'
+    RUNNING = 'running'
+    EXTRACTED = 'extracted'
+    DONE = 'done'
+
+    def __init__(self, path=None):
+        # Logger
+        self._log = Logger.get_instance()
+        if path is None:
+            path = os.path.join(FileSystem.get_instance().get_simulations_folder(), self.FILE_NAME)
+        self._path = path
+        self._lock = Lock()
+
+    def __repr__(self):
+        return 'Journal[path=%s]' % self._path
+
+    '''
+    In accord with Singleton pattern, it returns an instance of this class.
+    '''
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            cls.__instance = Journal()
+        return cls.__instance
+
+    '''
+    Return the path of the journal.
+    '''
+    def get_path(self):
+        return self._path
+
+    '''
+    Record that the simulation identified by key has reached state. The keyword arguments are recorded as well.
+    '''
+    def record(self, key, state, **info):
+        entry = dict(info)
+        entry.update({'key': key, 'state': state, 'time': time.time()})
+        line = json.dumps(entry, sort_keys=True) + '\n'
+        with self._lock:
+            folder = os.path.dirname(self._path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            with open(self._path, 'a+') as journal_file:
+                # Do not append to the truncated line of an interrupted write
+                journal_file.seek(0, os.SEEK_END)
+                if journal_file.tell() > 0:
+                    journal_file.seek(-1, os.SEEK_END)
+                    if journal_file.read(1) != '\n':
+                        line = '\n' + line
+                journal_file.write(line)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+        self._log.debug(self.__class__.__name__, 'Simulation %s is now %s.', key, state)
+
+    '''
+    Replay the journal, returning the last known entry of each simulation as a map<key, entry>. The information of an
+    entry is merged with the one recorded by the previous entries of the same simulation.
+    '''
+    def load(self):
+        entries = {}
+        if not os.path.exists(self._path):
+            return entries
+        with self._lock:
+            with open(self._path) as journal_file:
+                lines = journal_file.readlines()
+        for number, line in enumerate(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                self._log.warning(self.__class__.__name__, 'Line %s of the journal is corrupted; ignore it.',
+                                  number + 1)
+                continue
+            if entry['state'] == self.PLANNED:
+                # A new attempt starts from scratch
+                entries[entry['key']] = entry
+            else:
+                entries.setdefault(entry['key'], {}).update(entry)
+        return entries
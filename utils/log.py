@@ -26,6 +26,7 @@ class Logger(object):
 
         self._logger.addHandler(ch)
         self._logger.addHandler(fh)
+        self._console_handler = ch
 
     @classmethod
     def get_instance(cls):
@@ -36,6 +37,12 @@ class Logger(object):
     def __repr__(self):
         return "Logger[%s]" % self._logger.name
 
+    '''
+    Set the minimum level of the messages printed on the console (e.g. logging.WARNING).
+    '''
+    def set_console_level(self, level):
+        self._console_handler.setLevel(level)
+
     def info(self, logger, msg, *args, **kwargs):
         self._logger.info(logger + ' says: ' + msg, *args, **kwargs)
 
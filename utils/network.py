@@ -1,18 +1,68 @@
-from scapy.sendrecv import sniff, wrpcap
+import select
+
+from scapy.all import conf
+from scapy.utils import PcapWriter
+
+from utils.tracing import monotonic
 
 """
-This class implements a sniffer used for some collectors.
+This class implements a sniffer used for some collectors. Packets are written into the pcap file (if any) as soon as
+they are received, until the sniffer is stopped. Moreover, each packet is passed to the listeners, thus it can be
+analyzed while sniffing.
 """
 
 
 class Sniffer(object):
-    def __init__(self, intf, pcap_file):
+
+    # Maximum time (seconds) needed for noticing a stop request
+    POLL_INTERVAL = 0.5
+    # Maximum time (seconds) spent writing the packets already received, once stopped: on a busy interface, new packets
+    # keep arriving, thus draining has to be bounded
+    DRAIN_TIME = 0.5
+    # Link type of the pcap file (Ethernet)
+    LINKTYPE = 1
+
+    def __init__(self, intf, pcap_file=None):
         self._interface = intf
         self._pcap_file = pcap_file
+        # Functions called for each received packet
+        self._listeners = []
+
+    '''
+    Add a function to call for each received packet. Listeners are called by the sniffing thread, thus they have to
+    return quickly.
+    '''
+    def add_listener(self, listener):
+        self._listeners.append(listener)
 
     '''
-    Sniff network packets.
+    Sniff network packets until stop_event is set. The function ready_callback, if any, is called as soon as the
+    sniffer is listening. When the sniffer stops, the packets already received are written (for at most DRAIN_TIME
+    seconds), and the pcap file is closed.
     '''
-    def sniff(self):
-        pkts = sniff(iface=self._interface, timeout=14)
-        wrpcap(self._pcap_file, pkts)
+    def sniff(self, stop_event, ready_callback=None):
+        listen_socket = conf.L2listen(iface=self._interface)
+        writer = PcapWriter(self._pcap_file, linktype=self.LINKTYPE) if self._pcap_file is not None else None
+        try:
+            if ready_callback is not None:
+                ready_callback()
+            # The time at which draining ends, once stopped
+            deadline = None
+            while True:
+                if deadline is None and stop_event.is_set():
+                    # Drain the packets already received, without waiting for new ones
+                    deadline = monotonic() + self.DRAIN_TIME
+                readable = select.select([listen_socket], [], [], self.POLL_INTERVAL if deadline is None else 0)[0]
+                if readable:
+                    packet = listen_socket.recv()
+                    if packet is not None:
+                        if writer is not None:
+                            writer.write(packet)
+                        for listener in self._listeners:
+                            listener(packet)
+                if deadline is not None and (not readable or monotonic() >= deadline):
+                    break
+        finally:
+            if writer is not None:
+                writer.close()
+            listen_socket.close()
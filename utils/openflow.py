@@ -0,0 +1,689 @@
+import socket
+import struct
+from threading import Lock
+
+import numpy as np
+from scapy.layers.inet import IP, TCP
+from scapy.utils import PcapReader
+
+"""
+This file contains the support for the OpenFlow protocol. Scapy does not provide an OpenFlow dissector, thus the TCP
+streams from/to the controller are reassembled here and split into OpenFlow messages, by means of the OpenFlow header.
+"""
+
+# Standard OpenFlow controller port
+OFP_TCP_PORT = 6633
+# The OpenFlow header: version (1 byte), type (1 byte), length (2 bytes) and transaction id (4 bytes)
+OFP_HEADER = struct.Struct('!BBHI')
+OFP_HEADER_LENGTH = OFP_HEADER.size
+
+# Message types for each supported version of the protocol (map<version, map<type, name>>)
+OFP_MESSAGE_TYPES = {
+    # OpenFlow 1.0
+    0x01: {
+        0: 'HELLO', 1: 'ERROR', 2: 'ECHO_REQUEST', 3: 'ECHO_REPLY', 4: 'VENDOR', 5: 'FEATURES_REQUEST',
+        6: 'FEATURES_REPLY', 7: 'GET_CONFIG_REQUEST', 8: 'GET_CONFIG_REPLY', 9: 'SET_CONFIG', 10: 'PACKET_IN',
+        11: 'FLOW_REMOVED', 12: 'PORT_STATUS', 13: 'PACKET_OUT', 14: 'FLOW_MOD', 15: 'PORT_MOD',
+        16: 'STATS_REQUEST', 17: 'STATS_REPLY', 18: 'BARRIER_REQUEST', 19: 'BARRIER_REPLY',
+        20: 'QUEUE_GET_CONFIG_REQUEST', 21: 'QUEUE_GET_CONFIG_REPLY'
+    },
+    # OpenFlow 1.3
+    0x04: {
+        0: 'HELLO', 1: 'ERROR', 2: 'ECHO_REQUEST', 3: 'ECHO_REPLY', 4: 'EXPERIMENTER', 5: 'FEATURES_REQUEST',
+        6: 'FEATURES_REPLY', 7: 'GET_CONFIG_REQUEST', 8: 'GET_CONFIG_REPLY', 9: 'SET_CONFIG', 10: 'PACKET_IN',
+        11: 'FLOW_REMOVED', 12: 'PORT_STATUS', 13: 'PACKET_OUT', 14: 'FLOW_MOD', 15: 'GROUP_MOD', 16: 'PORT_MOD',
+        17: 'TABLE_MOD', 18: 'MULTIPART_REQUEST', 19: 'MULTIPART_REPLY', 20: 'BARRIER_REQUEST', 21: 'BARRIER_REPLY',
+        22: 'QUEUE_GET_CONFIG_REQUEST', 23: 'QUEUE_GET_CONFIG_REPLY', 24: 'ROLE_REQUEST', 25: 'ROLE_REPLY',
+        26: 'GET_ASYNC_REQUEST', 27: 'GET_ASYNC_REPLY', 28: 'SET_ASYNC', 29: 'METER_MOD'
+    }
+}
+
+# Pseudo-type for TCP segments without OpenFlow payload (handshake, pure ACKs, FIN, ...)
+TCP_SEGMENT = 'TCP'
+# All message type names, regardless of the version; the position in this list is the type index used in the columns
+MESSAGE_TYPE_NAMES = sorted(set(name for types in OFP_MESSAGE_TYPES.values() for name in types.values())) + \
+    [TCP_SEGMENT]
+MESSAGE_TYPE_INDEX = dict((name, index) for index, name in enumerate(MESSAGE_TYPE_NAMES))
+
+# Messages that change the state of the switches
+STATE_CHANGING_MESSAGES = ('FLOW_MOD', 'GROUP_MOD', 'BARRIER_REPLY')
+
+# OpenFlow 1.3 FLOW_MOD: offset of the ofp_match structure, and OXM fields carrying IPv4 addresses (IPV4_SRC, IPV4_DST,
+# ARP_SPA, ARP_TPA)
+OFP13_FLOW_MOD_MATCH_OFFSET = 48
+OFPXMC_OPENFLOW_BASIC = 0x8000
+OXM_IPV4_FIELDS = (11, 12, 22, 23)
+
+# Directions of the messages
+TO_CONTROLLER = 0
+FROM_CONTROLLER = 1
+DIRECTION_NAMES = ['to-controller', 'from-controller']
+
+# TCP flags
+_TCP_SYN = 0x02
+
+'''
+Split a buffer into OpenFlow messages. It returns the list of complete messages, as (version, type, data) tuples, and
+the bytes of the trailing incomplete message. If the buffer is not aligned to an OpenFlow header, it is dropped.
+'''
+
+
+def split_messages(buf):
+    messages = []
+    while len(buf) >= OFP_HEADER_LENGTH:
+        version, message_type, length, xid = OFP_HEADER.unpack(buf[:OFP_HEADER_LENGTH])
+        if version not in OFP_MESSAGE_TYPES or length < OFP_HEADER_LENGTH:
+            return messages, b''
+        if len(buf) < length:
+            break
+        messages.append((version, message_type, buf[:length]))
+        buf = buf[length:]
+    return messages, buf
+
+"""
+This class models an OpenFlow message extracted from a TCP stream.
+"""
+
+
+class OpenFlowMessage(object):
+    def __init__(self, timestamp, direction, connection, version, message_type, data):
+        # Time at which the last segment of the message has been sniffed
+        self._timestamp = timestamp
+        # TO_CONTROLLER or FROM_CONTROLLER
+        self._direction = direction
+        # The switch side TCP port, which identifies the switch connection
+        self._connection = connection
+        self._version = version
+        self._type = message_type
+        # The whole message, header included
+        self._data = data
+
+    def __repr__(self):
+        return 'OpenFlowMessage[type=%s, direction=%s, length=%s]' % (
+            self.get_type_name(), DIRECTION_NAMES[self._direction], len(self._data))
+
+    def get_timestamp(self):
+        return self._timestamp
+
+    def get_direction(self):
+        return self._direction
+
+    def get_connection(self):
+        return self._connection
+
+    def get_version(self):
+        return self._version
+
+    def get_type(self):
+        return self._type
+
+    '''
+    Return the name of the message type (e.g. FLOW_MOD), or None if the type is unknown for its version.
+    '''
+    def get_type_name(self):
+        return OFP_MESSAGE_TYPES.get(self._version, {}).get(self._type)
+
+    def get_length(self):
+        return len(self._data)
+
+    def get_data(self):
+        return self._data
+
+    '''
+    Return the IPv4 addresses matched by a FLOW_MOD message, as a list of (address, netmask) tuples of dotted strings.
+    Only OpenFlow 1.3 (OXM) matches are supported; for other messages and versions the list is empty.
+    '''
+    def get_ipv4_matches(self):
+        matches = []
+        if self._version != 0x04 or self.get_type_name() != 'FLOW_MOD':
+            return matches
+        offset = OFP13_FLOW_MOD_MATCH_OFFSET
+        if len(self._data) < offset + 4:
+            return matches
+        match_type, match_length = struct.unpack('!HH', self._data[offset:offset + 4])
+        end = min(offset + match_length, len(self._data))
+        position = offset + 4
+        while position + 4 <= end:
+            oxm_class, oxm_field_and_mask, oxm_length = struct.unpack('!HBB', self._data[position:position + 4])
+            value = self._data[position + 4:position + 4 + oxm_length]
+            field = oxm_field_and_mask >> 1
+            if oxm_class == OFPXMC_OPENFLOW_BASIC and field in OXM_IPV4_FIELDS and len(value) >= 4:
+                mask = value[4:8] if oxm_field_and_mask & 0x01 and len(value) >= 8 else b'\xff\xff\xff\xff'
+                matches.append((socket.inet_ntoa(value[:4]), socket.inet_ntoa(mask)))
+            position += 4 + oxm_length
+        return matches
+
+"""
+This class reassembles the TCP streams from/to the controller and splits them into OpenFlow messages. Packets have to
+be fed in capture order; each call returns the OpenFlow messages completed by that packet.
+"""
+
+
+class OpenFlowStream(object):
+    def __init__(self, port=OFP_TCP_PORT):
+        # The controller port
+        self._port = port
+        # Bytes not yet consumed for each TCP stream. This is a map<(src, sport, dst, dport), str>
+        self._buffers = {}
+        # Next expected sequence number for each TCP stream. This is a map<(src, sport, dst, dport), int>
+        self._next_seq = {}
+
+    '''
+    Return True if the packet belongs to a TCP connection from/to the controller.
+    '''
+    def is_openflow(self, pkt):
+        return TCP in pkt and (pkt[TCP].sport == self._port or pkt[TCP].dport == self._port)
+
+    '''
+    Return the direction of an OpenFlow packet.
+    '''
+    def get_direction(self, pkt):
+        return TO_CONTROLLER if pkt[TCP].dport == self._port else FROM_CONTROLLER
+
+    '''
+    Return the switch side TCP port of an OpenFlow packet.
+    '''
+    def get_connection(self, pkt):
+        return pkt[TCP].sport if pkt[TCP].dport == self._port else pkt[TCP].dport
+
+    '''
+    Return True if the packet opens a connection from a switch to the controller.
+    '''
+    def is_connection_request(self, pkt):
+        return self.is_openflow(pkt) and pkt[TCP].dport == self._port and bool(int(pkt[TCP].flags) & _TCP_SYN)
+
+    '''
+    Feed a packet into the stream, returning the list of the OpenFlow messages completed by it.
+    '''
+    def feed(self, pkt):
+        if not self.is_openflow(pkt):
+            return []
+        tcp = pkt[TCP]
+        src = pkt[IP].src if IP in pkt else None
+        dst = pkt[IP].dst if IP in pkt else None
+        key = (src, tcp.sport, dst, tcp.dport)
+        if int(tcp.flags) & _TCP_SYN:
+            # A new connection: reset the state of the stream
+            self._buffers[key] = b''
+            self._next_seq[key] = tcp.seq + 1
+            return []
+        payload = bytes(tcp.payload)
+        if not payload:
+            return []
+        expected = self._next_seq.get(key)
+        if expected is not None and tcp.seq < expected:
+            # Retransmission: keep only the bytes not yet seen
+            payload = payload[expected - tcp.seq:]
+            if not payload:
+                return []
+        elif expected is not None and tcp.seq > expected:
+            # Some segments have been lost: the stream cannot be resynchronized from the buffered bytes
+            self._buffers[key] = b''
+        self._next_seq[key] = tcp.seq + len(bytes(tcp.payload))
+        buf = self._buffers.get(key, b'') + payload
+        messages = []
+        direction = self.get_direction(pkt)
+        connection = self.get_connection(pkt)
+        frames, self._buffers[key] = split_messages(buf)
+        for version, message_type, data in frames:
+            messages.append(OpenFlowMessage(float(pkt.time), direction, connection, version, message_type, data))
+        return messages
+
+"""
+This class stores the OpenFlow messages of a capture in columnar form: one numpy array for each attribute, one element
+for each message. TCP segments without OpenFlow payload are stored with type TCP_SEGMENT and the length of the
+frame.
+"""
+
+
+class OpenFlowCapture(object):
+    def __init__(self, timestamps, directions, types, lengths, connections):
+        self._timestamps = timestamps
+        self._directions = directions
+        # Index of the message type into MESSAGE_TYPE_NAMES
+        self._types = types
+        self._lengths = lengths
+        self._connections = connections
+
+    def __repr__(self):
+        return 'OpenFlowCapture[#messages=%s]' % len(self._timestamps)
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    '''
+    Load the OpenFlow messages of a pcap file. The file is read packet by packet, without loading it in memory.
+    '''
+    @classmethod
+    def load(cls, pcap_file, port=OFP_TCP_PORT):
+        stream = OpenFlowStream(port)
+        timestamps, directions, types, lengths, connections = [], [], [], [], []
+        reader = PcapReader(pcap_file)
+        try:
+            for pkt in reader:
+                if not stream.is_openflow(pkt):
+                    continue
+                messages = stream.feed(pkt)
+                if messages:
+                    for message in messages:
+                        timestamps.append(message.get_timestamp())
+                        directions.append(message.get_direction())
+                        types.append(MESSAGE_TYPE_INDEX.get(message.get_type_name(), MESSAGE_TYPE_INDEX[TCP_SEGMENT]))
+                        lengths.append(message.get_length())
+                        connections.append(message.get_connection())
+                elif not bytes(pkt[TCP].payload):
+                    timestamps.append(float(pkt.time))
+                    directions.append(stream.get_direction(pkt))
+                    types.append(MESSAGE_TYPE_INDEX[TCP_SEGMENT])
+                    lengths.append(len(pkt))
+                    connections.append(stream.get_connection(pkt))
+        finally:
+            reader.close()
+        return cls(np.array(timestamps, dtype=np.float64), np.array(directions, dtype=np.int8),
+                   np.array(types, dtype=np.int16), np.array(lengths, dtype=np.int64),
+                   np.array(connections, dtype=np.int32))
+
+    def get_timestamps(self):
+        return self._timestamps
+
+    def get_directions(self):
+        return self._directions
+
+    def get_types(self):
+        return self._types
+
+    def get_lengths(self):
+        return self._lengths
+
+    def get_connections(self):
+        return self._connections
+
+"""
+This class analyzes the packets of a capture as they arrive, keeping running accumulators instead of storing them: the
+number of OpenFlow packets, the number of messages and bytes for each direction, message type and time window, and the
+times of the first switch connection, of the last state-changing message (also for each VPN, if the subnets of the
+VPNs' sites are given as a PrefixTrie whose values are VPN names) and of the last packet. Packets can be fed by a
+thread while other threads read the accumulators.
+"""
+
+
+class OpenFlowAccumulator(object):
+    def __init__(self, window=1.0, vpn_networks=None, port=OFP_TCP_PORT):
+        self._stream = OpenFlowStream(port)
+        # The width (seconds) of the time windows
+        self._window = window
+        self._vpn_networks = vpn_networks
+        self._lock = Lock()
+        # Number of packets from/to the controller
+        self._packets = 0
+        # Start of the first window, namely the time of the first message
+        self._start = None
+        # Messages and bytes for each window. This is a map<(direction, type, window), [messages, bytes]>
+        self._bins = {}
+        self._number_of_bins = 0
+        self._first_connection = None
+        self._last_change = None
+        self._capture_end = None
+        # Time of the last state-changing message for each VPN. This is a map<vpn_name, timestamp>
+        self._vpn_last_change = {}
+
+    def __repr__(self):
+        return 'OpenFlowAccumulator[#packets=%s]' % self._packets
+
+    def get_window(self):
+        return self._window
+
+    def get_packets(self):
+        return self._packets
+
+    def get_last_change(self):
+        return self._last_change
+
+    '''
+    Account a message (or a TCP segment without OpenFlow payload) into its time window.
+    '''
+    def _account(self, timestamp, direction, type_index, length):
+        if self._start is None:
+            self._start = timestamp
+        window = max(0, int((timestamp - self._start) // self._window))
+        self._number_of_bins = max(self._number_of_bins, window + 1)
+        counters = self._bins.setdefault((direction, type_index, window), [0, 0])
+        counters[0] += 1
+        counters[1] += length
+
+    '''
+    Feed a packet, updating the accumulators.
+    '''
+    def feed(self, pkt):
+        with self._lock:
+            self._capture_end = float(pkt.time)
+            if not self._stream.is_openflow(pkt):
+                return
+            self._packets += 1
+            if self._first_connection is None and self._stream.is_connection_request(pkt):
+                self._first_connection = self._capture_end
+            messages = self._stream.feed(pkt)
+            if not messages and not bytes(pkt[TCP].payload):
+                self._account(self._capture_end, self._stream.get_direction(pkt), MESSAGE_TYPE_INDEX[TCP_SEGMENT],
+                              len(pkt))
+            for message in messages:
+                message_type = message.get_type_name()
+                self._account(message.get_timestamp(), message.get_direction(),
+                              MESSAGE_TYPE_INDEX.get(message_type, MESSAGE_TYPE_INDEX[TCP_SEGMENT]),
+                              message.get_length())
+                # If the capture started after the TCP handshake, the first HELLO marks the first connection
+                if self._first_connection is None and message_type == 'HELLO':
+                    self._first_connection = message.get_timestamp()
+                if message_type in STATE_CHANGING_MESSAGES:
+                    self._last_change = message.get_timestamp()
+                    if self._vpn_networks is not None:
+                        for address, netmask in message.get_ipv4_matches():
+                            vpn_name = self._vpn_networks.lookup(address)
+                            if vpn_name is not None:
+                                self._vpn_last_change[vpn_name] = self._last_change
+
+    '''
+    Return the messages and the bytes of each window, as a tuple (start, messages, bytes) where messages and bytes are
+    arrays indexed by [direction, type, window] (see MESSAGE_TYPE_NAMES and DIRECTION_NAMES).
+    '''
+    def get_rates(self):
+        with self._lock:
+            shape = (len(DIRECTION_NAMES), len(MESSAGE_TYPE_NAMES), self._number_of_bins)
+            messages = np.zeros(shape, dtype=np.int32)
+            volume = np.zeros(shape, dtype=np.int64)
+            for index, counters in self._bins.items():
+                messages[index] = counters[0]
+                volume[index] = counters[1]
+            return self._start if self._start is not None else 0.0, messages, volume
+
+    '''
+    Return the current values of the accumulators as a map, whose values are numbers, strings, lists and maps. The
+    rates (messages per second) of each message type refer to the last complete window.
+    '''
+    def get_summary(self):
+        start, messages, volume = self.get_rates()
+        with self._lock:
+            summary = {
+                'window': self._window,
+                'start': self._start,
+                'packets': self._packets,
+                'messages': dict((name, int(messages[:, i, :].sum())) for i, name in enumerate(MESSAGE_TYPE_NAMES)
+                                 if messages[:, i, :].any()),
+                'bytes': dict((name, int(volume[i].sum())) for i, name in enumerate(DIRECTION_NAMES)),
+                'rates': {},
+                'first_connection': self._first_connection,
+                'last_change': self._last_change,
+                'capture_end': self._capture_end,
+                'vpn_last_change': dict(self._vpn_last_change)
+            }
+            if self._capture_end is not None and self._start is not None:
+                last_window = int((self._capture_end - self._start) // self._window) - 1
+                if 0 <= last_window < messages.shape[2]:
+                    for i, name in enumerate(MESSAGE_TYPE_NAMES):
+                        if messages[:, i, last_window].any():
+                            summary['rates'][name] = messages[:, i, last_window].sum() / float(self._window)
+            return summary
+
+"""
+This class implements the encoding of the OpenFlow 1.3 requests used for polling the switches, and the decoding of
+their replies. Matches and actions are decoded using the same notation of ovs-ofctl.
+"""
+
+
+class OpenFlow13Codec(object):
+
+    VERSION = 0x04
+    # Message types
+    OFPT_HELLO = 0
+    OFPT_ERROR = 1
+    OFPT_ECHO_REQUEST = 2
+    OFPT_ECHO_REPLY = 3
+    OFPT_MULTIPART_REQUEST = 18
+    OFPT_MULTIPART_REPLY = 19
+    # Multipart types
+    OFPMP_FLOW = 1
+    OFPMP_TABLE = 3
+    # Multipart flags
+    OFPMPF_REPLY_MORE = 0x0001
+    # Wildcards
+    OFPTT_ALL = 0xff
+    OFPP_ANY = 0xffffffff
+    OFPG_ANY = 0xffffffff
+
+    # OXM fields of class OPENFLOW_BASIC (map<field, (ovs-ofctl name, format)>)
+    OXM_FIELDS = {
+        0: ('in_port', 'int'), 2: ('metadata', 'hex'), 3: ('dl_dst', 'mac'), 4: ('dl_src', 'mac'),
+        5: ('dl_type', 'hex'), 6: ('dl_vlan', 'vlan'), 7: ('dl_vlan_pcp', 'int'), 8: ('ip_dscp', 'int'),
+        10: ('nw_proto', 'int'), 11: ('nw_src', 'ipv4'), 12: ('nw_dst', 'ipv4'), 13: ('tp_src', 'int'),
+        14: ('tp_dst', 'int'), 15: ('tp_src', 'int'), 16: ('tp_dst', 'int'), 20: ('icmp_type', 'int'),
+        21: ('icmp_code', 'int'), 22: ('arp_spa', 'ipv4'), 23: ('arp_tpa', 'ipv4'), 34: ('mpls_label', 'int'),
+        35: ('mpls_tc', 'int'), 36: ('mpls_bos', 'int')
+    }
+    # Reserved ports
+    PORTS = {
+        0xfffffff8: 'IN_PORT', 0xfffffff9: 'TABLE', 0xfffffffa: 'NORMAL', 0xfffffffb: 'FLOOD', 0xfffffffc: 'ALL',
+        0xfffffffd: 'CONTROLLER', 0xfffffffe: 'LOCAL', 0xffffffff: 'ANY'
+    }
+
+    _FLOW_STATS = struct.Struct('!HBxIIHHHH4xQQQ')
+    _TABLE_STATS = struct.Struct('!B3xIQQ')
+    _MULTIPART = struct.Struct('!HH4x')
+
+    '''
+    Build an OpenFlow message starting from its type and its body.
+    '''
+    @classmethod
+    def message(cls, message_type, xid, body=b''):
+        return OFP_HEADER.pack(cls.VERSION, message_type, OFP_HEADER_LENGTH + len(body), xid) + body
+
+    @classmethod
+    def hello(cls, xid):
+        return cls.message(cls.OFPT_HELLO, xid)
+
+    @classmethod
+    def echo_reply(cls, request):
+        version, message_type, length, xid = OFP_HEADER.unpack(request[:OFP_HEADER_LENGTH])
+        return cls.message(cls.OFPT_ECHO_REPLY, xid, request[OFP_HEADER_LENGTH:])
+
+    '''
+    Request the statistics of all flows in all tables.
+    '''
+    @classmethod
+    def flow_stats_request(cls, xid):
+        # table_id, pad, out_port, out_group, pad, cookie, cookie_mask and an empty match (type OXM, padded to 8 bytes)
+        body = struct.pack('!B3xII4xQQ', cls.OFPTT_ALL, cls.OFPP_ANY, cls.OFPG_ANY, 0, 0) + \
+            struct.pack('!HH4x', 1, 4)
+        return cls.message(cls.OFPT_MULTIPART_REQUEST, xid, cls._MULTIPART.pack(cls.OFPMP_FLOW, 0) + body)
+
+    '''
+    Request the statistics of all tables.
+    '''
+    @classmethod
+    def table_stats_request(cls, xid):
+        return cls.message(cls.OFPT_MULTIPART_REQUEST, xid, cls._MULTIPART.pack(cls.OFPMP_TABLE, 0))
+
+    '''
+    Decode a MULTIPART_REPLY message, returning the tuple (multipart_type, more, body).
+    '''
+    @classmethod
+    def parse_multipart_reply(cls, data):
+        multipart_type, flags = cls._MULTIPART.unpack(data[OFP_HEADER_LENGTH:OFP_HEADER_LENGTH + cls._MULTIPART.size])
+        return multipart_type, bool(flags & cls.OFPMPF_REPLY_MORE), data[OFP_HEADER_LENGTH + cls._MULTIPART.size:]
+
+    '''
+    Decode the body of a flow stats reply into a list of dictionaries, one for each flow.
+    '''
+    @classmethod
+    def parse_flow_stats(cls, body):
+        flows = []
+        position = 0
+        while position + cls._FLOW_STATS.size <= len(body):
+            (length, table_id, duration_sec, duration_nsec, priority, idle_timeout, hard_timeout, flags, cookie,
+             packets, volume) = cls._FLOW_STATS.unpack(body[position:position + cls._FLOW_STATS.size])
+            if length < cls._FLOW_STATS.size:
+                break
+            entry = body[position + cls._FLOW_STATS.size:position + length]
+            # The match is padded to a multiple of 8 bytes; instructions follow
+            match_type, match_length = struct.unpack('!HH', entry[:4])
+            match_end = (match_length + 7) // 8 * 8
+            flows.append({
+                'table': table_id,
+                'duration': duration_sec + duration_nsec / 1e9,
+                'priority': priority,
+                'cookie': cookie,
+                'packets': packets,
+                'bytes': volume,
+                'match': cls.decode_match(entry[4:match_length]),
+                'actions': cls.decode_instructions(entry[match_end:])
+            })
+            position += length
+        return flows
+
+    '''
+    Decode the body of a table stats reply into a list of dictionaries, one for each table.
+    '''
+    @classmethod
+    def parse_table_stats(cls, body):
+        tables = []
+        for position in range(0, len(body) - cls._TABLE_STATS.size + 1, cls._TABLE_STATS.size):
+            table_id, active_count, lookup_count, matched_count = \
+                cls._TABLE_STATS.unpack(body[position:position + cls._TABLE_STATS.size])
+            tables.append({'table': table_id, 'active': active_count, 'lookups': lookup_count,
+                           'matched': matched_count})
+        return tables
+
+    '''
+    Format the value of an OXM field.
+    '''
+    @classmethod
+    def _format_field(cls, value_format, value, mask):
+        if value_format == 'mac':
+            text = ':'.join('%02x' % b for b in bytearray(value))
+            if mask is not None:
+                text += '/' + ':'.join('%02x' % b for b in bytearray(mask))
+            return text
+        if value_format == 'ipv4':
+            text = socket.inet_ntoa(value)
+            if mask is not None:
+                prefix = bin(struct.unpack('!I', mask)[0]).count('1')
+                text += '/' + str(prefix)
+            return text
+        number = 0
+        for b in bytearray(value):
+            number = (number << 8) | b
+        if value_format == 'vlan':
+            # The OFPVID_PRESENT bit is not part of the VLAN id
+            number &= 0x0fff
+        text = ('0x%04x' % number) if value_format == 'hex' else str(number)
+        if mask is not None:
+            masked = 0
+            for b in bytearray(mask):
+                masked = (masked << 8) | b
+            text += '/0x%x' % masked
+        return text
+
+    '''
+    Decode the OXM fields of a match into a list of (name, value) tuples.
+    '''
+    @classmethod
+    def decode_match(cls, data):
+        fields = []
+        position = 0
+        while position + 4 <= len(data):
+            oxm_class, oxm_field_and_mask, oxm_length = struct.unpack('!HBB', data[position:position + 4])
+            value = data[position + 4:position + 4 + oxm_length]
+            field = oxm_field_and_mask >> 1
+            has_mask = oxm_field_and_mask & 0x01
+            position += 4 + oxm_length
+            if oxm_class != OFPXMC_OPENFLOW_BASIC or field not in cls.OXM_FIELDS:
+                fields.append(('oxm%x_%d' % (oxm_class, field), ''.join('%02x' % b for b in bytearray(value))))
+                continue
+            name, value_format = cls.OXM_FIELDS[field]
+            half = oxm_length // 2
+            if has_mask:
+                fields.append((name, cls._format_field(value_format, value[:half], value[half:])))
+            else:
+                fields.append((name, cls._format_field(value_format, value, None)))
+        return fields
+
+    '''
+    Format an output port.
+    '''
+    @classmethod
+    def _format_port(cls, port):
+        return cls.PORTS.get(port, str(port))
+
+    '''
+    Decode a list of actions into the ovs-ofctl notation.
+    '''
+    @classmethod
+    def decode_actions(cls, data):
+        actions = []
+        position = 0
+        while position + 4 <= len(data):
+            action_type, length = struct.unpack('!HH', data[position:position + 4])
+            if length < 4:
+                break
+            body = data[position + 4:position + length]
+            position += length
+            if action_type == 0:
+                port, max_length = struct.unpack('!IH', body[:6])
+                if port == 0xfffffffd:
+                    actions.append('CONTROLLER:%d' % max_length)
+                elif port in cls.PORTS:
+                    actions.append(cls.PORTS[port])
+                else:
+                    actions.append('output:%d' % port)
+            elif action_type in (17, 19, 20):
+                names = {17: 'push_vlan', 19: 'push_mpls', 20: 'pop_mpls'}
+                actions.append('%s:0x%04x' % (names[action_type], struct.unpack('!H', body[:2])[0]))
+            elif action_type == 18:
+                actions.append('pop_vlan')
+            elif action_type == 22:
+                actions.append('group:%d' % struct.unpack('!I', body[:4])[0])
+            elif action_type == 23:
+                actions.append('mod_nw_ttl:%d' % struct.unpack('!B', body[:1])[0])
+            elif action_type == 24:
+                actions.append('dec_ttl')
+            elif action_type == 15:
+                actions.append('set_mpls_ttl(%d)' % struct.unpack('!B', body[:1])[0])
+            elif action_type == 16:
+                actions.append('dec_mpls_ttl')
+            elif action_type == 25:
+                # A single OXM field, followed by the padding of the action to a multiple of 8 bytes
+                oxm_length = struct.unpack('!B', body[3:4])[0] if len(body) >= 4 else 0
+                for name, value in cls.decode_match(body[:4 + oxm_length]):
+                    actions.append('set_field:%s->%s' % (value, name))
+            else:
+                actions.append('action%d' % action_type)
+        return actions
+
+    '''
+    Decode the instructions of a flow into the ovs-ofctl notation of its actions.
+    '''
+    @classmethod
+    def decode_instructions(cls, data):
+        actions = []
+        position = 0
+        while position + 4 <= len(data):
+            instruction_type, length = struct.unpack('!HH', data[position:position + 4])
+            if length < 4:
+                break
+            body = data[position + 4:position + length]
+            position += length
+            if instruction_type == 1:
+                actions.append('goto_table:%d' % struct.unpack('!B', body[:1])[0])
+            elif instruction_type == 2:
+                metadata, mask = struct.unpack('!4xQQ', body[:20])
+                actions.append('write_metadata:0x%x/0x%x' % (metadata, mask))
+            elif instruction_type == 3:
+                actions.append('write_actions(%s)' % ','.join(cls.decode_actions(body[4:])))
+            elif instruction_type == 4:
+                actions.extend(cls.decode_actions(body[4:]))
+            elif instruction_type == 5:
+                actions.append('clear_actions')
+            elif instruction_type == 6:
+                actions.append('meter:%d' % struct.unpack('!I', body[:4])[0])
+            else:
+                actions.append('instruction%d' % instruction_type)
+        return actions
@@ -41,6 +41,13 @@ class Parser(object):
     def get_services(self):
         return self._services
 
+    '''
+    Return the parameters declared into section [Framework] of the configuration file, but the services. This is a
+    map<name, string>.
+    '''
+    def get_framework_parameters(self):
+        return dict((name, value) for name, value in self._parser['Framework'].items() if name != 'services')
+
     '''
     This method has in charge the task of parsing the configuration file.
     '''
@@ -195,23 +202,29 @@ class Parser(object):
                            'Environment %s has been associated to alternative %s.', environment_name, alternative_name)
 
             # Now, for each alternative, handle metrics
-            self._handle_metrics_for_alternative(alternative, environment_name, metrics)
+            self._handle_metrics_for_alternative(alternative, environment_name, service_block, metrics)
 
     '''
     This method has in charge the task of creating metric objects alternative passed as parameter.
     '''
-    def _handle_metrics_for_alternative(self, alternative, environment, metrics):
+    def _handle_metrics_for_alternative(self, alternative, environment, service_block, metrics):
         for metric_name in metrics:
             self._log.info(self.__class__.__name__, 'Loading metric %s.', metric_name)
+            # A metric may have its own section inside the service block, containing its parameters
+            metric_parameters = service_block.get(metric_name, {})
+            if not isinstance(metric_parameters, dict):
+                metric_parameters = {}
             # Load the extractor and collector adapters. They are strings, because the extractor and collector are based
             # both on the metric and the environment to use
             extractor_adapter = self._system_parser.get_extractor_adapter(metric_name)
             # Load the actual adapter, based on this metric and the environment for the selected alternative
             extractor_class = self._factory_extractor.create_extractor(extractor_adapter, environment)
+            extractor_class.set_parameters(metric_parameters)
             self._log.info(self.__class__.__name__, 'Extractor %s has been created.', extractor_adapter)
             collector_adapter = self._system_parser.get_collector_adapter(metric_name)
             if collector_adapter is not None:
                 collector_class = self._factory_collector.create_collector(collector_adapter, environment)
+                collector_class.set_parameters(metric_parameters)
                 self._log.info(self.__class__.__name__, 'Collector %s has been created.', collector_adapter)
             else:
                 collector_class = None
@@ -0,0 +1,39 @@
+from threading import Condition
+
+"""
+This class implements a count down latch: threads waiting on the latch are released when it has been counted down as
+many times as its initial count.
+"""
+
+
+class CountDownLatch(object):
+
+    def __init__(self, count):
+        self._count = count
+        self._condition = Condition()
+
+    def __repr__(self):
+        return 'CountDownLatch[count=%s]' % self._count
+
+    # Return the number of count downs still missing
+    def get_count(self):
+        with self._condition:
+            return self._count
+
+    # Count down the latch, releasing the waiting threads when the count reaches zero
+    def count_down(self):
+        with self._condition:
+            if self._count > 0:
+                self._count -= 1
+                if self._count == 0:
+                    self._condition.notify_all()
+
+    # Wait until the count reaches zero or timeout (seconds) expires. Return True if the count reached zero
+    def wait(self, timeout=None):
+        with self._condition:
+            if timeout is None:
+                while self._count > 0:
+                    self._condition.wait()
+            elif self._count > 0:
+                self._condition.wait(timeout)
+            return self._count == 0
@@ -0,0 +1,64 @@
+from multiprocessing import Pool, cpu_count
+from threading import Lock
+
+from utils.log import Logger
+
+"""
+This class handles the pool of processes in which CPU-bound extractors execute their heavy work, thus using all cores
+instead of sharing a single interpreter with the other threads of the framework. The pool is created upon the first
+request and shared by all extractors. Functions executed into the pool have to be defined at module level, and both
+their arguments and their results have to be picklable: large inputs are passed by file path.
+"""
+
+
+class ProcessPool(object):
+    __instance = None
+    __lock = Lock()
+
+    def __init__(self):
+        # Logger
+        self._log = Logger.get_instance()
+        # The number of processes (None means one for each core)
+        self._processes = None
+        self._pool = None
+
+    def __repr__(self):
+        return 'ProcessPool[processes=%s]' % (self._processes or cpu_count())
+
+    '''
+    In accord with Singleton pattern, it returns an instance of this class.
+    '''
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            with cls.__lock:
+                if cls.__instance is None:
+                    cls.__instance = ProcessPool()
+        return cls.__instance
+
+    '''
+    Set the number of processes of the pool. It has effect only before the pool is created.
+    '''
+    def set_processes(self, processes):
+        self._processes = int(processes) if processes else None
+
+    '''
+    Execute function(*args) into a process of the pool, waiting for its result.
+    '''
+    def apply(self, function, *args):
+        with self.__lock:
+            if self._pool is None:
+                self._pool = Pool(self._processes)
+                self._log.info(self.__class__.__name__, 'Process pool has been created: %s.', self)
+            pool = self._pool
+        return pool.apply(function, args)
+
+    '''
+    Terminate the processes of the pool.
+    '''
+    def close(self):
+        with self.__lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
@@ -0,0 +1,72 @@
+import socket
+import struct
+
+"""
+This class implements a longest-prefix-match index over IPv4 networks. Networks are stored into a binary trie, whose
+nodes are created only along the inserted prefixes: each node is a list [child_0, child_1, value]. Both networks and
+lookup keys are strings in the forms "a.b.c.d", "a.b.c.d/len" or "a.b.c.d/m.m.m.m" (as in the matches printed by
+ovs-ofctl); non contiguous masks are truncated to their leading ones.
+"""
+
+
+class PrefixTrie(object):
+    def __init__(self):
+        self._root = [None, None, None]
+        # Number of stored prefixes
+        self._size = 0
+
+    def __repr__(self):
+        return 'PrefixTrie[#prefixes=%s]' % self._size
+
+    def __len__(self):
+        return self._size
+
+    '''
+    Parse a prefix into the tuple (address, length), where address is an integer.
+    '''
+    @staticmethod
+    def parse(prefix):
+        prefix = str(prefix)
+        if '/' not in prefix:
+            return struct.unpack('!I', socket.inet_aton(prefix))[0], 32
+        address, mask = prefix.split('/', 1)
+        address = struct.unpack('!I', socket.inet_aton(address))[0]
+        if '.' in mask:
+            mask = struct.unpack('!I', socket.inet_aton(mask))[0]
+            length = 0
+            while length < 32 and mask & (0x80000000 >> length):
+                length += 1
+        else:
+            length = int(mask)
+        return address, length
+
+    '''
+    Store value for prefix. A value already stored for the same prefix is replaced.
+    '''
+    def insert(self, prefix, value):
+        address, length = self.parse(prefix)
+        node = self._root
+        for i in range(length):
+            bit = (address >> (31 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        if node[2] is None:
+            self._size += 1
+        node[2] = value
+
+    '''
+    Return the value of the longest stored prefix containing prefix, or default if there is none. A stored prefix
+    contains prefix if it is not longer than prefix and their leading bits are the same.
+    '''
+    def lookup(self, prefix, default=None):
+        address, length = self.parse(prefix)
+        node = self._root
+        value = node[2] if node[2] is not None else default
+        for i in range(length):
+            node = node[(address >> (31 - i)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                value = node[2]
+        return value
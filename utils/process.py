@@ -0,0 +1,66 @@
+import psutil
+
+"""
+This class models a tree of processes, rooted at a given process, whose resource usage can be sampled. Both the old
+(get_* methods) and the new psutil interfaces are supported.
+"""
+
+
+class ProcessTree(object):
+
+    # The quantities returned by sample
+    FIELDS = ('processes', 'cpu_user', 'cpu_system', 'rss', 'threads', 'fds', 'voluntary_ctx_switches',
+              'involuntary_ctx_switches')
+
+    def __init__(self, pid):
+        self._root = psutil.Process(pid)
+
+    def __repr__(self):
+        return 'ProcessTree[pid=%s]' % self._root.pid
+
+    '''
+    Call the psutil method name of process, falling back on its old name (get_name). Old psutil versions expose some
+    information (e.g. name and cmdline) as attributes: in that case, the attribute is returned.
+    '''
+    @staticmethod
+    def call(process, name, *args, **kwargs):
+        method = getattr(process, name, None)
+        if method is None:
+            method = getattr(process, 'get_' + name)
+        elif not callable(method):
+            return method
+        return method(*args, **kwargs)
+
+    '''
+    Return all the processes of the tree, the root included.
+    '''
+    def get_processes(self):
+        return [self._root] + self.call(self._root, 'children', recursive=True)
+
+    '''
+    Sample the resource usage of the tree. It returns a map<field, value>, where fields are the ones in FIELDS and
+    values are summed over all the processes of the tree. CPU times are in seconds, RSS in bytes. Processes which
+    terminate while being sampled are ignored. If the root process has terminated, psutil.NoSuchProcess is raised.
+    '''
+    def sample(self):
+        sample = dict((field, 0) for field in self.FIELDS)
+        for process in self.get_processes():
+            try:
+                cpu_times = self.call(process, 'cpu_times')
+                memory = self.call(process, 'memory_info')
+                threads = self.call(process, 'num_threads')
+                fds = self.call(process, 'num_fds')
+                ctx_switches = self.call(process, 'num_ctx_switches')
+            except psutil.NoSuchProcess:
+                if process is self._root:
+                    raise
+                continue
+            sample['processes'] += 1
+            sample['cpu_user'] += cpu_times.user
+            sample['cpu_system'] += cpu_times.system
+            sample['rss'] += memory.rss
+            sample['threads'] += threads
+            sample['fds'] += fds
+            sample['voluntary_ctx_switches'] += ctx_switches.voluntary
+            sample['involuntary_ctx_switches'] += ctx_switches.involuntary
+        return sample
@@ -0,0 +1,322 @@
+import cProfile
+import fnmatch
+import os
+import pstats
+import sys
+import threading
+from StringIO import StringIO
+
+from utils.log import Logger
+from utils.tracing import Tracer
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2 does not provide it
+    tracemalloc = None
+
+"""
+This class profiles a phase by cProfile: the results are merged into a pstats.Stats object, saved as <phase>.pstats
+(to be read by pstats or by tools like snakeviz) and summarized by the functions with the largest cumulative time.
+"""
+
+
+class CProfileSession(object):
+    EXTENSION = '.pstats'
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+        return self._profile
+
+    '''
+    Merge the result of a session into result, returning it.
+    '''
+    @staticmethod
+    def merge(result, other):
+        result.add(other)
+        return result
+
+    '''
+    Return a copy of the result of a session, into which the results of other sessions can be merged.
+    '''
+    @staticmethod
+    def copy(result):
+        return pstats.Stats(result, stream=StringIO())
+
+    @classmethod
+    def dump(cls, result, path):
+        result.dump_stats(path + cls.EXTENSION)
+
+    '''
+    Return the top functions of a result, as a list of lines.
+    '''
+    @staticmethod
+    def summarize(result, top):
+        stream = StringIO()
+        result.stream = stream
+        result.sort_stats('cumulative').print_stats(top)
+        return [line for line in stream.getvalue().splitlines() if line.strip()]
+
+"""
+This class profiles a phase by sampling the stack of its thread every INTERVAL seconds: the overhead does not depend on
+the number of function calls, thus it is suitable for long phases. The result maps each sampled stack (a tuple of
+functions, the outermost first) to the number of its samples; it is saved as <phase>.folded (one line for each stack,
+in the format of flame graph tools) and summarized by the functions with the most samples (self, and cumulative).
+"""
+
+
+class SamplingSession(object):
+    EXTENSION = '.folded'
+    INTERVAL = 0.005
+
+    def __init__(self):
+        self._thread = threading.current_thread().ident
+        self._stacks = {}
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name='Sampler-%s' % self._thread)
+        self._sampler.daemon = True
+
+    '''
+    Body of the sampler thread.
+    '''
+    def _sample(self):
+        while not self._stopped.wait(self.INTERVAL):
+            frame = sys._current_frames().get(self._thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append('%s (%s:%s)' % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                stack = tuple(reversed(stack))
+                self._stacks[stack] = self._stacks.get(stack, 0) + 1
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._sampler.join()
+        return self._stacks
+
+    @staticmethod
+    def merge(result, other):
+        for stack, samples in other.items():
+            result[stack] = result.get(stack, 0) + samples
+        return result
+
+    @staticmethod
+    def copy(result):
+        return dict(result)
+
+    @classmethod
+    def dump(cls, result, path):
+        with open(path + cls.EXTENSION, 'w') as output_file:
+            for stack, samples in sorted(result.items()):
+                output_file.write('%s %s\n' % (';'.join(stack), samples))
+
+    @classmethod
+    def summarize(cls, result, top):
+        total = sum(result.values())
+        own = {}
+        cumulative = {}
+        for stack, samples in result.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + samples
+            for function in set(stack):
+                cumulative[function] = cumulative.get(function, 0) + samples
+        lines = ['%s samples (%.0f ms each); self, cumulative, function:' % (total, cls.INTERVAL * 1000)]
+        for function in sorted(own.keys(), key=lambda function: -own[function])[:top]:
+            lines.append('%6.1f%% %6.1f%% %s' % (100.0 * own[function] / total, 100.0 * cumulative[function] / total,
+                                                 function))
+        return lines
+
+"""
+This class profiles the memory allocated during a phase by tracemalloc (Python 3 only): the result is a list of
+(snapshot, differences) tuples, the differences being the statistics of the snapshot taken at the end of the phase
+compared to the one taken at its beginning. Snapshots are saved as <phase>-<n>.tracemalloc (to be loaded by
+tracemalloc.Snapshot.load) and summarized by the lines which allocated the most memory.
+"""
+
+
+class TracemallocSession(object):
+    EXTENSION = '.tracemalloc'
+    FRAMES = 25
+
+    def __init__(self):
+        self._first = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.FRAMES)
+        self._first = tracemalloc.take_snapshot()
+
+    def stop(self):
+        snapshot = tracemalloc.take_snapshot()
+        return [(snapshot, snapshot.compare_to(self._first, 'lineno'))]
+
+    @staticmethod
+    def merge(result, other):
+        return result + other
+
+    @staticmethod
+    def copy(result):
+        return list(result)
+
+    @classmethod
+    def dump(cls, result, path):
+        for i, (snapshot, differences) in enumerate(result):
+            snapshot.dump('%s-%s%s' % (path, i, cls.EXTENSION))
+
+    @staticmethod
+    def summarize(result, top):
+        sizes = {}
+        for snapshot, differences in result:
+            for difference in differences:
+                line = str(difference.traceback)
+                sizes[line] = sizes.get(line, 0) + difference.size_diff
+        lines = ['Allocated bytes, line:']
+        for line in sorted(sizes.keys(), key=lambda line: -sizes[line])[:top]:
+            lines.append('%12d %s' % (sizes[line], line))
+        return lines
+
+"""
+This class implements the profiling of the phases of the framework, namely of the spans of the Tracer (see
+utils.tracing) whose names match the given patterns (e.g. framework.create_overlay, scenario.* or extractor.execute).
+Each phase is profiled by a session of the chosen profiler (cprofile, sampling or tracemalloc); the results of the
+phases with the same name (and the same extractor, if any) are merged; a phase started by a thread while it is running
+another profiled phase is profiled as part of the latter. At the end of each simulation, the results are
+saved into the profiles folder of the simulation folder; at the end of the run, the top functions of each phase of all
+simulations are summarized.
+"""
+
+
+class Profiler(object):
+    __instance = None
+
+    FOLDER_NAME = 'profiles'
+    SESSIONS = {'cprofile': CProfileSession, 'sampling': SamplingSession, 'tracemalloc': TracemallocSession}
+
+    def __init__(self):
+        # Logger
+        self._log = Logger.get_instance()
+        self._patterns = []
+        self._session_class = None
+        self._top = 20
+        self._lock = threading.Lock()
+        # The sessions of the running spans, and the threads running them. These are map<span id, session> and
+        # set<thread id>
+        self._sessions = {}
+        self._threads = set()
+        # The results of the current simulation and of the whole run. These are maps<phase, result>
+        self._results = {}
+        self._totals = {}
+
+    def __repr__(self):
+        return 'Profiler[patterns=%s, session=%s]' % (self._patterns, self._session_class)
+
+    '''
+    In accord with Singleton pattern, it returns an instance of this class.
+    '''
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            cls.__instance = Profiler()
+        return cls.__instance
+
+    '''
+    Profile the phases whose names match patterns (a list of shell-style wildcards) by profiler, summarizing the top
+    functions of each phase.
+    '''
+    def configure(self, patterns, profiler='cprofile', top=20):
+        if profiler not in self.SESSIONS:
+            raise ValueError('Unknown profiler %s; available profilers are %s.' % (profiler, sorted(self.SESSIONS)))
+        if profiler == 'tracemalloc' and tracemalloc is None:
+            self._log.warning(self.__class__.__name__, 'tracemalloc is not available; phases will not be profiled.')
+            return
+        self._patterns = list(patterns)
+        self._session_class = self.SESSIONS[profiler]
+        self._top = int(top)
+        Tracer.get_instance().add_listener(self)
+        self._log.info(self.__class__.__name__, 'Phases %s will be profiled by %s.', ', '.join(self._patterns),
+                       profiler)
+
+    '''
+    Return True if the phase named name is profiled.
+    '''
+    def is_profiled(self, name):
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self._patterns)
+
+    '''
+    Return the phase of a span, namely its name, followed by the name of its extractor (if any).
+    '''
+    @staticmethod
+    def _get_phase(span):
+        extractor = span.get_attributes().get('extractor')
+        return span.get_name() + ('-' + extractor if extractor is not None else '')
+
+    '''
+    Called by the Tracer when a span starts.
+    '''
+    def span_started(self, span):
+        if self.is_profiled(span.get_name()):
+            thread = span.get_thread().ident
+            with self._lock:
+                if thread in self._threads:
+                    return
+                session = self._session_class()
+                self._sessions[span.get_id()] = session
+                self._threads.add(thread)
+            session.start()
+
+    '''
+    Called by the Tracer when a span ends.
+    '''
+    def span_ended(self, span):
+        with self._lock:
+            session = self._sessions.pop(span.get_id(), None)
+            if session is None:
+                return
+            self._threads.discard(span.get_thread().ident)
+        result = session.stop()
+        phase = self._get_phase(span)
+        with self._lock:
+            for results in (self._results, self._totals):
+                if phase in results:
+                    results[phase] = self._session_class.merge(results[phase], result)
+                else:
+                    # Results are merged in place, thus each map needs its own copy
+                    results[phase] = self._session_class.copy(result)
+
+    '''
+    Save the results of the current simulation into the profiles folder of folder, and forget them.
+    '''
+    def export(self, folder):
+        with self._lock:
+            results, self._results = self._results, {}
+        if not results:
+            return
+        profiles_folder = os.path.join(folder, self.FOLDER_NAME)
+        if not os.path.exists(profiles_folder):
+            os.makedirs(profiles_folder)
+        for phase, result in results.items():
+            self._session_class.dump(result, os.path.join(profiles_folder, phase))
+        self._log.info(self.__class__.__name__, 'Profiles of %s phases have been saved into %s.', len(results),
+                       profiles_folder)
+
+    '''
+    Return the summary of the profiled phases of the whole run, as a list of lines.
+    '''
+    def get_summary(self):
+        lines = []
+        with self._lock:
+            totals = dict(self._totals)
+        for phase in sorted(totals.keys()):
+            lines.append('Top %s functions of phase %s:' % (self._top, phase))
+            lines.extend(self._session_class.summarize(totals[phase], self._top))
+        return lines
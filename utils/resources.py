@@ -0,0 +1,300 @@
+import fcntl
+import json
+import os
+import resource
+import tempfile
+import time
+from threading import Lock
+
+import numpy as np
+import psutil
+
+from utils.fs import FileSystem
+from utils.log import Logger
+from utils.statistics import non_negative_least_squares
+
+"""
+This exception is raised when a simulation cannot be admitted, namely the resources of the host are not enough for it.
+"""
+
+
+class AdmissionError(Exception):
+    pass
+
+"""
+This class reads the resources of the host: the usage of memory (bytes), processes and file descriptors (allocated by
+the whole system), and the capacity left for each of them. Since Mininet keeps some descriptors into this process, the
+descriptors left to this process by its limit are available as well (process_descriptors), as a separate capacity.
+"""
+
+
+class HostResources(object):
+
+    RESOURCES = ('memory', 'processes', 'descriptors')
+
+    '''
+    Return the number of file descriptors allocated by the system and the maximum number of them.
+    '''
+    @staticmethod
+    def _read_descriptors():
+        with open('/proc/sys/fs/file-nr') as input_file:
+            allocated, unused, maximum = input_file.read().split()
+        return int(allocated) - int(unused), int(maximum)
+
+    '''
+    Return the soft limit of a resource of this process, or None if it is unlimited.
+    '''
+    @staticmethod
+    def _get_limit(limit):
+        soft = resource.getrlimit(limit)[0]
+        return None if soft == resource.RLIM_INFINITY else soft
+
+    '''
+    Return the current usage of the resources, as a map<resource, value>.
+    '''
+    @classmethod
+    def get_usage(cls):
+        memory = psutil.virtual_memory()
+        return {'memory': memory.total - memory.available, 'processes': len(psutil.pids()),
+                'descriptors': cls._read_descriptors()[0]}
+
+    '''
+    Return the capacity left for each resource, as a map<resource, value>; it includes process_descriptors, namely the
+    number of file descriptors that this process can still open (infinite if unlimited).
+    '''
+    @classmethod
+    def get_capacity(cls):
+        processes = len(psutil.pids())
+        with open('/proc/sys/kernel/pid_max') as input_file:
+            free_processes = int(input_file.read()) - processes
+        limit = cls._get_limit(resource.RLIMIT_NPROC)
+        if limit is not None:
+            free_processes = min(free_processes, limit - processes)
+        allocated, maximum = cls._read_descriptors()
+        limit = cls._get_limit(resource.RLIMIT_NOFILE)
+        free_process_descriptors = float('inf') if limit is None else limit - len(os.listdir('/proc/self/fd'))
+        return {'memory': psutil.virtual_memory().available, 'processes': free_processes,
+                'descriptors': maximum - allocated, 'process_descriptors': free_process_descriptors}
+
+"""
+This class implements the estimator of the resources needed by an emulation: memory (bytes), processes, file descriptors
+and startup time (seconds) are linear functions of the number of switches, hosts and links of the overlay. Coefficients
+are fitted (non-negative least squares) on the resources used by the previous emulations, which are recorded into
+resources.data, inside the simulations folder; until enough emulations have been recorded, rough coefficients (PRIORS)
+are used. Descriptors are allocated by the whole system; the ones kept into this process (process_descriptors) are
+estimated apart, as PROCESS_DESCRIPTORS for each node.
+"""
+
+
+class ResourceEstimator(object):
+    __instance = None
+
+    HISTORY_FILE_NAME = 'resources.data'
+    ESTIMATES = ('memory', 'processes', 'descriptors', 'startup')
+    # Coefficients of the constant, switches, hosts and links: a shell (and its terminal) for each node, and the
+    # datapath of each switch into ovs-vswitchd
+    PRIORS = {
+        'memory': [64e6, 8e6, 4e6, 0.5e6],
+        'processes': [2.0, 1.0, 1.0, 0.0],
+        'descriptors': [16.0, 4.0, 4.0, 4.0],
+        'startup': [1.0, 0.2, 0.1, 0.05]
+    }
+    # Minimum number of recorded emulations for fitting the coefficients
+    MIN_SAMPLES = 8
+    # Descriptors kept into this process by Mininet for each node (the terminal of its shell)
+    PROCESS_DESCRIPTORS = 2.0
+
+    def __init__(self, path=None):
+        # Logger
+        self._log = Logger.get_instance()
+        if path is None:
+            path = os.path.join(FileSystem.get_instance().get_simulations_folder(), self.HISTORY_FILE_NAME)
+        self._path = path
+        self._lock = Lock()
+        # The coefficients of each estimate; they are fitted upon the first estimation
+        self._coefficients = None
+
+    def __repr__(self):
+        return 'ResourceEstimator[path=%s]' % self._path
+
+    '''
+    In accord with Singleton pattern, it returns an instance of this class.
+    '''
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            cls.__instance = ResourceEstimator()
+        return cls.__instance
+
+    '''
+    Return the features of an overlay.
+    '''
+    @staticmethod
+    def get_features(overlay):
+        return [1.0, float(len(overlay.get_nodes())), float(len(overlay.get_hosts())), float(len(overlay.get_links()))]
+
+    '''
+    Fit the coefficients on the recorded emulations.
+    '''
+    def _fit(self):
+        samples = []
+        if os.path.exists(self._path):
+            with open(self._path) as input_file:
+                for line in input_file:
+                    if not line.startswith('#') and len(line.split()) == 3 + len(self.ESTIMATES):
+                        samples.append([float(field) for field in line.split()])
+        coefficients = dict(self.PRIORS)
+        if len(samples) >= self.MIN_SAMPLES:
+            samples = np.array(samples)
+            features = np.hstack((np.ones((len(samples), 1)), samples[:, :3]))
+            for i, estimate in enumerate(self.ESTIMATES):
+                coefficients[estimate] = non_negative_least_squares(features, samples[:, 3 + i])
+        self._log.debug(self.__class__.__name__, 'Resource coefficients have been fitted on %s emulations.',
+                        len(samples))
+        return coefficients
+
+    '''
+    Return the estimated resources needed by the emulation of an overlay, as a map<estimate, value>; it includes
+    process_descriptors.
+    '''
+    def estimate(self, overlay):
+        with self._lock:
+            if self._coefficients is None:
+                self._coefficients = self._fit()
+        features = self.get_features(overlay)
+        estimates = dict((estimate, float(np.dot(self._coefficients[estimate], features)))
+                         for estimate in self.ESTIMATES)
+        estimates['process_descriptors'] = self.PROCESS_DESCRIPTORS * (features[1] + features[2])
+        return estimates
+
+    '''
+    Record the resources used by the emulation of an overlay (a map<estimate, value>).
+    '''
+    def record(self, overlay, usage):
+        with self._lock:
+            folder = os.path.dirname(self._path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            exists = os.path.exists(self._path)
+            with open(self._path, 'a') as output_file:
+                if not exists:
+                    output_file.write('# switches hosts links %s\n' % ' '.join(self.ESTIMATES))
+                output_file.write(' '.join(str(value) for value in self.get_features(overlay)[1:] +
+                                           [usage[estimate] for estimate in self.ESTIMATES]) + '\n')
+            # Fit again upon the next estimation
+            self._coefficients = None
+
+"""
+This class implements the admission control of emulations. An emulation is admitted if its estimated resources,
+increased by margin, fit into the capacity left on the host; otherwise, it waits (at most timeout seconds) for other
+emulations to end, and then it is refused raising an AdmissionError. Descriptors are checked twice: the ones of the
+whole system against the capacity of the system, and the ones kept into this process against its limit. Admitted
+emulations reserve their resources (the ones of the host, not process_descriptors) until they are started (namely,
+until their resources are actually used): reservations are shared by all the instances of the framework running on the
+host through a file into the temporary folder of the system, so that concurrent emulations are packed safely.
+"""
+
+
+class AdmissionControl(object):
+    __instance = None
+
+    RESERVATIONS_FILE_NAME = 'service-comparison-reservations.json'
+    # Time (seconds) between two checks of the capacity, while waiting
+    POLL_INTERVAL = 5.0
+
+    def __init__(self, margin=1.25, path=None):
+        # Logger
+        self._log = Logger.get_instance()
+        self._margin = margin
+        if path is None:
+            path = os.path.join(tempfile.gettempdir(), self.RESERVATIONS_FILE_NAME)
+        self._path = path
+
+    def __repr__(self):
+        return 'AdmissionControl[margin=%s]' % self._margin
+
+    '''
+    In accord with Singleton pattern, it returns an instance of this class.
+    '''
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            cls.__instance = AdmissionControl()
+        return cls.__instance
+
+    '''
+    Set the margin by which the estimated resources are increased.
+    '''
+    def set_margin(self, margin):
+        self._margin = float(margin)
+
+    '''
+    Apply function to the reservations (a map<pid, map<resource, value>>) of the processes still alive, holding an
+    exclusive lock on them; the reservations are saved afterwards. It returns what function returns.
+    '''
+    def _update(self, function):
+        with open(self._path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                reservations = {}
+                if os.path.exists(self._path):
+                    with open(self._path) as input_file:
+                        try:
+                            reservations = json.load(input_file)
+                        except ValueError:
+                            reservations = {}
+                reservations = dict((pid, reserved) for pid, reserved in reservations.items()
+                                    if psutil.pid_exists(int(pid)))
+                result = function(reservations)
+                with open(self._path + '.part', 'w') as output_file:
+                    json.dump(reservations, output_file)
+                os.rename(self._path + '.part', self._path)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    '''
+    Admit an emulation whose estimated resources are demand (a map<resource, value>), waiting at most timeout seconds
+    for the resources to be available. It raises an AdmissionError if the emulation cannot be admitted.
+    '''
+    def admit(self, demand, timeout=0):
+        pid = str(os.getpid())
+        needed = dict((name, demand[name] * self._margin) for name in HostResources.RESOURCES)
+        # The limit of this process is not shared with other processes, thus nothing is reserved against it
+        needed_process_descriptors = demand.get('process_descriptors', 0) * self._margin
+
+        # Reserve the resources if they fit, otherwise return the resources which do not fit
+        def reserve(reservations):
+            capacity = HostResources.get_capacity()
+            missing = []
+            for name in HostResources.RESOURCES:
+                reserved = sum(other[name] for other_pid, other in reservations.items() if other_pid != pid)
+                if needed[name] > capacity[name] - reserved:
+                    missing.append('%s (%.0f needed, %.0f available)' % (name, needed[name],
+                                                                          capacity[name] - reserved))
+            if needed_process_descriptors > capacity['process_descriptors']:
+                missing.append('process_descriptors (%.0f needed, %.0f available)' % (
+                    needed_process_descriptors, capacity['process_descriptors']))
+            if not missing:
+                reservations[pid] = needed
+            return missing
+
+        deadline = time.time() + timeout
+        while True:
+            missing = self._update(reserve)
+            if not missing:
+                self._log.info(self.__class__.__name__, 'Emulation has been admitted (%s).',
+                               ', '.join('%s: %.0f' % (name, needed[name]) for name in HostResources.RESOURCES))
+                return
+            if time.time() >= deadline:
+                raise AdmissionError('Not enough resources for the emulation: %s.' % ', '.join(missing))
+            self._log.info(self.__class__.__name__, 'Not enough resources for the emulation (%s); waiting.',
+                           ', '.join(missing))
+            time.sleep(min(self.POLL_INTERVAL, max(0.0, deadline - time.time())))
+
+    '''
+    Release the resources reserved by this process.
+    '''
+    def release(self):
+        pid = str(os.getpid())
+        self._update(lambda reservations: reservations.pop(pid, None))
@@ -0,0 +1,263 @@
+import json
+import os
+import sqlite3
+from threading import Lock
+
+from utils.fs import FileSystem
+from utils.log import Logger
+
+"""
+This class implements the results store, namely an SQLite database (results.db, inside the simulations folder) in which
+each simulation stores the values extracted by its extractors, so that runs can be compared without parsing the files
+of the simulation folders. The database contains two tables:
+ - runs: a row for each simulation, identified by run_id (the path of the simulation folder relative to the simulations
+   folder), with its service, alternative, topology, parameters (a JSON object), fingerprint (see
+   utils.fingerprint.Fingerprint) and whether it completed, namely all its extractors succeeded;
+ - records: a row for each extracted value, with the run_id, the metric, the name of the value and its subject, namely
+   what the value refers to (e.g. a switch or a VPN; it is empty for values about the whole run).
+"""
+
+
+class ResultsStore(object):
+    __instance = None
+
+    DATABASE_FILE_NAME = 'results.db'
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id TEXT PRIMARY KEY,
+            service TEXT NOT NULL,
+            alternative TEXT NOT NULL,
+            topology TEXT NOT NULL,
+            parameters TEXT NOT NULL,
+            path TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            fingerprint TEXT,
+            completed INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS records (
+            run_id TEXT NOT NULL REFERENCES runs(run_id),
+            metric TEXT NOT NULL,
+            name TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            value REAL
+        );
+        CREATE INDEX IF NOT EXISTS runs_by_alternative ON runs(service, alternative, topology);
+        CREATE INDEX IF NOT EXISTS records_by_name ON records(metric, name, subject);
+        CREATE INDEX IF NOT EXISTS records_by_run ON records(run_id);
+    '''
+    # Columns added to runs after the first version of the schema, with their types
+    ADDED_COLUMNS = (('fingerprint', 'TEXT'), ('completed', 'INTEGER'))
+    # Columns of runs which queries can be filtered and grouped by
+    RUN_COLUMNS = ('run_id', 'service', 'alternative', 'topology')
+
+    def __init__(self, path=None):
+        # Logger
+        self._log = Logger.get_instance()
+        if path is None:
+            path = os.path.join(FileSystem.get_instance().get_simulations_folder(), self.DATABASE_FILE_NAME)
+        self._path = path
+        # The connection is shared by all threads, thus it is used holding the lock
+        self._lock = Lock()
+        self._connection = None
+
+    def __repr__(self):
+        return 'ResultsStore[path=%s]' % self._path
+
+    '''
+    In accord with Singleton pattern, it returns an instance of this class.
+    '''
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            cls.__instance = ResultsStore()
+        return cls.__instance
+
+    '''
+    Return the path of the database.
+    '''
+    def get_path(self):
+        return self._path
+
+    '''
+    Return the connection to the database, opening it (and creating the tables) if needed.
+    '''
+    def _connect(self):
+        if self._connection is None:
+            folder = os.path.dirname(self._path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            # Write-ahead logging: readers do not block the writer, and commits are cheaper
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(self.SCHEMA)
+            # Upgrade the stores created by previous versions
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(runs)')]
+            for column, column_type in self.ADDED_COLUMNS:
+                if column not in columns:
+                    self._connection.execute('ALTER TABLE runs ADD COLUMN %s %s' % (column, column_type))
+            self._connection.execute('CREATE INDEX IF NOT EXISTS runs_by_fingerprint ON runs(fingerprint)')
+            self._log.debug(self.__class__.__name__, 'Results store %s has been opened.', self._path)
+        return self._connection
+
+    '''
+    Close the connection to the database.
+    '''
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    '''
+    Build the WHERE clause (and its arguments) selecting the runs whose columns have the given values. A value can be a
+    list, selecting any of its elements.
+    '''
+    def _where(self, filters, clauses=None, arguments=None):
+        clauses = list(clauses or [])
+        arguments = list(arguments or [])
+        for column in sorted(filters.keys()):
+            if column not in self.RUN_COLUMNS:
+                raise ValueError('Unknown column %s; available columns are %s.' % (column, self.RUN_COLUMNS))
+            values = filters[column]
+            if isinstance(values, (list, tuple)):
+                clauses.append('runs.%s IN (%s)' % (column, ', '.join('?' * len(values))))
+                arguments.extend(values)
+            else:
+                clauses.append('runs.%s = ?' % column)
+                arguments.append(values)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', arguments
+
+    '''
+    Add a run. Parameters are a map, stored as a JSON object.
+    '''
+    def add_run(self, run_id, service, alternative, topology, parameters, path, timestamp, fingerprint=None,
+                completed=True):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO runs (run_id, service, alternative, topology, parameters, '
+                                   'path, timestamp, fingerprint, completed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                   (run_id, service, alternative, topology, json.dumps(parameters, sort_keys=True),
+                                    path, timestamp, fingerprint, int(completed)))
+
+    '''
+    Delete a run and its records.
+    '''
+    def delete_run(self, run_id):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute('DELETE FROM records WHERE run_id = ?', (run_id,))
+                connection.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+
+    '''
+    Return the last completed run with the given fingerprint whose folder still exists, or None if there is not any.
+    '''
+    def find_run(self, fingerprint):
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT run_id, path FROM runs WHERE fingerprint = ? AND completed = 1 ORDER BY timestamp DESC',
+                (fingerprint,)).fetchall()
+        for run_id, path in rows:
+            if os.path.isdir(path):
+                return self.get_runs(run_id=run_id)[0]
+        return None
+
+    '''
+    Add the records of a run, as a list of (metric, name, subject, value) tuples. The records already stored for the
+    same metrics of the run are replaced.
+    '''
+    def add_records(self, run_id, records):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for metric in set(record[0] for record in records):
+                    connection.execute('DELETE FROM records WHERE run_id = ? AND metric = ?', (run_id, metric))
+                connection.executemany('INSERT INTO records VALUES (?, ?, ?, ?, ?)',
+                                       ((run_id, metric, name, subject, value)
+                                        for metric, name, subject, value in records))
+
+    '''
+    Import the runs (and their records) of the results store at path, prefixing their run ids with prefix. The runs
+    already imported with the same run id are replaced. It returns the number of imported runs.
+    '''
+    def merge(self, path, prefix=''):
+        source = ResultsStore(path)
+        runs = source.get_runs()
+        records = {}
+        for run_id, service, alternative, topology, metric, name, subject, value in source.query():
+            records.setdefault(run_id, []).append((metric, name, subject, value))
+        source.close()
+        for run in runs:
+            run_id = prefix + run['run_id']
+            self.delete_run(run_id)
+            self.add_run(run_id, run['service'], run['alternative'], run['topology'], run['parameters'], run['path'],
+                         run['timestamp'], run['fingerprint'], run['completed'])
+            self.add_records(run_id, records.get(run['run_id'], []))
+        return len(runs)
+
+    '''
+    Return the runs selected by filters (see _where), as a list of maps whose parameters are decoded.
+    '''
+    def get_runs(self, **filters):
+        where, arguments = self._where(filters)
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT run_id, service, alternative, topology, parameters, path, timestamp, fingerprint, completed '
+                'FROM runs' + where + ' ORDER BY timestamp', arguments).fetchall()
+        return [{'run_id': row[0], 'service': row[1], 'alternative': row[2], 'topology': row[3],
+                 'parameters': json.loads(row[4]), 'path': row[5], 'timestamp': row[6], 'fingerprint': row[7],
+                 'completed': bool(row[8])} for row in rows]
+
+    '''
+    Return the records of metric (or of all metrics) named name (or with any name), about subject (or any subject), of
+    the runs selected by filters (see _where). Records are (run_id, service, alternative, topology, metric, name,
+    subject, value) tuples.
+    '''
+    def query(self, metric=None, name=None, subject=None, **filters):
+        clauses, arguments = [], []
+        for column, value in (('metric', metric), ('name', name), ('subject', subject)):
+            if value is not None:
+                clauses.append('records.%s = ?' % column)
+                arguments.append(value)
+        where, arguments = self._where(filters, clauses, arguments)
+        with self._lock:
+            return self._connect().execute(
+                'SELECT runs.run_id, service, alternative, topology, metric, name, subject, value '
+                'FROM records JOIN runs ON records.run_id = runs.run_id' + where +
+                ' ORDER BY runs.timestamp, metric, name, subject', arguments).fetchall()
+
+    '''
+    Return a comparison table of the values of metric named name (about subject, or any subject), for the runs selected
+    by filters (see _where). Rows are grouped by the columns in group_by (among RUN_COLUMNS), and by subject if
+    by_subject is True; for each group the number of runs, the mean, the standard deviation, the minimum and the
+    maximum of the values are computed. It returns a tuple (header, rows).
+    '''
+    def compare(self, metric, name, group_by=('service', 'alternative', 'topology'), by_subject=False, subject=None,
+                **filters):
+        for column in group_by:
+            if column not in self.RUN_COLUMNS:
+                raise ValueError('Unknown column %s; available columns are %s.' % (column, self.RUN_COLUMNS))
+        columns = ['runs.%s' % column for column in group_by] + (['subject'] if by_subject else [])
+        clauses = ['records.metric = ?', 'records.name = ?', 'value IS NOT NULL']
+        arguments = [metric, name]
+        if subject is not None:
+            clauses.append('records.subject = ?')
+            arguments.append(subject)
+        where, arguments = self._where(filters, clauses, arguments)
+        group = (' GROUP BY ' + ', '.join(columns) + ' ORDER BY ' + ', '.join(columns)) if columns else ''
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT ' + ''.join(column + ', ' for column in columns) +
+                'COUNT(DISTINCT runs.run_id), AVG(value), AVG(value * value), MIN(value), MAX(value) '
+                'FROM records JOIN runs ON records.run_id = runs.run_id' + where + group, arguments).fetchall()
+        header = list(group_by) + (['subject'] if by_subject else []) + ['runs', 'mean', 'stddev', 'min', 'max']
+        table = []
+        for row in rows:
+            keys, (runs, mean, mean_of_squares, minimum, maximum) = row[:len(columns)], row[len(columns):]
+            if runs == 0:
+                continue
+            stddev = max(0.0, mean_of_squares - mean * mean) ** 0.5
+            table.append(tuple(keys) + (runs, mean, stddev, minimum, maximum))
+        return header, table
@@ -0,0 +1,133 @@
+import heapq
+
+import numpy as np
+
+from utils.statistics import non_negative_least_squares
+
+"""
+This class models the cost of a job (see utils.batch.Job), namely the time needed to execute it, as a linear function
+of the number of nodes, links and VPNs of its simulation. Coefficients are fitted (non-negative least squares) on the
+timings of the jobs already executed; without enough timings, the cost is proportional to the size of the topology.
+"""
+
+
+class CostModel(object):
+    def __init__(self):
+        # Coefficients of the constant, nodes, links and VPNs; None until the model is fitted
+        self._coefficients = None
+        self._samples = 0
+
+    def __repr__(self):
+        return 'CostModel[coefficients=%s, #samples=%s]' % (self._coefficients, self._samples)
+
+    '''
+    Return the features of a job.
+    '''
+    @staticmethod
+    def get_features(job):
+        return [1.0, float(job.get_nodes()), float(job.get_links()), float(job.get_vpns())]
+
+    '''
+    Return whether the model has been fitted on timings.
+    '''
+    def is_fitted(self):
+        return self._coefficients is not None
+
+    '''
+    Fit the model on samples, a list of (features, elapsed) tuples.
+    '''
+    def fit(self, samples):
+        self._samples = len(samples)
+        if not samples:
+            return
+        features = np.array([sample[0] for sample in samples], dtype=np.float64)
+        elapsed = np.array([sample[1] for sample in samples], dtype=np.float64)
+        if len(samples) < features.shape[1]:
+            # Too few samples: scale the size of the topology to the observed timings
+            scale = elapsed.sum() / max(1.0, features[:, 1:3].sum())
+            self._coefficients = np.array([0.0, scale, scale, 0.0])
+            return
+        self._coefficients = non_negative_least_squares(features, elapsed)
+
+    '''
+    Return the estimated cost of a job (seconds if the model is fitted, otherwise a relative cost).
+    '''
+    def estimate(self, job):
+        features = self.get_features(job)
+        if self._coefficients is None:
+            return features[1] + features[2]
+        return max(float(np.dot(self._coefficients, features)), 1e-3)
+
+"""
+This class implements the scheduler of a batch: it orders and packs jobs into the worker slots, so as to minimize the
+makespan and the rebuilds of the environments. Jobs on the same topology are grouped and executed one after the other
+by the same worker, unless a group alone is longer than the ideal load of a worker (then its jobs are scheduled one by
+one). Groups are assigned largest first to the least loaded worker (longest processing time rule), so that large
+topologies do not make a long tail at the end of the batch. Costs are estimated by a CostModel for each alternative of
+each service, falling back on a model fitted on all timings.
+"""
+
+
+class Scheduler(object):
+    def __init__(self, workers=1):
+        self._workers = max(1, int(workers))
+        self._models = {}
+        self._default_model = CostModel()
+        self._makespan = None
+
+    def __repr__(self):
+        return 'Scheduler[workers=%s, #models=%s]' % (self._workers, len(self._models))
+
+    '''
+    Fit the cost models on history, a list of (job, elapsed) tuples of successfully executed jobs.
+    '''
+    def fit(self, history):
+        samples = {}
+        for job, elapsed in history:
+            samples.setdefault((job.get_service(), job.get_alternative()), []).append(
+                (CostModel.get_features(job), elapsed))
+        self._default_model.fit([sample for key in samples for sample in samples[key]])
+        for key, key_samples in samples.items():
+            # A model for each alternative needs at least a sample for each feature
+            if len(key_samples) >= len(key_samples[0][0]):
+                self._models[key] = CostModel()
+                self._models[key].fit(key_samples)
+
+    '''
+    Return the estimated cost of a job.
+    '''
+    def estimate(self, job):
+        model = self._models.get((job.get_service(), job.get_alternative()), self._default_model)
+        return model.estimate(job)
+
+    '''
+    Return the estimated makespan of the last schedule.
+    '''
+    def get_makespan(self):
+        return self._makespan
+
+    '''
+    Schedule jobs, returning a list with the jobs of each worker, in order of execution.
+    '''
+    def schedule(self, jobs):
+        costs = dict((job, self.estimate(job)) for job in jobs)
+        ideal_load = sum(costs.values()) / self._workers
+        groups = {}
+        for job in jobs:
+            groups.setdefault(job.get_topology(), []).append(job)
+        units = []
+        for topology, group in groups.items():
+            if sum(costs[job] for job in group) > ideal_load:
+                units.extend([job] for job in group)
+            else:
+                units.append(group)
+        units.sort(key=lambda unit: (-sum(costs[job] for job in unit), unit[0].get_id()))
+        # Heap of (load, worker)
+        loads = [(0.0, worker) for worker in range(self._workers)]
+        schedule = [[] for worker in range(self._workers)]
+        for unit in units:
+            load, worker = heapq.heappop(loads)
+            schedule[worker].extend(sorted(unit, key=lambda job: -costs[job]))
+            heapq.heappush(loads, (load + sum(costs[job] for job in unit), worker))
+        self._makespan = max(load for load, worker in loads)
+        return schedule
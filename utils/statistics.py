@@ -0,0 +1,172 @@
+import math
+
+import numpy as np
+
+"""
+This file contains the statistics used for aggregating the results of repeated simulations: mean, confidence interval
+(based on Student's t distribution) and percentiles.
+"""
+
+# Percentiles computed for each value
+PERCENTILES = (5, 50, 95)
+
+'''
+Evaluate the continued fraction of the regularized incomplete beta function (modified Lentz's method).
+'''
+
+
+def _beta_continued_fraction(a, b, x):
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return result
+
+'''
+Return the regularized incomplete beta function I_x(a, b).
+'''
+
+
+def _incomplete_beta(a, b, x):
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - front * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+'''
+Return the cumulative distribution function of Student's t distribution with df degrees of freedom.
+'''
+
+
+def t_cdf(t, df):
+    tail = 0.5 * _incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+    return 1.0 - tail if t >= 0 else tail
+
+'''
+Return the quantile p of Student's t distribution with df degrees of freedom (found by bisection).
+'''
+
+
+def t_quantile(p, df):
+    if p == 0.5:
+        return 0.0
+    if p < 0.5:
+        return -t_quantile(1.0 - p, df)
+    low, high = 0.0, 1.0
+    while t_cdf(high, df) < p:
+        high *= 2.0
+    for i in range(100):
+        middle = (low + high) / 2.0
+        if t_cdf(middle, df) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2.0
+
+'''
+Summarize a list of values, returning a map with the number of values (n), their mean, standard deviation (stddev, of
+the sample), the bounds of the confidence interval of the mean (ci_low, ci_high) at the given confidence level, its
+half width relative to the mean (relative_half_width; infinite if it is undefined), and the PERCENTILES (p5, p50, ...).
+'''
+
+
+def summarize(values, confidence=0.95):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    summary = {'n': len(values)}
+    if len(values) == 0:
+        return summary
+    mean = values.mean()
+    stddev = values.std(ddof=1) if len(values) > 1 else float('nan')
+    if len(values) > 1:
+        half_width = t_quantile((1.0 + confidence) / 2.0, len(values) - 1) * stddev / math.sqrt(len(values))
+    else:
+        half_width = float('inf')
+    if half_width == 0:
+        relative_half_width = 0.0
+    elif mean != 0:
+        relative_half_width = half_width / abs(mean)
+    else:
+        relative_half_width = float('inf')
+    summary.update({'mean': mean, 'stddev': stddev, 'ci_low': mean - half_width, 'ci_high': mean + half_width,
+                    'relative_half_width': relative_half_width})
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary['p%s' % percentile] = value
+    return summary
+
+'''
+Fit the coefficients x of the linear model features * x = values by least squares, constraining them to be non-negative:
+the features whose coefficient would be negative are excluded from the model, one at a time. Features is a matrix with a
+row for each sample.
+'''
+
+
+def non_negative_least_squares(features, values):
+    features = np.asarray(features, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    active = range(features.shape[1])
+    while True:
+        solution = np.linalg.lstsq(features[:, active], values, rcond=None)[0]
+        if (solution >= 0).all() or len(active) == 1:
+            break
+        del active[int(np.argmin(solution))]
+    coefficients = np.zeros(features.shape[1])
+    coefficients[active] = np.maximum(solution, 0)
+    return coefficients
+
+"""
+This class implements the adaptive stopping of repeated simulations: repetitions stop as soon as, after at least
+min_repetitions runs, the confidence interval of the mean of each target value is narrower than tolerance (relative to
+the mean). Values are identified by (metric, name, subject) tuples; targets are (metric, name) tuples, or None for all
+the values about a whole run (empty subject).
+"""
+
+
+class AdaptiveStopping(object):
+    def __init__(self, min_repetitions=2, confidence=0.95, tolerance=None, targets=None):
+        self._min_repetitions = max(2, min_repetitions)
+        self._confidence = confidence
+        # None means that repetitions never stop early
+        self._tolerance = tolerance
+        self._targets = targets
+
+    def __repr__(self):
+        return 'AdaptiveStopping[min_repetitions=%s, confidence=%s, tolerance=%s]' % (
+            self._min_repetitions, self._confidence, self._tolerance)
+
+    def get_confidence(self):
+        return self._confidence
+
+    '''
+    Return True if the samples (a map<(metric, name, subject), list of values>, one value for each run) of runs runs
+    are enough.
+    '''
+    def is_satisfied(self, runs, samples):
+        if self._tolerance is None or runs < self._min_repetitions:
+            return False
+        if self._targets is None:
+            keys = [key for key in samples.keys() if key[2] == '']
+        else:
+            keys = [key for key in samples.keys() if (key[0], key[1]) in self._targets]
+        if not keys:
+            return False
+        for key in keys:
+            summary = summarize(samples[key], self._confidence)
+            if summary['n'] < self._min_repetitions or summary['relative_half_width'] > self._tolerance:
+                return False
+        return True
@@ -0,0 +1,261 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import threading
+import time
+
+"""
+This file contains the tracing of the framework: phases are traced as nested spans, namely named intervals of time with
+attributes, measured by a monotonic clock.
+"""
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+_CLOCK_MONOTONIC = 1
+_librt = ctypes.CDLL(ctypes.util.find_library('rt') or ctypes.util.find_library('c'), use_errno=True)
+
+'''
+Return the time (seconds) of the monotonic clock of the system, namely a clock which cannot go backwards.
+'''
+
+
+def _clock_gettime():
+    timespec = _Timespec()
+    if _librt.clock_gettime(_CLOCK_MONOTONIC, ctypes.byref(timespec)) != 0:
+        raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+    return timespec.tv_sec + timespec.tv_nsec * 1e-9
+
+# Python 3 provides it
+monotonic = getattr(time, 'monotonic', _clock_gettime)
+
+"""
+This class models a span, namely a phase of the framework. A span is started when it is created and ended by end(), or
+when the with block it is used into is left; spans started (by the same thread) while it is running are its children.
+"""
+
+
+class Span(object):
+    def __init__(self, tracer, identifier, name, attributes, parent):
+        self._tracer = tracer
+        self._id = identifier
+        self._name = name
+        self._attributes = attributes
+        # The identifier of the parent span, or None
+        self._parent = parent
+        self._thread = threading.current_thread()
+        self._start = monotonic()
+        self._end = None
+
+    def __repr__(self):
+        return 'Span[name=%s, duration=%s]' % (self._name, self.get_duration())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, trace):
+        if exception_type is not None:
+            self.set_attribute('error', exception_type.__name__)
+        self.end()
+        return False
+
+    def get_id(self):
+        return self._id
+
+    def get_name(self):
+        return self._name
+
+    def get_parent(self):
+        return self._parent
+
+    def get_attributes(self):
+        return dict(self._attributes)
+
+    def get_thread(self):
+        return self._thread
+
+    def get_start(self):
+        return self._start
+
+    '''
+    Return the duration (seconds) of this span, or None if it has not ended yet.
+    '''
+    def get_duration(self):
+        return self._end - self._start if self._end is not None else None
+
+    '''
+    Set an attribute of this span.
+    '''
+    def set_attribute(self, name, value):
+        self._attributes[name] = value
+
+    '''
+    End this span.
+    '''
+    def end(self):
+        if self._end is None:
+            self._end = monotonic()
+            self._tracer._end(self)
+
+"""
+This class models a span which records nothing, returned when tracing is disabled.
+"""
+
+
+class _NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, trace):
+        return False
+
+    def set_attribute(self, name, value):
+        pass
+
+    def end(self):
+        pass
+
+"""
+This class implements the tracer of the framework, which collects the spans of a simulation and exports them into the
+simulation folder as:
+ - trace.json: the spans as complete events of the Chrome trace event format (to be opened with chrome://tracing or
+   https://ui.perfetto.dev), one track for each thread;
+ - trace.data: a summary table with, for each span name, the number of spans, their total, mean and maximum duration
+   and their self time, namely the total duration minus the one of their children.
+"""
+
+
+class Tracer(object):
+    __instance = None
+
+    TRACE_FILE_NAME = 'trace.json'
+    SUMMARY_FILE_NAME = 'trace.data'
+    _NULL_SPAN = _NullSpan()
+
+    def __init__(self):
+        self._enabled = True
+        self._lock = threading.Lock()
+        self._spans = []
+        self._next_id = 0
+        # The stack of running spans of each thread
+        self._local = threading.local()
+        # Objects notified (by the thread of the span) when a span starts and ends, even if tracing is disabled
+        self._listeners = []
+
+    def __repr__(self):
+        return 'Tracer[enabled=%s, #spans=%s]' % (self._enabled, len(self._spans))
+
+    '''
+    In accord with Singleton pattern, it returns an instance of this class.
+    '''
+    @classmethod
+    def get_instance(cls):
+        if cls.__instance is None:
+            cls.__instance = Tracer()
+        return cls.__instance
+
+    '''
+    Enable or disable tracing.
+    '''
+    def set_enabled(self, enabled):
+        self._enabled = enabled
+
+    '''
+    Add a listener, namely an object with methods span_started(span) and span_ended(span).
+    '''
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    '''
+    Start a span named name, with the given attributes. Use it into a with block, or end it by its end() method.
+    '''
+    def span(self, name, **attributes):
+        if not self._enabled and not self._listeners:
+            return self._NULL_SPAN
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        with self._lock:
+            identifier = self._next_id
+            self._next_id += 1
+        span = Span(self, identifier, name, attributes, stack[-1].get_id() if stack else None)
+        stack.append(span)
+        for listener in self._listeners:
+            listener.span_started(span)
+        return span
+
+    '''
+    Called by a span when it ends.
+    '''
+    def _end(self, span):
+        stack = getattr(self._local, 'stack', [])
+        if span in stack:
+            stack.remove(span)
+        for listener in self._listeners:
+            listener.span_ended(span)
+        if self._enabled:
+            with self._lock:
+                self._spans.append(span)
+
+    '''
+    Forget the spans ended so far.
+    '''
+    def reset(self):
+        with self._lock:
+            self._spans = []
+
+    '''
+    Return the spans ended so far.
+    '''
+    def get_spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    '''
+    Return the summary of the spans ended so far, as a list of (name, count, total, mean, maximum, self time) tuples,
+    sorted by total duration.
+    '''
+    def get_summary(self):
+        spans = self.get_spans()
+        children = {}
+        for span in spans:
+            if span.get_parent() is not None:
+                children[span.get_parent()] = children.get(span.get_parent(), 0.0) + span.get_duration()
+        names = {}
+        for span in spans:
+            names.setdefault(span.get_name(), []).append(span)
+        summary = []
+        for name, named_spans in names.items():
+            durations = [span.get_duration() for span in named_spans]
+            own = sum(span.get_duration() - children.get(span.get_id(), 0.0) for span in named_spans)
+            summary.append((name, len(durations), sum(durations), sum(durations) / len(durations), max(durations),
+                            own))
+        return sorted(summary, key=lambda row: -row[2])
+
+    '''
+    Export the spans ended so far into folder.
+    '''
+    def export(self, folder):
+        spans = sorted(self.get_spans(), key=lambda span: span.get_start())
+        if not spans:
+            return
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for span in spans:
+            thread = span.get_thread()
+            threads[thread.ident] = thread.name
+            events.append({'name': span.get_name(), 'cat': span.get_name().split('.')[0], 'ph': 'X',
+                           'ts': span.get_start() * 1e6, 'dur': span.get_duration() * 1e6, 'pid': pid,
+                           'tid': thread.ident, 'args': dict((name, str(value)) for name, value in
+                                                             span.get_attributes().items())})
+        for ident, name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': ident, 'args': {'name': name}})
+        with open(os.path.join(folder, self.TRACE_FILE_NAME), 'w') as output_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, output_file)
+        with open(os.path.join(folder, self.SUMMARY_FILE_NAME), 'w') as output_file:
+            output_file.write('# span count total mean max self\n')
+            for row in self.get_summary():
+                output_file.write('%s %s %.6f %.6f %.6f %.6f\n' % row)